@@ -0,0 +1,195 @@
+"""
+Benchmark the pg_catalog loaders against the information_schema queries they
+replaced, on a synthetic catalog.
+
+Creates (and by default drops) a `bench_catalog` schema with N tables, each
+with a handful of columns, an FK to the previous table and one trigger, plus
+a view over every tenth table. Point SUPABASE_DB_* at a disposable database
+whose user may run DDL. Catalog timings include decoding rows into tool
+output dicts; legacy queries are cut off at --legacy-timeout.
+
+    uv run python benchmarks/catalog_queries.py --tables 5000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import asyncpg
+
+from supabase_schema_mcp import catalog, db
+from supabase_schema_mcp.config import get_settings
+
+SCHEMA = "bench_catalog"
+
+LEGACY_QUERIES = {
+    "tables": """
+        SELECT t.table_schema, t.table_name, t.table_type
+        FROM information_schema.tables t
+        WHERE t.table_type = 'BASE TABLE'
+        AND t.table_schema = $1
+        ORDER BY t.table_schema, t.table_name
+    """,
+    "columns": """
+        SELECT c.table_schema, c.table_name, c.column_name, c.data_type,
+               c.is_nullable, c.column_default
+        FROM information_schema.columns c
+        WHERE c.table_schema = $1
+        ORDER BY c.table_schema, c.table_name, c.ordinal_position
+    """,
+    "views": """
+        SELECT v.table_schema, v.table_name, v.view_definition
+        FROM information_schema.views v
+        WHERE v.table_schema = $1
+        ORDER BY v.table_schema, v.table_name
+    """,
+    "foreign_keys": """
+        SELECT tc.table_schema AS from_schema, tc.table_name AS from_table,
+               kcu.column_name AS from_column,
+               ccu.table_schema AS to_schema, ccu.table_name AS to_table,
+               ccu.column_name AS to_column,
+               tc.constraint_name, rc.update_rule, rc.delete_rule
+        FROM information_schema.table_constraints tc
+        JOIN information_schema.key_column_usage kcu
+             ON tc.constraint_name = kcu.constraint_name
+             AND tc.table_schema = kcu.table_schema
+        JOIN information_schema.constraint_column_usage ccu
+             ON ccu.constraint_name = tc.constraint_name
+             AND ccu.table_schema = tc.table_schema
+        JOIN information_schema.referential_constraints rc
+             ON tc.constraint_name = rc.constraint_name
+             AND tc.table_schema = rc.constraint_schema
+        WHERE tc.constraint_type = 'FOREIGN KEY'
+        AND tc.table_schema = $1
+        ORDER BY tc.table_schema, tc.table_name, tc.constraint_name
+    """,
+    "triggers": """
+        SELECT t.trigger_schema AS schema_name, t.event_object_table AS table_name,
+               t.trigger_name, t.action_timing AS timing,
+               t.event_manipulation AS event, t.action_statement
+        FROM information_schema.triggers t
+        WHERE t.trigger_schema = $1
+        ORDER BY t.trigger_schema, t.event_object_table, t.trigger_name
+    """,
+}
+
+NEW_LOADERS = {
+    "tables": catalog._LOADERS["tables"],
+    "columns": catalog._LOADERS["columns"],
+    "views": catalog._LOADERS["views"],
+    "foreign_keys": catalog._LOADERS["foreign_keys"],
+    "triggers": catalog._LOADERS["triggers"],
+}
+
+
+async def _connect() -> asyncpg.Connection:
+    settings = get_settings()
+    return await asyncpg.connect(
+        host=settings.supabase_db_host,
+        port=settings.supabase_db_port,
+        database=settings.supabase_db_name,
+        user=settings.supabase_db_user,
+        password=settings.supabase_db_password,
+    )
+
+
+async def create_catalog(conn: asyncpg.Connection, tables: int) -> None:
+    """Create the synthetic schema, committing in batches of 500 tables."""
+    if await conn.fetchval(
+        "SELECT 1 FROM pg_namespace WHERE nspname = $1", SCHEMA
+    ):
+        await drop_catalog(conn)
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(
+        f"CREATE FUNCTION {SCHEMA}.touch() RETURNS trigger LANGUAGE plpgsql"
+        " AS $$ BEGIN RETURN NEW; END $$"
+    )
+    for start in range(0, tables, 500):
+        stmts = []
+        for i in range(start, min(start + 500, tables)):
+            fk = f", parent_id bigint REFERENCES {SCHEMA}.t{i - 1}(id)" if i else ""
+            stmts.append(
+                f"CREATE TABLE {SCHEMA}.t{i} (id bigserial PRIMARY KEY,"
+                f" name text NOT NULL, amount numeric(12, 2) DEFAULT 0,"
+                f" tags text[], created_at timestamptz DEFAULT now(){fk})"
+            )
+            stmts.append(
+                f"CREATE TRIGGER t{i}_touch BEFORE INSERT OR UPDATE ON {SCHEMA}.t{i}"
+                f" FOR EACH ROW EXECUTE FUNCTION {SCHEMA}.touch()"
+            )
+            if i % 10 == 0:
+                stmts.append(
+                    f"CREATE VIEW {SCHEMA}.v{i} AS SELECT id, name FROM {SCHEMA}.t{i}"
+                )
+        await conn.execute(";\n".join(stmts))
+    await conn.execute("ANALYZE")
+
+
+async def drop_catalog(conn: asyncpg.Connection) -> None:
+    """Drop the synthetic schema in batches to stay under max_locks_per_transaction."""
+    for kind, relkind in (("VIEW", "v"), ("TABLE", "r")):
+        while names := await conn.fetch(
+            "SELECT c.oid::regclass::text AS name FROM pg_class c"
+            " WHERE c.relnamespace = $1::regnamespace AND c.relkind::text = $2"
+            " LIMIT 500",
+            SCHEMA,
+            relkind,
+        ):
+            await conn.execute(
+                f"DROP {kind} {', '.join(r['name'] for r in names)} CASCADE"
+            )
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+async def _time(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy-timeout", type=int, default=120, help="seconds")
+    parser.add_argument("--keep", action="store_true", help="keep the schema")
+    parser.add_argument(
+        "--reuse", action="store_true", help="reuse a schema kept by --keep"
+    )
+    opts = parser.parse_args()
+
+    conn = await _connect()
+    try:
+        if not opts.reuse:
+            print(f"creating {opts.tables} tables in {SCHEMA}...")
+            await create_catalog(conn, opts.tables)
+        await conn.execute(f"SET statement_timeout = '{opts.legacy_timeout}s'")
+        print(f"{'section':<14}{'legacy ms':>12}{'catalog ms':>12}{'speedup':>10}")
+        for section, legacy_sql in LEGACY_QUERIES.items():
+            loader = NEW_LOADERS[section]
+            new_ms = statistics.median(await _time(lambda: loader(SCHEMA), opts.repeat))
+            try:
+                legacy = await _time(
+                    lambda: conn.fetch(legacy_sql, SCHEMA), opts.repeat
+                )
+            except asyncpg.QueryCanceledError:
+                limit = f">{opts.legacy_timeout * 1000}"
+                print(f"{section:<14}{limit:>12}{new_ms:>12.1f}{'':>10}")
+                continue
+            old_ms = statistics.median(legacy)
+            speedup = f"{old_ms / new_ms:.1f}x"
+            print(f"{section:<14}{old_ms:>12.1f}{new_ms:>12.1f}{speedup:>10}")
+    finally:
+        if not opts.keep:
+            await conn.execute("RESET statement_timeout")
+            await drop_catalog(conn)
+        await conn.close()
+        await db.close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,202 @@
+"""
+Throughput of N concurrent MCP clients against one shared HTTP server versus
+N stdio server processes (one per client, as editors and agents spawn them).
+
+Uses the SUPABASE_DB_* database. Each client connects, initializes, then makes
+--calls tool calls in a row (a mix of listing tools on --schema). Reported per
+mode: wall time, calls per second, p50/p99 call latency, session setup time,
+the peak number of database connections opened by the server(s) and failed
+calls (with enough clients, stdio servers run out of max_connections).
+
+    uv run python benchmarks/http_load.py --clients 50 --calls 20 --schema public
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import Any
+
+import asyncpg
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+_TOOLS = (
+    "schema_list_tables",
+    "schema_list_columns",
+    "relationships_list_foreign_keys",
+    "rls_list_policies",
+    "triggers_list",
+)
+
+Transport = Callable[[], AbstractAsyncContextManager[tuple[Any, ...]]]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(samples: list[float], q: int) -> float:
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+async def _connect_db() -> asyncpg.Connection:
+    return await asyncpg.connect(
+        host=os.environ["SUPABASE_DB_HOST"],
+        port=int(os.environ.get("SUPABASE_DB_PORT", "5432")),
+        database=os.environ.get("SUPABASE_DB_NAME", "postgres"),
+        user=os.environ["SUPABASE_DB_USER"],
+        password=os.environ["SUPABASE_DB_PASSWORD"],
+    )
+
+
+async def _sample_connections(peak: list[int], stop: asyncio.Event) -> None:
+    """Track the most backends of our database/user (minus this one) seen."""
+    conn = await _connect_db()
+    try:
+        while not stop.is_set():
+            count = await conn.fetchval(
+                "SELECT count(*) - 1 FROM pg_stat_activity"
+                " WHERE datname = current_database() AND usename = current_user"
+            )
+            peak[0] = max(peak[0], count)
+            await asyncio.sleep(0.05)
+    finally:
+        await conn.close()
+
+
+async def _client(
+    transport: Transport,
+    schema: str,
+    calls: int,
+    latencies: list[float],
+    errors: list[str],
+) -> float:
+    """One client session; returns its setup time, appends call latencies."""
+    start = time.perf_counter()
+    async with transport() as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            setup = time.perf_counter() - start
+            for i in range(calls):
+                tool = _TOOLS[i % len(_TOOLS)]
+                call_start = time.perf_counter()
+                result = await session.call_tool(tool, {"schema_name": schema})
+                latencies.append((time.perf_counter() - call_start) * 1000)
+                if result.isError:
+                    errors.append(result.content[0].text)
+    return setup * 1000
+
+
+async def _run_mode(
+    name: str, transport: Transport, opts: argparse.Namespace
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    errors: list[str] = []
+    peak, stop = [0], asyncio.Event()
+    sampler = asyncio.create_task(_sample_connections(peak, stop))
+    start = time.perf_counter()
+    setups = await asyncio.gather(
+        *(
+            _client(transport, opts.schema, opts.calls, latencies, errors)
+            for _ in range(opts.clients)
+        )
+    )
+    wall = time.perf_counter() - start
+    stop.set()
+    await sampler
+    result = {
+        "mode": name,
+        "clients": opts.clients,
+        "calls": len(latencies),
+        "wall_s": round(wall, 3),
+        "calls_per_s": round(len(latencies) / wall, 1),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "setup_p50_ms": round(_percentile(setups, 50), 1),
+        "peak_db_connections": peak[0],
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+    print(json.dumps(result), file=sys.stderr)
+    return result
+
+
+@asynccontextmanager
+async def _http_server(port: int) -> AsyncIterator[str]:
+    """Start the server with the streamable-http transport; stop it with SIGTERM."""
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "supabase_schema_mcp.server",
+        "--transport",
+        "streamable-http",
+        "--port",
+        str(port),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.close()
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+        yield f"http://127.0.0.1:{port}/mcp"
+    finally:
+        proc.terminate()
+        await proc.wait()
+
+
+async def _main(opts: argparse.Namespace) -> list[dict[str, Any]]:
+    results = []
+    if "http" in opts.modes:
+        async with _http_server(_free_port()) as url:
+            results.append(
+                await _run_mode("http", lambda: streamablehttp_client(url), opts)
+            )
+    if "stdio" in opts.modes:
+        params = StdioServerParameters(
+            command=sys.executable,
+            args=["-m", "supabase_schema_mcp.server"],
+            env=dict(os.environ),
+        )
+        results.append(await _run_mode("stdio", lambda: stdio_client(params), opts))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=20, help="calls per client")
+    parser.add_argument("--schema", default="public")
+    parser.add_argument(
+        "--modes", default="http,stdio", help="comma-separated: http, stdio"
+    )
+    parser.add_argument(
+        "--persist",
+        action="store_true",
+        help="let servers restore snapshots from disk (default: start cold)",
+    )
+    opts = parser.parse_args()
+    opts.modes = opts.modes.split(",")
+    if not opts.persist:
+        os.environ["SCHEMA_CACHE_PERSIST"] = "false"
+    print(json.dumps(asyncio.run(_main(opts)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Exercise the Management API client against a local mock server: connection
+reuse, the TTL cache, ETag revalidation and retries on 429/503. Prints each
+check and its timing and exits non-zero if a check fails.
+
+    uv run python benchmarks/management_api_mock.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import httpx
+
+_PROJECT = {"id": "abcd", "name": "mock", "ref": "abcd", "region": "eu-west-1"}
+_ETAG = '"v1"'
+
+
+class _State:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.connections = 0
+        self.fail_next: list[int] = []  # statuses to return before succeeding
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    state: _State
+
+    def setup(self) -> None:
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", **headers: str) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        with self.state.lock:
+            self.state.requests += 1
+            failure = self.state.fail_next.pop(0) if self.state.fail_next else None
+        if failure is not None:
+            self._send(failure, b"try again", Retry_After="0")
+        elif self.headers.get("Authorization") != "Bearer key":
+            self._send(401, b"unauthorized")
+        elif self.path != "/v1/projects/abcd":
+            self._send(404, b"not found")
+        elif self.headers.get("If-None-Match") == _ETAG:
+            with self.state.lock:
+                self.state.not_modified += 1
+            self._send(304, ETag=_ETAG)
+        else:
+            body = json.dumps(_PROJECT).encode()
+            self._send(200, body, Content_Type="application/json", ETag=_ETAG)
+
+
+def _start_server() -> tuple[ThreadingHTTPServer, _State]:
+    state = _State()
+    handler = type("Handler", (_Handler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+_failed = False
+
+
+def _check(name: str, ok: bool, detail: str) -> None:
+    global _failed
+    _failed |= not ok
+    print(f"{'PASS' if ok else 'FAIL'}  {name}: {detail}")
+
+
+async def _main(base_url: str, state: _State) -> None:
+    # Configure before the package reads its settings.
+    os.environ.update(
+        MANAGEMENT_API_URL=base_url,
+        MANAGEMENT_API_CACHE_TTL="0.2",
+        SUPABASE_PROJECT_REF="abcd",
+        SUPABASE_SERVICE_ROLE_KEY="key",
+    )
+    from supabase_schema_mcp import management_api
+
+    client = management_api.get_client()
+
+    start = time.perf_counter()
+    info = await management_api.fetch_project_info()
+    cold_ms = (time.perf_counter() - start) * 1000
+    _check("cold fetch", info.name == "mock", f"{cold_ms:.2f} ms, 1 request")
+
+    n = 10_000
+    before = state.requests
+    start = time.perf_counter()
+    for _ in range(n):
+        await management_api.fetch_project_info()
+    per_call_us = (time.perf_counter() - start) / n * 1e6
+    _check(
+        "cached lookups",
+        state.requests == before,
+        f"{n} calls, {per_call_us:.1f} us each, {state.requests - before} requests",
+    )
+
+    await asyncio.sleep(0.25)
+    await management_api.fetch_project_info()
+    _check(
+        "revalidation after TTL",
+        state.not_modified == 1 and client.counts["revalidated"] == 1,
+        f"{state.not_modified} x 304 Not Modified",
+    )
+
+    await asyncio.sleep(0.25)
+    state.fail_next = [503, 429]
+    info = await management_api.fetch_project_info()
+    _check(
+        "retry on 503 and 429",
+        info.name == "mock" and client.counts["retries"] == 2,
+        f"{client.counts['retries']} retries, then success",
+    )
+
+    await asyncio.sleep(0.25)
+    state.fail_next = [503] * 10
+    try:
+        await management_api.fetch_project_info()
+        gave_up = False
+    except management_api.ManagementAPIError as e:
+        gave_up = e.status == 503
+    state.fail_next = []
+    _check("give up after retries", gave_up, "ManagementAPIError(status=503)")
+
+    _check(
+        "one keep-alive connection",
+        state.connections == 1,
+        f"{state.requests} requests over {state.connections} connection(s)",
+    )
+
+    # The previous behaviour: a new AsyncClient (and connection) per call.
+    url = f"{base_url}/projects/abcd"
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        async with httpx.AsyncClient(timeout=15.0) as fresh:
+            await fresh.get(url, headers={"Authorization": "Bearer key"})
+    fresh_ms = (time.perf_counter() - start) / rounds * 1000
+    client.ttl = 0.0  # force a conditional request every time
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await management_api.fetch_project_info()
+    shared_ms = (time.perf_counter() - start) / rounds * 1000
+    print(
+        f"      per call: new client {fresh_ms:.2f} ms, shared client revalidating"
+        f" {shared_ms:.2f} ms, cached {per_call_us / 1000:.4f} ms (plain HTTP;"
+        " a TLS handshake adds tens of ms to each new client)"
+    )
+    print(f"      stats: {management_api.client_stats()}")
+    await management_api.close_client()
+
+
+def main() -> None:
+    server, state = _start_server()
+    try:
+        asyncio.run(_main(f"http://127.0.0.1:{server.server_port}/v1", state))
+    finally:
+        server.shutdown()
+    sys.exit(1 if _failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare payload size and serialization time of each output format against
+the default pretty-printed JSON, for every section of one schema snapshot.
+
+    uv run python benchmarks/output_formats.py --schema all --repeat 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from supabase_schema_mcp import db, output
+from supabase_schema_mcp.catalog import SECTIONS
+from supabase_schema_mcp.snapshot import get_snapshot
+
+
+def _render(rows: list, fmt: str) -> str:
+    return output.dump_json(output.apply_layout(rows, fmt), fmt)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--schema", default="all")
+    parser.add_argument("--repeat", type=int, default=20)
+    opts = parser.parse_args()
+
+    snapshot = await get_snapshot(opts.schema)
+    await db.close_pool()
+    serializer = "orjson" if output.orjson is not None else "json"
+    print(f"minified formats serialized with {serializer}")
+    print(f"{'section':<14}{'format':<10}{'bytes':>10}{'size':>8}{'ms':>9}{'time':>8}")
+    for section in SECTIONS:
+        rows = getattr(snapshot, section)
+        if not rows:
+            continue
+        baseline: tuple[int, float] | None = None
+        for fmt in output.OUTPUT_FORMATS:
+            samples = []
+            for _ in range(opts.repeat):
+                start = time.perf_counter()
+                text = _render(rows, fmt)
+                samples.append((time.perf_counter() - start) * 1000)
+            size, ms = len(text.encode()), statistics.median(samples)
+            if baseline is None:
+                baseline = (size, ms)
+            print(
+                f"{section:<14}{fmt:<10}{size:>10}{size / baseline[0]:>8.0%}"
+                f"{ms:>9.2f}{ms / baseline[1]:>8.0%}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Measure what asyncpg's prepared-statement cache saves on repeated catalog
+loads: each full schema load is timed with the cache off (as behind a
+transaction pooler) and on, and the server-side planning time of every
+catalog query is reported from EXPLAIN (SUMMARY).
+
+    uv run python benchmarks/prepared_statements.py --schema all --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any
+
+from supabase_schema_mcp import catalog, db
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.snapshot import _FINGERPRINT_QUERY
+
+
+async def _time_loads(schema: str, repeat: int) -> tuple[float, float]:
+    """Median ms of a full snapshot load and of the fingerprint query."""
+    loads, fingerprints = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await catalog.load_snapshots(schema)
+        loads.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        await db.fetch_one(_FINGERPRINT_QUERY)
+        fingerprints.append((time.perf_counter() - start) * 1000)
+    return statistics.median(loads), statistics.median(fingerprints)
+
+
+async def _capture_queries(schema: str) -> list[tuple[str, str, tuple[Any, ...]]]:
+    """
+    (section, SQL, args) of each section query, captured by wrapping
+    fetch_all, then the combined statement a snapshot load sends.
+    """
+    queries: list[tuple[str, str, tuple[Any, ...]]] = []
+    fetch_all = catalog.fetch_all
+    section = ""
+
+    async def recording_fetch_all(query: str, *args: Any) -> Any:
+        queries.append((section, query, args))
+        return await fetch_all(query, *args)
+
+    catalog.fetch_all = recording_fetch_all
+    try:
+        for section, loader in catalog._LOADERS.items():
+            await loader(schema)
+    finally:
+        catalog.fetch_all = fetch_all
+    queries.append(("snapshot (per load)", *catalog.snapshot_query(schema)))
+    queries.append(("fingerprint", _FINGERPRINT_QUERY, ()))
+    return queries
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--schema", default="all")
+    parser.add_argument("--repeat", type=int, default=20)
+    opts = parser.parse_args()
+
+    settings = get_settings()
+    print(f"{'statement cache':<18}{'load ms':>10}{'fingerprint ms':>16}")
+    for size in (0, 100):
+        settings.db_statement_cache_size = size
+        await db.close_pool()
+        await db.warm_pool()
+        await _time_loads(opts.schema, 2)
+        load_ms, fp_ms = await _time_loads(opts.schema, opts.repeat)
+        print(f"{size:<18}{load_ms:>10.1f}{fp_ms:>16.2f}")
+
+    print(f"\n{'query':<24}{'planning ms':>12}")
+    for section, query, args in await _capture_queries(opts.schema):
+        row = await db.fetch_one(f"EXPLAIN (SUMMARY, FORMAT JSON) {query}", *args)
+        plan = row[0] if row else "[]"
+        planning = json.loads(plan)[0]["Planning Time"] if row else 0.0
+        print(f"{section:<24}{planning:>12.2f}")
+    await db.close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
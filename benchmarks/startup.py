@@ -0,0 +1,115 @@
+"""
+Measure server startup like an MCP client spawning it: the import time of
+supabase_schema_mcp.server (with the slowest modules it pulls in, from
+`python -X importtime`) and the time from spawn to the `initialize` reply
+over stdio. With --max-import-ms, exit non-zero when the median import time
+exceeds it, so a regression fails CI.
+
+    uv run python benchmarks/startup.py --runs 10 --max-import-ms 400
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+_INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "startup-benchmark", "version": "0"},
+    },
+}
+
+
+def _import_times() -> dict[str, float]:
+    """Cumulative import ms of each module (top level first) in a fresh process."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import supabase_schema_mcp.server"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times: dict[str, float] = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times.setdefault(name.strip(), int(cumulative) / 1000)
+    return times
+
+
+def _initialize_ms() -> float:
+    """Milliseconds from spawning the stdio server to its initialize reply."""
+    env = {**os.environ, "STARTUP_BANNER": "never"}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "supabase_schema_mcp.server"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        text=True,
+    )
+    assert proc.stdin is not None and proc.stdout is not None
+    proc.stdin.write(json.dumps(_INITIALIZE) + "\n")
+    proc.stdin.flush()
+    reply = json.loads(proc.stdout.readline())
+    elapsed = (time.perf_counter() - start) * 1000
+    if "result" not in reply:
+        raise RuntimeError(f"initialize failed: {reply}")
+    proc.stdin.close()
+    proc.wait(timeout=10)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules shown")
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    opts = parser.parse_args()
+
+    samples: dict[str, list[float]] = defaultdict(list)
+    for _ in range(opts.runs):
+        for name, ms in _import_times().items():
+            samples[name].append(ms)
+    medians = {name: statistics.median(ms) for name, ms in samples.items()}
+    total = medians["supabase_schema_mcp.server"]
+    ours = {
+        name: ms
+        for name, ms in medians.items()
+        if name.startswith("supabase_schema_mcp.") and name.count(".") == 1
+    }
+    fastmcp = medians.get("mcp.server.fastmcp", 0.0)
+    print(f"import supabase_schema_mcp.server: {total:7.1f} ms (median)")
+    print(f"  of which mcp.server.fastmcp:      {fastmcp:7.1f} ms")
+    others = sorted(
+        ((ms, name) for name, ms in medians.items() if "." not in name),
+        reverse=True,
+    )
+    print("slowest top-level packages:")
+    for ms, name in others[: opts.top]:
+        print(f"  {ms:7.1f} ms  {name}")
+    print("package modules imported at startup:")
+    for name, ms in sorted(ours.items(), key=lambda item: -item[1]):
+        print(f"  {ms:7.1f} ms  {name}")
+
+    initialize = [_initialize_ms() for _ in range(opts.runs)]
+    print(
+        f"spawn to initialize reply: {statistics.median(initialize):7.1f} ms median,"
+        f" {min(initialize):.1f} ms best"
+    )
+    if opts.max_import_ms is not None and total > opts.max_import_ms:
+        sys.exit(f"import time {total:.1f} ms exceeds {opts.max_import_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
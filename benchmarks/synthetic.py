@@ -0,0 +1,185 @@
+"""
+Synthetic Supabase-like schema generator for the benchmarks.
+
+Every table gets an id primary key, an owner_id compared against auth.uid()
+by its RLS policies, `columns` extra columns of mixed types, `fks` foreign
+keys to earlier tables, `indexes` secondary indexes (alternating composite
+and expression, the later ones partial), `policies` policies and `triggers`
+triggers. Every tenth table gets a view. On top come `functions` SQL and
+plpgsql functions, `enums` enum types and `partitioned` range-partitioned
+tables with `partitions` partitions each.
+"""
+
+import argparse
+from collections.abc import Iterator
+from dataclasses import dataclass, fields
+
+import asyncpg
+
+_COLUMN_TYPES = (
+    "text",
+    "integer",
+    "timestamptz",
+    "jsonb",
+    "boolean",
+    "numeric(12, 2)",
+    "uuid",
+    "text[]",
+)
+_POLICY_COMMANDS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+_BATCH_TABLES = 200
+
+# Supabase's auth.uid(), for plain Postgres clusters that lack it.
+_AUTH_UID_SQL = """
+DO $$
+BEGIN
+    IF to_regprocedure('auth.uid()') IS NULL THEN
+        CREATE SCHEMA IF NOT EXISTS auth;
+        CREATE FUNCTION auth.uid() RETURNS uuid LANGUAGE sql STABLE AS $uid$
+            SELECT nullif(current_setting('request.jwt.claim.sub', true), '')::uuid
+        $uid$;
+    END IF;
+END
+$$
+"""
+
+
+@dataclass
+class Scale:
+    """Size of one generated schema."""
+
+    tables: int = 200
+    columns: int = 8
+    fks: int = 2
+    indexes: int = 2
+    policies: int = 2
+    triggers: int = 1
+    functions: int = 50
+    enums: int = 5
+    partitioned: int = 5
+    partitions: int = 4
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add one --<field> option per Scale field."""
+    for f in fields(Scale):
+        parser.add_argument(
+            f"--{f.name}", type=int, default=f.default, help=f"default {f.default}"
+        )
+
+
+def scale_from_args(opts: argparse.Namespace) -> Scale:
+    return Scale(**{f.name: getattr(opts, f.name) for f in fields(Scale)})
+
+
+def _table_ddl(schema: str, i: int, scale: Scale) -> list[str]:
+    table = f"{schema}.t_{i:05d}"
+    cols = [
+        "id bigserial PRIMARY KEY",
+        "owner_id uuid",
+        "name text NOT NULL",
+        "created_at timestamptz NOT NULL DEFAULT now()",
+    ]
+    cols += [
+        f"c_{k} {_COLUMN_TYPES[k % len(_COLUMN_TYPES)]}" for k in range(scale.columns)
+    ]
+    cols += [
+        f"ref_{j} bigint REFERENCES {schema}.t_{i - j:05d}(id) ON DELETE CASCADE"
+        for j in range(1, min(scale.fks, i) + 1)
+    ]
+    stmts = [f"CREATE TABLE {table} ({', '.join(cols)})"]
+    for j in range(scale.indexes):
+        where = " WHERE created_at > '2020-01-01'" if j >= 2 else ""
+        if j % 2 == 0:
+            column = f"c_{j % scale.columns}" if scale.columns else "name"
+            target = f"(owner_id, {column})"
+        else:
+            target = "(lower(name))"
+        stmts.append(f"CREATE INDEX t_{i:05d}_idx_{j} ON {table} {target}{where}")
+    if scale.policies:
+        stmts.append(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    for j in range(scale.policies):
+        command = _POLICY_COMMANDS[j % len(_POLICY_COMMANDS)]
+        # Half the policies use the recommended (select auth.uid()) form.
+        uid = "(SELECT auth.uid())" if (i + j) % 2 else "auth.uid()"
+        clause = "WITH CHECK" if command == "INSERT" else "USING"
+        stmts.append(
+            f"CREATE POLICY t_{i:05d}_p{j} ON {table} FOR {command}"
+            f" {clause} (owner_id = {uid})"
+        )
+    for j in range(scale.triggers):
+        stmts.append(
+            f"CREATE TRIGGER t_{i:05d}_trg_{j} BEFORE INSERT OR UPDATE ON {table}"
+            f" FOR EACH ROW EXECUTE FUNCTION {schema}.touch()"
+        )
+    if i % 10 == 0:
+        stmts.append(
+            f"CREATE VIEW {schema}.v_{i:05d} AS"
+            f" SELECT id, owner_id, name FROM {table}"
+        )
+    return stmts
+
+
+def _extra_ddl(schema: str, scale: Scale) -> Iterator[str]:
+    for i in range(scale.enums):
+        yield f"CREATE TYPE {schema}.status_{i} AS ENUM ('draft', 'active', 'archived')"
+    for i in range(scale.functions):
+        if i % 2 == 0 and scale.tables:
+            table = f"{schema}.t_{i % scale.tables:05d}"
+            yield (
+                f"CREATE FUNCTION {schema}.fn_{i:04d}(p_id bigint)"
+                f" RETURNS SETOF {table} LANGUAGE sql STABLE"
+                f" AS 'SELECT * FROM {table} WHERE id = p_id'"
+            )
+        else:
+            yield (
+                f"CREATE FUNCTION {schema}.fn_{i:04d}"
+                f"(p_name text, p_limit int DEFAULT 10) RETURNS void LANGUAGE plpgsql"
+                f" AS $$ BEGIN PERFORM p_name, p_limit; END $$"
+            )
+    for i in range(scale.partitioned):
+        parent = f"{schema}.events_{i:03d}"
+        ref = f" REFERENCES {schema}.t_00000(id)" if scale.tables else ""
+        yield (
+            f"CREATE TABLE {parent} (id bigint NOT NULL, t_id bigint{ref},"
+            f" created_at timestamptz NOT NULL, payload jsonb)"
+            f" PARTITION BY RANGE (created_at)"
+        )
+        for p in range(scale.partitions):
+            yield (
+                f"CREATE TABLE {parent}_p{p:02d} PARTITION OF {parent}"
+                f" FOR VALUES FROM ('{2000 + p}-01-01') TO ('{2001 + p}-01-01')"
+            )
+
+
+async def create_schema(conn: asyncpg.Connection, schema: str, scale: Scale) -> None:
+    """Generate `scale` in `schema` (created if missing), in batches of tables."""
+    await conn.execute(_AUTH_UID_SQL)
+    await conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+    await conn.execute(
+        f"CREATE FUNCTION {schema}.touch() RETURNS trigger LANGUAGE plpgsql"
+        " AS $$ BEGIN NEW.created_at := now(); RETURN NEW; END $$"
+    )
+    for start in range(0, scale.tables, _BATCH_TABLES):
+        stmts = []
+        for i in range(start, min(start + _BATCH_TABLES, scale.tables)):
+            stmts += _table_ddl(schema, i, scale)
+        await conn.execute(";\n".join(stmts))
+    await conn.execute(";\n".join(_extra_ddl(schema, scale)) or "SELECT 1")
+    await conn.execute("ANALYZE")
+
+
+async def drop_schema(conn: asyncpg.Connection, schema: str) -> None:
+    """Drop a generated schema in batches to stay under max_locks_per_transaction."""
+    for kind, relkind in (("VIEW", "v"), ("TABLE", "p"), ("TABLE", "r")):
+        while names := await conn.fetch(
+            "SELECT c.oid::regclass::text AS name FROM pg_class c"
+            " WHERE c.relnamespace = $1::regnamespace AND c.relkind::text = $2"
+            f" LIMIT {_BATCH_TABLES}",
+            schema,
+            relkind,
+        ):
+            await conn.execute(
+                f"DROP {kind} {', '.join(r['name'] for r in names)} CASCADE"
+            )
+    await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
@@ -0,0 +1,277 @@
+"""
+Latency and payload size of every MCP tool on a synthetic schema, written as
+JSON so runs on different commits can be compared.
+
+By default a disposable Postgres cluster is created with initdb in a temp
+directory (PG binaries from --pg-bin, else `pg_ctl` on PATH; initdb refuses
+to run as root), the synthetic schema is generated in `public` and in
+--extra-schemas more schemas, and the cluster is removed afterwards. With
+--external the SUPABASE_DB_* database is used instead and the schemas are
+named synthetic_0, synthetic_1, ... and dropped at the end (unless --keep).
+
+Each tool is called through the FastMCP server with schema_name set to the
+primary schema and to 'all': once right after clearing the snapshot cache
+(cold_ms), then --repeat more times for p50/p99.
+
+    uv run python benchmarks/tool_latency.py --tables 500 --output before.json
+    uv run python benchmarks/tool_latency.py --tables 500 --baseline before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import asyncpg
+from synthetic import (
+    Scale,
+    add_scale_arguments,
+    create_schema,
+    drop_schema,
+    scale_from_args,
+)
+
+# Values for the object-level arguments some tools require; optional filters
+# such as list tools' table_name are left out to measure the full listing.
+_SAMPLE_ARGS = {
+    "table_name": "t_00001",
+    "policy_name": "t_00001_p0",
+    "function_name": "fn_0000",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _pg_bin(explicit: str | None) -> Path:
+    if explicit:
+        return Path(explicit)
+    pg_ctl = shutil.which("pg_ctl")
+    if pg_ctl is None:
+        sys.exit("pg_ctl not found: pass --pg-bin or use --external")
+    return Path(pg_ctl).parent
+
+
+@contextmanager
+def disposable_cluster(pg_bin: Path) -> Iterator[dict[str, str]]:
+    """initdb + pg_ctl start in a temp dir; yields SUPABASE_DB_* env values."""
+    tmp = Path(tempfile.mkdtemp(prefix="supabase-schema-mcp-bench-"))
+    data, port = tmp / "data", _free_port()
+    subprocess.run(
+        [pg_bin / "initdb", "-D", data, "-U", "postgres", "--auth=trust", "-E", "UTF8"],
+        check=True,
+        capture_output=True,
+    )
+    options = (
+        f"-p {port} -k {tmp} -c listen_addresses=127.0.0.1 -c fsync=off"
+        " -c max_locks_per_transaction=1024"
+    )
+    log = tmp / "log"
+    subprocess.run(
+        [pg_bin / "pg_ctl", "-D", data, "-o", options, "-l", log, "-w", "start"],
+        check=True,
+        capture_output=True,
+    )
+    try:
+        yield {
+            "SUPABASE_DB_HOST": "127.0.0.1",
+            "SUPABASE_DB_PORT": str(port),
+            "SUPABASE_DB_NAME": "postgres",
+            "SUPABASE_DB_USER": "postgres",
+            "SUPABASE_DB_PASSWORD": "bench",
+        }
+    finally:
+        subprocess.run(
+            [pg_bin / "pg_ctl", "-D", data, "-m", "fast", "-w", "stop"],
+            capture_output=True,
+        )
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _git_revision() -> dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "-s"))}
+
+
+def _payload(result: Any) -> str:
+    """Text of a FastMCP call_tool result (content list, or (content, structured))."""
+    blocks = result[0] if isinstance(result, tuple) else result
+    return "".join(getattr(block, "text", "") for block in blocks)
+
+
+def _percentile(samples: list[float], q: int) -> float:
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+async def _bench_tool(
+    mcp: Any, cache: Any, name: str, args: dict[str, Any], repeat: int
+) -> dict[str, Any]:
+    if cache is not None:
+        cache.clear()
+    start = time.perf_counter()
+    text = _payload(await mcp.call_tool(name, args))
+    cold_ms = (time.perf_counter() - start) * 1000
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = _payload(await mcp.call_tool(name, args))
+        samples.append((time.perf_counter() - start) * 1000)
+    try:
+        error = json.loads(text).get("error")
+    except (ValueError, AttributeError):
+        error = None
+    return {
+        "tool": name,
+        "scope": "all" if args.get("schema_name") == "all" else "schema",
+        "args": args,
+        "cold_ms": round(cold_ms, 3),
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "bytes": len(text.encode()),
+        "error": error,
+    }
+
+
+async def _run(opts: argparse.Namespace, scale: Scale, schemas: list[str]) -> dict:
+    # Imported here so settings are read after SUPABASE_DB_* point at the cluster.
+    from supabase_schema_mcp import db
+    from supabase_schema_mcp.config import get_settings
+    from supabase_schema_mcp.server import mcp
+    from supabase_schema_mcp.snapshot import get_cache
+
+    settings = get_settings()
+    conn = await asyncpg.connect(
+        host=settings.supabase_db_host,
+        port=settings.supabase_db_port,
+        database=settings.supabase_db_name,
+        user=settings.supabase_db_user,
+        password=settings.supabase_db_password,
+    )
+    try:
+        if not opts.reuse:
+            for schema in schemas:
+                print(f"generating {schema}...", file=sys.stderr)
+                await create_schema(conn, schema, scale)
+        server_version = await conn.fetchval("SHOW server_version")
+
+        cache = get_cache() if settings.schema_cache_enabled else None
+        results = []
+        for tool in await mcp.list_tools():
+            required = tool.inputSchema.get("required", [])
+            for scope in (schemas[0], "all"):
+                args: dict[str, Any] = {"schema_name": scope}
+                args.update({k: v for k, v in _SAMPLE_ARGS.items() if k in required})
+                result = await _bench_tool(mcp, cache, tool.name, args, opts.repeat)
+                results.append(result)
+                print(
+                    f"{tool.name:<34}{result['scope']:<8}{result['p50_ms']:>9.2f}"
+                    f"{result['p99_ms']:>9.2f}{result['bytes']:>11}",
+                    file=sys.stderr,
+                )
+    finally:
+        if opts.external and not opts.keep:
+            for schema in schemas:
+                await drop_schema(conn, schema)
+        await conn.close()
+        await db.close_pool()
+
+    return {
+        "meta": {
+            **_git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "postgres": server_version,
+            "schemas": schemas,
+            "scale": asdict(scale),
+            "repeat": opts.repeat,
+            "schema_cache": settings.schema_cache_enabled,
+        },
+        "results": results,
+    }
+
+
+def _compare(report: dict, baseline_path: Path) -> None:
+    """Print p50 and payload ratios against an earlier report."""
+    baseline = json.loads(baseline_path.read_text())
+    before = {(r["tool"], r["scope"]): r for r in baseline["results"]}
+    print(f"\nvs {baseline_path} ({baseline['meta']['commit'][:10]})")
+    print(f"{'tool':<34}{'scope':<8}{'p50 ms':>18}{'bytes':>12}")
+    for r in report["results"]:
+        old = before.get((r["tool"], r["scope"]))
+        if old is None:
+            print(f"{r['tool']:<34}{r['scope']:<8}{'new':>18}")
+            continue
+        p50 = f"{old['p50_ms']:.2f}->{r['p50_ms']:.2f}"
+        size = r["bytes"] / old["bytes"] if old["bytes"] else 1.0
+        print(f"{r['tool']:<34}{r['scope']:<8}{p50:>18}{size:>12.0%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_scale_arguments(parser)
+    parser.add_argument("--extra-schemas", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--pg-bin", help="directory with initdb and pg_ctl")
+    parser.add_argument(
+        "--external", action="store_true", help="use the SUPABASE_DB_* database"
+    )
+    parser.add_argument("--keep", action="store_true", help="--external: keep schemas")
+    parser.add_argument(
+        "--reuse", action="store_true", help="--external: reuse kept schemas"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="disable the cache")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="compare with an earlier report")
+    opts = parser.parse_args()
+    scale = scale_from_args(opts)
+
+    # Measure the server as configured, minus state that would leak between runs.
+    os.environ["SCHEMA_CACHE_PERSIST"] = "false"
+    os.environ["DB_POOL_WARMUP"] = "false"
+    if opts.no_cache:
+        os.environ["SCHEMA_CACHE_ENABLED"] = "false"
+
+    if opts.external:
+        schemas = [f"synthetic_{i}" for i in range(opts.extra_schemas + 1)]
+        report = asyncio.run(_run(opts, scale, schemas))
+    else:
+        schemas = ["public"] + [f"synthetic_{i}" for i in range(opts.extra_schemas)]
+        with disposable_cluster(_pg_bin(opts.pg_bin)) as env:
+            os.environ.update(env)
+            report = asyncio.run(_run(opts, scale, schemas))
+
+    text = json.dumps(report, indent=2)
+    if opts.output:
+        opts.output.write_text(text + "\n")
+    else:
+        print(text)
+    if opts.baseline:
+        _compare(report, opts.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measure time-to-first-answer of a fresh process, cold (no snapshot file) and
+warm (snapshot file written by the previous run), like Cursor restarting the
+stdio server. Each run imports the package and answers one tool call.
+
+    uv run python benchmarks/warm_start.py --schema public --runs 3
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+_CHILD = """
+import asyncio, time
+start = time.perf_counter()
+from supabase_schema_mcp.tools import schema
+from supabase_schema_mcp import db
+imported = time.perf_counter()
+
+async def main():
+    await schema.list_columns({schema!r})
+    done = time.perf_counter()
+    print((imported - start) * 1000, (done - imported) * 1000)
+    await db.close_pool()
+
+asyncio.run(main())
+"""
+
+
+def _first_answer_ms(schema: str, cache_file: Path) -> tuple[float, float]:
+    """(import ms, first tool call ms) of a fresh interpreter."""
+    env = {**os.environ, "SCHEMA_CACHE_FILE": str(cache_file)}
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(schema=schema)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    import_ms, call_ms = out.stdout.strip().splitlines()[-1].split()
+    return float(import_ms), float(call_ms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--schema", default="public")
+    parser.add_argument("--runs", type=int, default=3)
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = Path(tmp) / "snapshots.sqlite3"
+        for run in range(opts.runs):
+            cache_file.unlink(missing_ok=True)
+            imp, cold = _first_answer_ms(opts.schema, cache_file)
+            _, warm = _first_answer_ms(opts.schema, cache_file)
+            print(
+                f"run {run + 1}: import {imp:7.1f} ms   first call cold"
+                f" {cold:8.1f} ms   warm {warm:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
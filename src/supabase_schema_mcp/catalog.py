@@ -0,0 +1,576 @@
+"""
+Bulk catalog loader that builds the in-memory schema model with one
+statement: every section's rows come back as JSON from a single query.
+"""
+
+import json
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+from supabase_schema_mcp.db import fetch_all, fetch_one
+
+Rows = list[dict[str, Any]]
+
+
+@dataclass
+class SchemaSnapshot:
+    """
+    Introspection model for one schema (or every user schema for 'all').
+    Each section holds the rows the matching tool renders, in tool output order.
+    """
+
+    schema: str
+    tables: Rows = field(default_factory=list)
+    columns: Rows = field(default_factory=list)
+    views: Rows = field(default_factory=list)
+    enums: Rows = field(default_factory=list)
+    policies: Rows = field(default_factory=list)
+    rls_coverage: Rows = field(default_factory=list)
+    functions: Rows = field(default_factory=list)
+    foreign_keys: Rows = field(default_factory=list)
+    constraints: Rows = field(default_factory=list)
+    indexes: Rows = field(default_factory=list)
+    triggers: Rows = field(default_factory=list)
+
+    @classmethod
+    def merge(cls, schema: str, snapshots: list["SchemaSnapshot"]) -> "SchemaSnapshot":
+        """Concatenate per-schema snapshots (already in schema order) into one."""
+        merged = cls(schema)
+        for name in SECTIONS:
+            section: Rows = getattr(merged, name)
+            for snapshot in snapshots:
+                section.extend(getattr(snapshot, name))
+        return merged
+
+
+SECTIONS: tuple[str, ...] = tuple(
+    f.name for f in fields(SchemaSnapshot) if f.name != "schema"
+)
+
+
+def schema_predicate(column: str, schema_name: str) -> tuple[str, tuple]:
+    """SQL predicate and args restricting `column` to one schema or all user schemas."""
+    if schema_name == "all":
+        return (
+            f"AND {column} NOT IN ('pg_catalog', 'information_schema') "
+            f"AND {column} !~ '^pg_(toast|temp_|toast_temp_)'"
+        ), ()
+    return f"AND {column} = $1", (schema_name,)
+
+
+_FK_ACTIONS = {
+    "a": "NO ACTION",
+    "r": "RESTRICT",
+    "c": "CASCADE",
+    "n": "SET NULL",
+    "d": "SET DEFAULT",
+}
+
+
+_CONSTRAINT_TYPES = {
+    "p": "PRIMARY KEY",
+    "u": "UNIQUE",
+    "c": "CHECK",
+    "x": "EXCLUDE",
+}
+
+
+# pg_trigger.tgtype event bits, in information_schema.triggers order.
+_TRIGGER_EVENTS = ((4, "INSERT"), (8, "DELETE"), (16, "UPDATE"), (32, "TRUNCATE"))
+
+
+def _volatility_str(v: str | None) -> str:
+    """Map pg_proc.provolatile to string."""
+    mapping = {"i": "IMMUTABLE", "s": "STABLE", "v": "VOLATILE"}
+    return mapping.get(v or "", v or "unknown")
+
+
+def _polcmd_to_str(cmd: str | None) -> str:
+    """Map pg_policy.polcmd to human-readable command."""
+    if cmd is None:
+        return "ALL"
+    return {"r": "SELECT", "a": "INSERT", "w": "UPDATE", "d": "DELETE", "*": "ALL"}.get(
+        cmd, str(cmd)
+    )
+
+
+# Each section is a catalog query (restricted to a schema through
+# {schema_filter} on n.nspname) and a function turning its rows into the
+# section rows; load_snapshots sends every query in one statement.
+
+_TABLES_SQL = """
+    SELECT n.nspname AS schema_name, c.relname AS table_name
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p')
+    {schema_filter}
+    ORDER BY n.nspname, c.relname
+"""
+
+
+def _tables(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    return [
+        {"schema": r["schema_name"], "table": r["table_name"], "type": "BASE TABLE"}
+        for r in rows
+    ]
+
+
+# data_type mirrors information_schema.columns; full_type adds typmods,
+# array element types and user-defined type names via format_type.
+_COLUMNS_SQL = """
+    SELECT n.nspname AS schema_name, c.relname AS table_name,
+           a.attname AS column_name, a.attnum AS position,
+           CASE
+               WHEN t.typtype = 'd' THEN
+                   CASE
+                       WHEN bt.typelem <> 0 AND bt.typlen = -1 THEN 'ARRAY'
+                       WHEN bt.typnamespace = 'pg_catalog'::regnamespace
+                           THEN format_type(t.typbasetype, NULL)
+                       ELSE 'USER-DEFINED'
+                   END
+               WHEN t.typelem <> 0 AND t.typlen = -1 THEN 'ARRAY'
+               WHEN t.typnamespace = 'pg_catalog'::regnamespace
+                   THEN format_type(a.atttypid, NULL)
+               ELSE 'USER-DEFINED'
+           END AS data_type,
+           format_type(a.atttypid, a.atttypmod) AS full_type,
+           NOT (a.attnotnull OR (t.typtype = 'd' AND t.typnotnull))
+               AS is_nullable,
+           CASE WHEN a.attgenerated = ''
+               THEN pg_get_expr(ad.adbin, ad.adrelid)
+           END AS column_default
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_type t ON t.oid = a.atttypid
+    LEFT JOIN pg_type bt ON t.typtype = 'd' AND bt.oid = t.typbasetype
+    LEFT JOIN pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+    WHERE c.relkind IN ('r', 'v', 'f', 'p')
+      AND a.attnum > 0 AND NOT a.attisdropped
+    {schema_filter}
+    ORDER BY n.nspname, c.relname, a.attnum
+"""
+
+
+def _columns(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    return [
+        {
+            "schema": r["schema_name"],
+            "table": r["table_name"],
+            "column": r["column_name"],
+            "position": r["position"],
+            "data_type": r["data_type"],
+            "full_type": r["full_type"],
+            "nullable": r["is_nullable"],
+            "default": r["column_default"],
+        }
+        for r in rows
+    ]
+
+
+_VIEWS_SQL = """
+    SELECT n.nspname AS schema_name, c.relname AS view_name,
+           pg_get_viewdef(c.oid) AS view_definition
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind = 'v'
+    {schema_filter}
+    ORDER BY n.nspname, c.relname
+"""
+
+
+def _views(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    result = []
+    for r in rows:
+        full_def = r["view_definition"] or ""
+        preview = full_def[:500] + ("..." if len(full_def) > 500 else "")
+        result.append({
+            "schema": r["schema_name"],
+            "view": r["view_name"],
+            "definition_preview": preview,
+        })
+    return result
+
+
+_ENUMS_SQL = """
+    SELECT n.nspname AS schema_name, t.typname AS enum_name,
+           array_agg(e.enumlabel ORDER BY e.enumsortorder) AS enum_labels
+    FROM pg_type t
+    JOIN pg_enum e ON t.oid = e.enumtypid
+    JOIN pg_catalog.pg_namespace n ON n.oid = t.typnamespace
+    WHERE t.typtype = 'e'
+    {schema_filter}
+    GROUP BY n.nspname, t.typname
+    ORDER BY n.nspname, t.typname
+"""
+
+
+def _enums(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    return [
+        {
+            "schema": r["schema_name"],
+            "enum": r["enum_name"],
+            "labels": list(r["enum_labels"]) if r["enum_labels"] else [],
+        }
+        for r in rows
+    ]
+
+
+_POLICIES_SQL = """
+    SELECT n.nspname AS schema_name, c.relname AS table_name,
+           p.polname AS policy_name, p.polcmd::text AS command,
+            CASE p.polpermissive
+                WHEN true THEN 'PERMISSIVE' ELSE 'RESTRICTIVE'
+            END AS type,
+           pg_get_expr(p.polqual, p.polrelid) AS using_expr,
+           pg_get_expr(p.polwithcheck, p.polrelid) AS with_check_expr
+    FROM pg_policy p
+    JOIN pg_class c ON c.oid = p.polrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind = 'r'
+    {schema_filter}
+    ORDER BY n.nspname, c.relname, p.polname
+"""
+
+
+def _policies(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    return [
+        {
+            "schema": r["schema_name"],
+            "table": r["table_name"],
+            "policy": r["policy_name"],
+            "command": _polcmd_to_str(r["command"]),
+            "type": r["type"],
+            "using": r["using_expr"],
+            "with_check": r["with_check_expr"],
+        }
+        for r in rows
+    ]
+
+
+_RLS_COVERAGE_SQL = """
+    SELECT n.nspname AS schema_name, c.relname AS table_name,
+           c.relrowsecurity AS rls_enabled,
+            (SELECT count(*) FROM pg_policy p WHERE p.polrelid = c.oid)
+                AS policy_count
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind = 'r'
+    {schema_filter}
+    ORDER BY n.nspname, c.relname
+"""
+
+
+def _rls_coverage(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    return [
+        {
+            "schema": r["schema_name"],
+            "table": r["table_name"],
+            "rls_enabled": r["rls_enabled"],
+            "policy_count": r["policy_count"],
+        }
+        for r in rows
+    ]
+
+
+_FUNCTIONS_SQL = """
+    SELECT n.nspname AS schema_name, p.proname AS function_name,
+           pg_get_function_arguments(p.oid) AS arguments,
+           pg_get_function_result(p.oid) AS return_type,
+           p.prosecdef AS security_definer,
+           p.provolatile::text AS volatility
+    FROM pg_proc p
+    JOIN pg_namespace n ON n.oid = p.pronamespace
+    WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+    {schema_filter}
+    ORDER BY n.nspname, p.proname
+"""
+
+
+def _functions(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    return [
+        {
+            "schema": r["schema_name"],
+            "function": r["function_name"],
+            "arguments": r["arguments"],
+            "return_type": r["return_type"],
+            "security_definer": r["security_definer"],
+            "volatility": _volatility_str(r["volatility"]),
+        }
+        for r in rows
+    ]
+
+
+# One row per (from_column, to_column) pair, matched by key position so
+# composite keys do not fan out into a cross product.
+_FOREIGN_KEYS_SQL = """
+    SELECT n.nspname AS from_schema, c.relname AS from_table,
+           fa.attname AS from_column,
+           rn.nspname AS to_schema, rc.relname AS to_table,
+           ra.attname AS to_column,
+           con.conname AS constraint_name, k.position,
+           con.confupdtype::text AS update_type,
+           con.confdeltype::text AS delete_type
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_class rc ON rc.oid = con.confrelid
+    JOIN pg_namespace rn ON rn.oid = rc.relnamespace
+    CROSS JOIN LATERAL unnest(con.conkey, con.confkey)
+        WITH ORDINALITY AS k(from_attnum, to_attnum, position)
+    JOIN pg_attribute fa
+        ON fa.attrelid = con.conrelid AND fa.attnum = k.from_attnum
+    JOIN pg_attribute ra
+        ON ra.attrelid = con.confrelid AND ra.attnum = k.to_attnum
+    WHERE con.contype = 'f'
+    {schema_filter}
+    ORDER BY n.nspname, c.relname, con.conname, k.position
+"""
+
+
+def _foreign_keys(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    return [
+        {
+            "from_schema": r["from_schema"],
+            "from_table": r["from_table"],
+            "from_column": r["from_column"],
+            "to_schema": r["to_schema"],
+            "to_table": r["to_table"],
+            "to_column": r["to_column"],
+            "constraint_name": r["constraint_name"],
+            "position": r["position"],
+            "on_update": _FK_ACTIONS.get(r["update_type"], r["update_type"]),
+            "on_delete": _FK_ACTIONS.get(r["delete_type"], r["delete_type"]),
+        }
+        for r in rows
+    ]
+
+
+# Table constraints other than foreign keys, which have their own section.
+_CONSTRAINTS_SQL = """
+    SELECT n.nspname AS schema_name, c.relname AS table_name,
+           con.conname AS constraint_name, con.contype::text AS type,
+           ARRAY(
+               SELECT a.attname
+               FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, position)
+               JOIN pg_attribute a
+                   ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+               ORDER BY k.position
+           ) AS columns,
+           pg_get_constraintdef(con.oid) AS definition,
+           con.condeferrable AS deferrable, con.convalidated AS validated
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE con.contype IN ('p', 'u', 'c', 'x')
+    {schema_filter}
+    ORDER BY n.nspname, c.relname, con.conname
+"""
+
+
+def _constraints(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    return [
+        {
+            "schema": r["schema_name"],
+            "table": r["table_name"],
+            "constraint": r["constraint_name"],
+            "type": _CONSTRAINT_TYPES.get(r["type"], r["type"]),
+            "columns": list(r["columns"]),
+            "definition": r["definition"],
+            "deferrable": r["deferrable"],
+            "validated": r["validated"],
+        }
+        for r in rows
+    ]
+
+
+# Key columns in index order, aggregated in SQL so the order does not depend
+# on how the rows reach the client.
+_INDEXES_SQL = """
+    SELECT n.nspname AS schema_name, c.relname AS table_name,
+           i.relname AS index_name,
+           ARRAY(
+               SELECT a.attname
+               FROM unnest(ix.indkey) WITH ORDINALITY AS k(attnum, position)
+               JOIN pg_attribute a
+                   ON a.attrelid = c.oid AND a.attnum = k.attnum
+               WHERE NOT a.attisdropped
+               ORDER BY k.position
+           ) AS columns,
+           ix.indisunique AS is_unique, ix.indisprimary AS is_primary,
+           pg_get_indexdef(ix.indexrelid) AS definition
+    FROM pg_index ix
+    JOIN pg_class i ON i.oid = ix.indexrelid
+    JOIN pg_class c ON c.oid = ix.indrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'm')
+    {schema_filter}
+    ORDER BY n.nspname, c.relname, i.relname
+"""
+
+
+def _indexes(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    # Expression-only indexes have no key columns and are left out.
+    return [
+        {
+            "schema": r["schema_name"],
+            "table": r["table_name"],
+            "index": r["index_name"],
+            "columns": list(r["columns"]),
+            "is_unique": r["is_unique"],
+            "is_primary": r["is_primary"],
+            "definition": r["definition"],
+        }
+        for r in rows
+        if r["columns"]
+    ]
+
+
+# One row per trigger event, like information_schema.triggers (plus
+# TRUNCATE, which information_schema omits). Events are expanded here so
+# pg_get_triggerdef runs once per trigger rather than once per event.
+_TRIGGERS_SQL = """
+    SELECT n.nspname AS schema_name, c.relname AS table_name,
+           t.tgname AS trigger_name, t.tgtype::int AS tgtype,
+           substring(
+               pg_get_triggerdef(t.oid) FROM 'EXECUTE (?:FUNCTION|PROCEDURE) .*$'
+           ) AS action_statement
+    FROM pg_trigger t
+    JOIN pg_class c ON c.oid = t.tgrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE NOT t.tgisinternal
+    {schema_filter}
+    ORDER BY n.nspname, c.relname, t.tgname
+"""
+
+
+def _triggers(rows: Iterable[Mapping[str, Any]]) -> Rows:
+    result = []
+    for r in rows:
+        tgtype = r["tgtype"]
+        if tgtype & 2:
+            timing = "BEFORE"
+        elif tgtype & 64:
+            timing = "INSTEAD OF"
+        else:
+            timing = "AFTER"
+        for bit, event in _TRIGGER_EVENTS:
+            if tgtype & bit:
+                result.append({
+                    "schema": r["schema_name"],
+                    "table": r["table_name"],
+                    "trigger": r["trigger_name"],
+                    "timing": timing,
+                    "event": event,
+                    "orientation": "ROW" if tgtype & 1 else "STATEMENT",
+                    "action": r["action_statement"],
+                })
+    return result
+
+
+RowConverter = Callable[[Iterable[Mapping[str, Any]]], Rows]
+
+_SECTION_QUERIES: dict[str, tuple[str, RowConverter]] = {
+    "tables": (_TABLES_SQL, _tables),
+    "columns": (_COLUMNS_SQL, _columns),
+    "views": (_VIEWS_SQL, _views),
+    "enums": (_ENUMS_SQL, _enums),
+    "policies": (_POLICIES_SQL, _policies),
+    "rls_coverage": (_RLS_COVERAGE_SQL, _rls_coverage),
+    "functions": (_FUNCTIONS_SQL, _functions),
+    "foreign_keys": (_FOREIGN_KEYS_SQL, _foreign_keys),
+    "constraints": (_CONSTRAINTS_SQL, _constraints),
+    "indexes": (_INDEXES_SQL, _indexes),
+    "triggers": (_TRIGGERS_SQL, _triggers),
+}
+
+
+def _section_loader(name: str) -> Callable[[str], Awaitable[Rows]]:
+    query, convert = _SECTION_QUERIES[name]
+
+    async def load(schema_name: str) -> Rows:
+        schema_filter, args = schema_predicate("n.nspname", schema_name)
+        rows = await fetch_all(query.format(schema_filter=schema_filter), *args)
+        return convert(rows)
+
+    load.__name__ = f"_load_{name}"
+    return load
+
+
+# One section on its own (one query per call), for callers that need a
+# single section and for measuring the queries separately.
+_LOADERS: dict[str, Callable[[str], Awaitable[Rows]]] = {
+    name: _section_loader(name) for name in _SECTION_QUERIES
+}
+
+
+def snapshot_query(schema_name: str) -> tuple[str, tuple]:
+    """
+    The statement that loads every section for one schema (or 'all'): one
+    row with a JSON array of each section's rows, so a cold load is a single
+    round trip on a single pool connection.
+    """
+    schema_filter, args = schema_predicate("n.nspname", schema_name)
+    columns = ",\n".join(
+        f"(SELECT coalesce(json_agg(q), '[]') FROM ("
+        f"{query.format(schema_filter=schema_filter)}) q) AS {name}"
+        for name, (query, _) in _SECTION_QUERIES.items()
+    )
+    return f"SELECT {columns}", args
+
+
+_EVENT_ORDER = {event: i for i, (_, event) in enumerate(_TRIGGER_EVENTS)}
+
+# Sort key of each section: rows are kept in this order, which is also the
+# keyset used for pagination, (schema, table, name[, tiebreak]).
+SECTION_KEYS: dict[str, Callable[[dict[str, Any]], tuple]] = {
+    "tables": lambda r: (r["schema"], r["table"]),
+    "columns": lambda r: (r["schema"], r["table"], r["position"]),
+    "views": lambda r: (r["schema"], r["view"]),
+    "enums": lambda r: (r["schema"], r["enum"]),
+    "policies": lambda r: (r["schema"], r["table"], r["policy"]),
+    "rls_coverage": lambda r: (r["schema"], r["table"]),
+    "functions": lambda r: (r["schema"], r["function"], r["arguments"]),
+    "foreign_keys": lambda r: (
+        r["from_schema"],
+        r["from_table"],
+        r["constraint_name"],
+        r["position"],
+    ),
+    "constraints": lambda r: (r["schema"], r["table"], r["constraint"]),
+    "indexes": lambda r: (r["schema"], r["table"], r["index"]),
+    "triggers": lambda r: (
+        r["schema"],
+        r["table"],
+        r["trigger"],
+        _EVENT_ORDER[r["event"]],
+    ),
+}
+
+
+def _row_schema(row: dict[str, Any]) -> str:
+    """Schema a section row belongs to (foreign keys are owned by the from-table)."""
+    return row["schema"] if "schema" in row else row["from_schema"]
+
+
+async def load_snapshots(schema_name: str) -> dict[str, SchemaSnapshot]:
+    """
+    Load every section for one schema (or 'all') with a single statement
+    (see snapshot_query). Returns one snapshot per schema that has objects,
+    keyed by schema name, in schema order.
+    """
+    query, args = snapshot_query(schema_name)
+    row = await fetch_one(query, *args)
+    assert row is not None
+    snapshots: dict[str, SchemaSnapshot] = {}
+    for name in SECTIONS:
+        rows = _SECTION_QUERIES[name][1](json.loads(row[name]))
+        rows.sort(key=SECTION_KEYS[name])
+        for section_row in rows:
+            key = _row_schema(section_row)
+            snapshot = snapshots.get(key)
+            if snapshot is None:
+                snapshot = snapshots[key] = SchemaSnapshot(key)
+            getattr(snapshot, name).append(section_row)
+    return {key: snapshots[key] for key in sorted(snapshots)}
@@ -0,0 +1,69 @@
+"""
+Single-flight tool calls: concurrent identical calls (same tool, arguments
+and target) share one run, so one database query and one serialized result.
+"""
+
+import asyncio
+import functools
+import json
+from collections.abc import Awaitable, Callable
+from typing import Any, ParamSpec
+
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.targets import get_target
+
+P = ParamSpec("P")
+
+# (tool, target, JSON arguments)
+CallKey = tuple[str, str, str]
+
+_inflight: dict[CallKey, asyncio.Task[str]] = {}
+_runs = 0
+_coalesced = 0
+
+
+def call_key(tool: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> CallKey:
+    """Identify a call of `tool` by its arguments and the current target."""
+    arguments = json.dumps([args, kwargs], sort_keys=True, default=str)
+    return tool, get_target().name, arguments
+
+
+def _finished(key: CallKey, task: asyncio.Task[str]) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+
+
+def coalesced(fn: Callable[P, Awaitable[str]]) -> Callable[P, Awaitable[str]]:
+    """
+    Join a running identical call instead of starting another. The call runs
+    in its own task, so a caller that is cancelled does not cancel it for the
+    others. Nothing is kept once it finishes. Apply inside @targeted.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> str:
+        global _runs, _coalesced
+        if not get_settings().coalesce_calls:
+            return await fn(*args, **kwargs)
+        key = call_key(fn.__name__, args, kwargs)
+        task = _inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            _inflight[key] = task
+            task.add_done_callback(functools.partial(_finished, key))
+            _runs += 1
+        else:
+            _coalesced += 1
+        return await asyncio.shield(task)
+
+    return wrapper
+
+
+def coalesce_stats() -> dict[str, Any]:
+    """Calls running now, calls that ran, and calls that joined a running one."""
+    return {
+        "enabled": get_settings().coalesce_calls,
+        "in_flight": len(_inflight),
+        "runs": _runs,
+        "coalesced": _coalesced,
+    }
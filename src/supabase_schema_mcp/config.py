@@ -2,13 +2,12 @@
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from dotenv import load_dotenv
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-load_dotenv()
-
 
 class Settings(BaseSettings):
     """Supabase and database connection settings."""
@@ -22,16 +21,189 @@ class Settings(BaseSettings):
     supabase_project_ref: str = Field(default="", description="Project reference ID")
     supabase_service_role_key: str = Field(default="", description="Service role key")
 
+    management_api_url: str = Field(
+        default="https://api.supabase.com/v1",
+        description="Management API base URL",
+    )
+    management_api_cache_ttl: float = Field(
+        default=300.0,
+        description="Seconds a Management API response is served before revalidating",
+    )
+    management_api_retries: int = Field(
+        default=3,
+        description="Retries on 429, 5xx and connection errors (with backoff)",
+    )
+    management_api_timeout: float = Field(
+        default=15.0, description="Seconds per Management API request"
+    )
+    management_api_http2: bool = Field(
+        default=True,
+        description="Use HTTP/2 when the h2 package is installed",
+    )
+
     supabase_db_host: str = Field(default="", description="Postgres host")
     supabase_db_port: int = Field(default=5432, description="Postgres port")
     supabase_db_name: str = Field(default="postgres", description="Database name")
     supabase_db_user: str = Field(default="", description="Database user")
     supabase_db_password: str = Field(default="", description="Database password")
 
+    transport: Literal["stdio", "streamable-http", "sse"] = Field(
+        default="stdio",
+        description="MCP transport: stdio (one client) or HTTP (shared server)",
+    )
+    http_host: str = Field(default="127.0.0.1", description="HTTP bind address")
+    http_port: int = Field(default=8000, description="HTTP port")
+    http_allowed_hosts: str = Field(
+        default="",
+        description="Comma-separated extra Host names clients may use over HTTP",
+    )
+    http_disable_host_check: bool = Field(
+        default=False,
+        description="Accept any Host and Origin header (no DNS rebinding protection)",
+    )
+    http_shutdown_timeout: float = Field(
+        default=10.0,
+        description="Seconds to let running requests finish on shutdown",
+    )
+    startup_banner: Literal["auto", "always", "never"] = Field(
+        default="auto",
+        description="Print the startup panels: auto only when stderr is a terminal",
+    )
+    client_max_concurrent_calls: int = Field(
+        default=4,
+        description="Tool calls one client runs at once; more wait (0: no limit)",
+    )
+    coalesce_calls: bool = Field(
+        default=True,
+        description="Let concurrent identical tool calls share one run and result",
+    )
+
+    targets: str = Field(
+        default="",
+        description=(
+            "Comma-separated extra target names, each read from "
+            "<NAME>_SUPABASE_DB_* variables"
+        ),
+    )
+    targets_file: str = Field(
+        default="",
+        description="JSON file of extra targets: {name: {host, port, ...}}",
+    )
+    default_target: str = Field(
+        default="default",
+        description="Target used when a tool call does not name one",
+    )
+
     db_read_only: bool = Field(
         default=True,
         description="If True, set default_transaction_read_only on connections",
     )
+    db_pool_min_size: int = Field(
+        default=1,
+        description="Connections the pool opens up front (and keeps open)",
+    )
+    db_pool_max_size: int = Field(default=5, description="Most pooled connections")
+    db_max_pools: int = Field(
+        default=4,
+        description="Most targets with an open pool; idle pools beyond it close LRU",
+    )
+    db_pool_warmup: bool = Field(
+        default=True,
+        description="Open the pool's min_size connections when the server starts",
+    )
+    db_command_timeout: float = Field(
+        default=30.0,
+        description="Seconds before a query is cancelled client-side",
+    )
+    db_statement_cache_size: int | None = Field(
+        default=None,
+        description=(
+            "Prepared statements cached per connection; unset means 100, "
+            "or 0 behind a transaction-mode pooler"
+        ),
+    )
+    db_migration_safe: bool = Field(
+        default=False,
+        description=(
+            "Set lock_timeout and per-tool statement_timeout on connections and "
+            "serve the last result, marked stale, when either fires"
+        ),
+    )
+    db_lock_timeout: float = Field(
+        default=1.0,
+        description="Seconds a query waits for a lock in migration-safe mode",
+    )
+    db_statement_timeout: float = Field(
+        default=10.0,
+        description="Seconds a statement may run in migration-safe mode",
+    )
+    db_statement_timeouts: dict[str, float] = Field(
+        default={"schema_export_ddl": 120.0},
+        description="Per-tool statement timeouts (seconds) by tool name, as JSON",
+    )
+
+    schema_cache_enabled: bool = Field(
+        default=True,
+        description="Serve repeated tool calls from the in-process schema snapshot",
+    )
+    schema_cache_revalidate_seconds: float = Field(
+        default=2.0,
+        description="Minimum seconds between catalog fingerprint checks",
+    )
+    schema_cache_persist: bool = Field(
+        default=True,
+        description="Persist snapshots to disk so restarts start warm",
+    )
+    schema_cache_file: str = Field(
+        default="",
+        description="SQLite snapshot file (default: user cache directory)",
+    )
+    schema_cache_max_targets: int = Field(
+        default=8,
+        description="Most targets whose snapshots are kept in memory (LRU)",
+    )
+    schema_cache_notify: bool = Field(
+        default=False,
+        description="Invalidate on DDL notifications instead of polling, if available",
+    )
+    schema_cache_notify_poll_seconds: float = Field(
+        default=300.0,
+        description="Seconds between safety fingerprint checks while listening",
+    )
+    schema_cache_notify_install: bool = Field(
+        default=False,
+        description="Install the DDL notify event trigger if it is missing",
+    )
+    stats_cache_ttl: float = Field(
+        default=30.0,
+        description="Seconds table and index usage statistics are served from cache",
+    )
+    ddl_export_dir: str = Field(
+        default="",
+        description="Directory schema_export_ddl may write files to (empty: none)",
+    )
+
+    page_size_max: int = Field(
+        default=1000,
+        description="Most rows a list tool returns per call; larger results page",
+    )
+    output_format: Literal["json", "compact", "columnar", "grouped"] = Field(
+        default="json",
+        description="Default tool output format when a call does not pass one",
+    )
+
+    metrics_enabled: bool = Field(
+        default=True,
+        description="Record per-tool latency, query and payload metrics",
+    )
+    metrics_window: int = Field(
+        default=1024,
+        description="Most recent samples per measure kept for percentiles",
+    )
+    metrics_slow_call_ms: float = Field(
+        default=0.0,
+        description="Log tool calls slower than this to stderr (0 disables)",
+    )
 
     @property
     def db_connection_configured(self) -> bool:
@@ -51,7 +223,11 @@ class Settings(BaseSettings):
 
 @lru_cache
 def get_settings() -> Settings:
-    """Cached settings instance (loads .env once)."""
+    """
+    Cached settings instance. Loads .env into the environment on first call
+    (not at import), for the prefixed target variables read by targets.py.
+    """
+    load_dotenv()
     return Settings()
 
 
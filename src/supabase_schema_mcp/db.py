@@ -1,14 +1,36 @@
 """Asyncpg connection pool management and read-only role enforcement."""
 
 import asyncio
+import json
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 from typing import Any, cast
 
 import asyncpg
 
 from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.metrics import record_query
+from supabase_schema_mcp.targets import DEFAULT_TARGET, Target, get_target
+from supabase_schema_mcp.timeouts import (
+    default_statement_timeout,
+    lock_timeout,
+    statement_timeout,
+)
 
-_pool: asyncpg.Pool | None = None
+# One pool per target, least recently used first.
+_pools: OrderedDict[str, asyncpg.Pool] = OrderedDict()
 _pool_lock = asyncio.Lock()
+_listeners: dict[str, asyncpg.Connection] = {}
+
+# Supavisor's transaction mode (and PgBouncer's) listens on 6543 and may run
+# each statement on a different server connection, so named prepared
+# statements cannot be reused there. Session mode (5432) keeps them working.
+_TRANSACTION_POOLER_PORT = 6543
+_SUPAVISOR_HOST_SUFFIX = ".pooler.supabase.com"
+_DEFAULT_STATEMENT_CACHE_SIZE = 100
 
 
 async def _init_connection(conn: asyncpg.Connection) -> None:
@@ -18,57 +40,279 @@ async def _init_connection(conn: asyncpg.Connection) -> None:
         await conn.execute("SET default_transaction_read_only = on")
 
 
-async def get_pool() -> asyncpg.Pool:
-    """Return the shared asyncpg pool, creating it on first use."""
-    global _pool
-    async with _pool_lock:
-        if _pool is not None:
-            return _pool
-        settings = get_settings()
-        if not settings.db_connection_configured:
+async def _setup_connection(conn: asyncpg.Connection) -> None:
+    """
+    In migration-safe mode behind a transaction pooler (which gets no startup
+    parameters), apply lock_timeout and the running tool's statement_timeout
+    on every acquire.
+    """
+    await conn.execute(
+        "SELECT set_config('lock_timeout', $1, false),"
+        " set_config('statement_timeout', $2, false)",
+        lock_timeout(),
+        statement_timeout(),
+    )
+
+
+async def _setup_tool_timeout(conn: asyncpg.Connection) -> None:
+    """
+    In migration-safe mode, apply the running tool's statement_timeout when
+    it differs from the connection's startup value; the pool's RESET ALL on
+    release restores that value.
+    """
+    timeout = statement_timeout()
+    if timeout != default_statement_timeout():
+        await conn.execute("SELECT set_config('statement_timeout', $1, false)", timeout)
+
+
+def uses_transaction_pooler(host: str, port: int) -> bool:
+    """True if host/port point at a transaction-mode pooler."""
+    if port == _TRANSACTION_POOLER_PORT:
+        return True
+    return host.endswith(_SUPAVISOR_HOST_SUFFIX) and port != 5432
+
+
+def statement_cache_size(target: Target) -> int:
+    """Prepared-statement cache size: the setting, else 0 only behind a pooler."""
+    settings = get_settings()
+    if settings.db_statement_cache_size is not None:
+        return settings.db_statement_cache_size
+    if uses_transaction_pooler(target.host, target.port):
+        return 0
+    return _DEFAULT_STATEMENT_CACHE_SIZE
+
+
+def _server_settings(target: Target) -> dict[str, str]:
+    """
+    Startup parameters of new connections: read-only mode, and migration-safe
+    mode's lock_timeout and default statement_timeout. They are the session
+    defaults the pool's RESET ALL on release returns to, so they hold for
+    every acquire at no round trip. Transaction poolers may reject unknown
+    startup parameters, so none are sent there.
+    """
+    if uses_transaction_pooler(target.host, target.port):
+        return {}
+    values = {}
+    if get_settings().db_read_only:
+        values["default_transaction_read_only"] = "on"
+    lock, statement = lock_timeout(), default_statement_timeout()
+    if lock is not None and statement is not None:
+        values.update(lock_timeout=lock, statement_timeout=statement)
+    return values
+
+
+def _pool_setup(target: Target) -> Callable[[asyncpg.Connection], Awaitable[None]]:
+    """Per-acquire callback of the target's pool in migration-safe mode."""
+    if uses_transaction_pooler(target.host, target.port):
+        return _setup_connection
+    return _setup_tool_timeout
+
+
+def _connect_kwargs(target: Target) -> dict[str, Any]:
+    """Connection parameters of `target`; raises if it is not configured."""
+    if not target.connection_configured:
+        if target.name == DEFAULT_TARGET:
             raise RuntimeError(
                 "Database not configured. Set SUPABASE_DB_HOST, SUPABASE_DB_USER, "
                 "SUPABASE_DB_PASSWORD (and optionally SUPABASE_DB_NAME, PORT) in .env"
             )
-        _pool = await asyncpg.create_pool(
-            host=settings.supabase_db_host,
-            port=settings.supabase_db_port,
-            database=settings.supabase_db_name,
-            user=settings.supabase_db_user,
-            password=settings.supabase_db_password,
-            min_size=1,
-            max_size=5,
+        raise RuntimeError(
+            f"Target {target.name!r} is missing host, user, password or database"
+        )
+    return {
+        "host": target.host,
+        "port": target.port,
+        "database": target.database,
+        "user": target.user,
+        "password": target.password,
+        "command_timeout": get_settings().db_command_timeout,
+        "statement_cache_size": statement_cache_size(target),
+        "server_settings": _server_settings(target),
+    }
+
+
+def _is_idle(pool: asyncpg.Pool) -> bool:
+    return pool.get_idle_size() == pool.get_size()
+
+
+async def _evict_pools(keep: str) -> None:
+    """
+    Close least recently used pools (and their listeners) until at most
+    db_max_pools remain. Pools with connections in use are skipped, so the
+    bound can be exceeded while every older target is busy.
+    """
+    excess = len(_pools) - max(1, get_settings().db_max_pools)
+    for name in list(_pools):
+        if excess <= 0:
+            break
+        if name == keep or not _is_idle(_pools[name]):
+            continue
+        pool = _pools.pop(name)
+        excess -= 1
+        await close_listener(name)
+        await pool.close()
+
+
+async def get_pool() -> asyncpg.Pool:
+    """
+    Return the asyncpg pool of the current target, creating it on first use.
+    Creating it opens `db_pool_min_size` connections (the first alone, the
+    rest in parallel) and may close the least recently used idle pool.
+    """
+    target = get_target()
+    async with _pool_lock:
+        pool = _pools.get(target.name)
+        if pool is not None:
+            _pools.move_to_end(target.name)
+            return pool
+        settings = get_settings()
+        pool = await asyncpg.create_pool(
+            **_connect_kwargs(target),
+            min_size=settings.db_pool_min_size,
+            max_size=max(settings.db_pool_max_size, settings.db_pool_min_size),
             init=_init_connection,
-            command_timeout=30,
-            statement_cache_size=0
+            setup=_pool_setup(target) if settings.db_migration_safe else None,
         )
-        return _pool
+        _pools[target.name] = pool
+        await _evict_pools(keep=target.name)
+        return pool
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """Size, idle connections and bounds of each open pool, by target."""
+    return {
+        name: {
+            "size": pool.get_size(),
+            "idle": pool.get_idle_size(),
+            "min_size": pool.get_min_size(),
+            "max_size": pool.get_max_size(),
+        }
+        for name, pool in _pools.items()
+    }
+
+
+async def warm_pool() -> None:
+    """Create the default target's pool ahead of the first tool call."""
+    try:
+        await get_pool()
+    except Exception as e:
+        print(f"supabase-schema-mcp: pool warm-up failed: {e}", file=sys.stderr)
 
 
 async def close_pool() -> None:
-    """Close the shared pool (e.g. on shutdown)."""
-    global _pool
+    """Close every pool and listener connection (e.g. on shutdown)."""
+    for name in list(_listeners):
+        await close_listener(name)
     async with _pool_lock:
-        if _pool is not None:
-            await _pool.close()
-            _pool = None
+        while _pools:
+            _, pool = _pools.popitem(last=False)
+            await pool.close()
+
+
+async def listen(
+    channel: str,
+    on_notify: Callable[[str], None],
+    on_lost: Callable[[], None],
+    setup: Callable[[asyncpg.Connection], Awaitable[None]] | None = None,
+) -> None:
+    """
+    Open the current target's dedicated LISTEN connection (outside the pool,
+    replacing any previous one), run `setup` on it, then call
+    `on_notify(payload)` for every notification on `channel` and `on_lost()`
+    if the connection drops or is closed with the target's pool.
+    """
+    target = get_target()
+    await close_listener(target.name)
+    conn = await asyncpg.connect(**_connect_kwargs(target))
+    try:
+        await _init_connection(conn)
+        if setup is not None:
+            await setup(conn)
+        await conn.add_listener(
+            channel, lambda _conn, _pid, _channel, payload: on_notify(payload)
+        )
+    except BaseException:
+        await conn.close()
+        raise
+    conn.add_termination_listener(lambda _conn: on_lost())
+    _listeners[target.name] = conn
+
+
+async def close_listener(name: str | None = None) -> None:
+    """Close the LISTEN connection of target `name` (default: current), if any."""
+    conn = _listeners.pop(name or get_target().name, None)
+    if conn is not None:
+        await conn.close()
 
 
 async def fetch_one(
     query: str,
     *args: Any,
 ) -> asyncpg.Record | None:
-    """Run a read-only query and return the first row. Uses shared pool."""
+    """Run a read-only query and return the first row. Uses the target's pool."""
     pool = await get_pool()
+    start = time.perf_counter()
     async with pool.acquire() as conn:
-        return await conn.fetchrow(query, *args)
+        acquired = time.perf_counter()
+        row = await conn.fetchrow(query, *args)
+        done = time.perf_counter()
+    rows = 0 if row is None else 1
+    record_query((acquired - start) * 1000, (done - acquired) * 1000, rows)
+    return row
 
 
 async def fetch_all(
     query: str,
     *args: Any,
 ) -> list[asyncpg.Record]:
-    """Run a read-only query and return all rows. Uses shared pool."""
+    """Run a read-only query and return all rows. Uses the target's pool."""
+    pool = await get_pool()
+    start = time.perf_counter()
+    async with pool.acquire() as conn:
+        acquired = time.perf_counter()
+        rows = cast(list[asyncpg.Record], await conn.fetch(query, *args))
+        done = time.perf_counter()
+    record_query((acquired - start) * 1000, (done - acquired) * 1000, len(rows))
+    return rows
+
+
+@asynccontextmanager
+async def consistent_read() -> AsyncIterator[asyncpg.Connection]:
+    """
+    A pooled connection inside a read-only REPEATABLE READ transaction, so
+    every query run on it sees the same snapshot of the catalog.
+    """
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            yield conn
+
+
+async def explain(
+    statement: str,
+    parameters: int = 0,
+    settings: dict[str, str] | None = None,
+) -> Any:
+    """
+    Return the EXPLAIN (FORMAT JSON, VERBOSE) output of one `statement`
+    without running it. It is planned in its own read-only transaction,
+    whatever db_read_only says, after applying `settings` (e.g. role,
+    request.jwt.claims) with set_config(..., is_local => true). A statement
+    with $1..$`parameters` is prepared and its generic plan explained.
+    """
     pool = await get_pool()
+    start = time.perf_counter()
     async with pool.acquire() as conn:
-        return cast(list[asyncpg.Record], await conn.fetch(query, *args))
+        acquired = time.perf_counter()
+        async with conn.transaction(readonly=True):
+            for name, value in (settings or {}).items():
+                await conn.execute("SELECT set_config($1, $2, true)", name, value)
+            if parameters:
+                await conn.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+                prepared = await conn.prepare(statement)
+                nulls = ", ".join(["NULL"] * parameters)
+                statement = f"EXECUTE {prepared.get_name()}({nulls})"
+            plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON, VERBOSE) {statement}")
+        done = time.perf_counter()
+    record_query((acquired - start) * 1000, (done - acquired) * 1000, 1)
+    return json.loads(plan)
@@ -0,0 +1,491 @@
+"""
+Schema-only DDL export: CREATE statements in dependency order, streamed from
+server-side cursors inside one consistent read-only transaction.
+"""
+
+import time
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TextIO
+
+from supabase_schema_mcp.catalog import schema_predicate
+from supabase_schema_mcp.db import consistent_read
+from supabase_schema_mcp.metrics import record_query
+from supabase_schema_mcp.output import decode_cursor, encode_cursor
+
+HEADER = (
+    "-- Schema DDL exported by supabase-schema-mcp\n"
+    "SET check_function_bodies = false;\n"
+)
+
+# Rows fetched per cursor round trip; memory stays bounded by this.
+_PREFETCH = 500
+
+
+def _not_extension(catalog: str, oid: str) -> str:
+    """Predicate excluding objects that belong to an extension."""
+    return (
+        f"NOT EXISTS (SELECT 1 FROM pg_depend x WHERE x.classid = '{catalog}'::regclass"
+        f" AND x.objid = {oid} AND x.deptype = 'e')"
+    )
+
+
+# Functions parsed at creation (BEGIN ATOMIC) or using a table's row type
+# must wait for the tables, and are ordered together with the views (either
+# can depend on the other); the rest go first so that defaults, checks and
+# policies can call them.
+_LATE_FUNCTION = """(
+    p.prosqlbody IS NOT NULL
+    OR EXISTS (
+        SELECT 1 FROM pg_depend d
+        JOIN pg_type ty ON ty.oid = d.refobjid
+        JOIN pg_class rc ON rc.oid = ty.typrelid AND rc.relkind <> 'c'
+        WHERE d.classid = 'pg_proc'::regclass AND d.objid = p.oid
+          AND d.refclassid = 'pg_type'::regclass
+    )
+)"""
+
+_FUNCTIONS = f"""
+    SELECT concat_ws(chr(1), n.nspname, p.proname,
+                     pg_get_function_identity_arguments(p.oid)) AS sort_key,
+           pg_get_functiondef(p.oid) || ';' AS ddl
+    FROM pg_proc p
+    JOIN pg_namespace n ON n.oid = p.pronamespace
+    WHERE p.prokind IN ('f', 'p') AND {{late}}{_LATE_FUNCTION}
+      AND {_not_extension("pg_proc", "p.oid")}
+      {{schema_filter}}
+"""
+
+_TABLE_CONSTRAINTS = f"""
+    SELECT concat_ws(chr(1), n.nspname, c.relname,
+                     CASE con.contype WHEN 'p' THEN '1' WHEN 'u' THEN '2'
+                                      WHEN 'x' THEN '3' ELSE '4' END,
+                     con.conname) AS sort_key,
+           format('ALTER TABLE %I.%I ADD CONSTRAINT %I %s;', n.nspname,
+                  c.relname, con.conname, pg_get_constraintdef(con.oid)) AS ddl
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE con.contype IN ({{types}}) AND con.conislocal AND con.conparentid = 0
+      AND c.relkind IN ('r', 'p') AND {_not_extension("pg_class", "c.oid")}
+      {{schema_filter}}
+"""
+
+
+@dataclass(frozen=True)
+class _Stage:
+    """One kind of statement: a query selecting (sort_key, ddl) rows."""
+
+    name: str
+    query: str  # with a {schema_filter} placeholder for n.nspname
+
+
+_STAGES: tuple[_Stage, ...] = (
+    _Stage(
+        "schemas",
+        """
+        SELECT n.nspname AS sort_key,
+               format('CREATE SCHEMA IF NOT EXISTS %I;', n.nspname) AS ddl
+        FROM pg_namespace n
+        WHERE true {schema_filter}
+        """,
+    ),
+    _Stage(
+        "extensions",
+        """
+        WITH RECURSIVE levels AS (  -- required extensions first
+            SELECT e.oid, 0 AS level FROM pg_extension e
+            UNION ALL
+            SELECT d.objid, levels.level + 1
+            FROM pg_depend d JOIN levels ON d.refobjid = levels.oid
+            WHERE d.classid = 'pg_extension'::regclass
+              AND d.refclassid = 'pg_extension'::regclass
+        )
+        SELECT concat_ws(chr(1), lpad(l.level::text, 3, '0'), e.extname) AS sort_key,
+               format('CREATE EXTENSION IF NOT EXISTS %I WITH SCHEMA %I;',
+                      e.extname, n.nspname) AS ddl
+        FROM (SELECT oid, max(level) AS level FROM levels GROUP BY oid) l
+        JOIN pg_extension e ON e.oid = l.oid
+        JOIN pg_namespace n ON n.oid = e.extnamespace
+        WHERE true {schema_filter}
+        """,
+    ),
+    _Stage(
+        "types",
+        f"""
+        SELECT concat_ws(chr(1), CASE t.typtype WHEN 'e' THEN '1'
+                                                WHEN 'd' THEN '2' ELSE '3' END,
+                         n.nspname, t.typname) AS sort_key,
+               CASE t.typtype
+               WHEN 'e' THEN format(
+                   'CREATE TYPE %I.%I AS ENUM (%s);', n.nspname, t.typname,
+                   (SELECT string_agg(quote_literal(e.enumlabel), ', '
+                                      ORDER BY e.enumsortorder)
+                    FROM pg_enum e WHERE e.enumtypid = t.oid))
+               WHEN 'd' THEN format(
+                   'CREATE DOMAIN %I.%I AS %s%s%s;', n.nspname, t.typname,
+                   format_type(t.typbasetype, t.typtypmod),
+                   coalesce(' DEFAULT ' || t.typdefault, ''),
+                   CASE WHEN t.typnotnull THEN ' NOT NULL' ELSE '' END)
+               ELSE format(
+                   E'CREATE TYPE %I.%I AS (\\n%s\\n);', n.nspname, t.typname,
+                   (SELECT string_agg(format('    %I %s', a.attname,
+                                             format_type(a.atttypid, a.atttypmod)),
+                                      E',\\n' ORDER BY a.attnum)
+                    FROM pg_attribute a
+                    WHERE a.attrelid = t.typrelid AND a.attnum > 0
+                      AND NOT a.attisdropped))
+               END AS ddl
+        FROM pg_type t
+        JOIN pg_namespace n ON n.oid = t.typnamespace
+        WHERE (t.typtype IN ('e', 'd')
+               OR EXISTS (SELECT 1 FROM pg_class c
+                          WHERE c.oid = t.typrelid AND c.relkind = 'c'))
+          AND {_not_extension("pg_type", "t.oid")}
+          {{schema_filter}}
+        """,
+    ),
+    _Stage(
+        "sequences",
+        f"""
+        SELECT concat_ws(chr(1), n.nspname, c.relname) AS sort_key,
+               format('CREATE SEQUENCE %I.%I AS %s INCREMENT BY %s MINVALUE %s '
+                      'MAXVALUE %s START WITH %s CACHE %s%s;',
+                      n.nspname, c.relname, format_type(s.seqtypid, NULL),
+                      s.seqincrement, s.seqmin, s.seqmax, s.seqstart, s.seqcache,
+                      CASE WHEN s.seqcycle THEN ' CYCLE' ELSE '' END) AS ddl
+        FROM pg_sequence s
+        JOIN pg_class c ON c.oid = s.seqrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE NOT EXISTS (  -- identity sequences come with their column
+                  SELECT 1 FROM pg_depend d
+                  WHERE d.classid = 'pg_class'::regclass AND d.objid = c.oid
+                    AND d.deptype = 'i')
+          AND {_not_extension("pg_class", "c.oid")}
+          {{schema_filter}}
+        """,
+    ),
+    _Stage("functions", _FUNCTIONS.replace("{late}", "NOT ")),
+    _Stage(  # domain checks may call the functions, which may take the domains
+        "domain_constraints",
+        f"""
+        SELECT concat_ws(chr(1), n.nspname, t.typname, con.conname) AS sort_key,
+               format('ALTER DOMAIN %I.%I ADD CONSTRAINT %I %s;', n.nspname,
+                      t.typname, con.conname, pg_get_constraintdef(con.oid)) AS ddl
+        FROM pg_constraint con
+        JOIN pg_type t ON t.oid = con.contypid
+        JOIN pg_namespace n ON n.oid = t.typnamespace
+        WHERE con.contype = 'c' AND {_not_extension("pg_type", "t.oid")}
+          {{schema_filter}}
+        """,
+    ),
+    _Stage(
+        "tables",
+        f"""
+        SELECT concat_ws(chr(1),
+                         lpad((SELECT count(*)  -- partitions after parents
+                               FROM pg_partition_ancestors(c.oid))::text, 3, '0'),
+                         n.nspname, c.relname) AS sort_key,
+               CASE WHEN c.relispartition THEN format(
+                   'CREATE TABLE %I.%I PARTITION OF %s %s%s;', n.nspname, c.relname,
+                   (SELECT i.inhparent::regclass::text FROM pg_inherits i
+                    WHERE i.inhrelid = c.oid),
+                   pg_get_expr(c.relpartbound, c.oid), partition_by)
+               ELSE format(
+                   E'CREATE %sTABLE %I.%I (\\n%s\\n)%s;',
+                   CASE WHEN c.relpersistence = 'u' THEN 'UNLOGGED ' ELSE '' END,
+                   n.nspname, c.relname, cols.defs, partition_by)
+               END AS ddl
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        CROSS JOIN LATERAL (
+            SELECT CASE WHEN c.relkind = 'p'
+                        THEN ' PARTITION BY ' || pg_get_partkeydef(c.oid)
+                        ELSE '' END AS partition_by
+        ) pb
+        CROSS JOIN LATERAL (
+            SELECT string_agg(format(
+                       '    %I %s%s%s%s', a.attname,
+                       format_type(a.atttypid, a.atttypmod),
+                       CASE WHEN a.attcollation <> ty.typcollation
+                            THEN ' COLLATE ' || a.attcollation::regcollation::text
+                            ELSE '' END,
+                       CASE WHEN a.attgenerated = 's'
+                            THEN ' GENERATED ALWAYS AS ('
+                                 || pg_get_expr(ad.adbin, ad.adrelid) || ') STORED'
+                            WHEN a.attidentity = 'a'
+                            THEN ' GENERATED ALWAYS AS IDENTITY'
+                            WHEN a.attidentity = 'd'
+                            THEN ' GENERATED BY DEFAULT AS IDENTITY'
+                            WHEN ad.adbin IS NOT NULL
+                            THEN ' DEFAULT ' || pg_get_expr(ad.adbin, ad.adrelid)
+                            ELSE '' END,
+                       CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE '' END),
+                   E',\\n' ORDER BY a.attnum) AS defs
+            FROM pg_attribute a
+            JOIN pg_type ty ON ty.oid = a.atttypid
+            LEFT JOIN pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+            WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+        ) cols
+        WHERE c.relkind IN ('r', 'p') AND {_not_extension("pg_class", "c.oid")}
+          {{schema_filter}}
+        """,
+    ),
+    _Stage(
+        "sequence_owners",
+        """
+        SELECT concat_ws(chr(1), n.nspname, s.relname) AS sort_key,
+               format('ALTER SEQUENCE %I.%I OWNED BY %I.%I.%I;', n.nspname,
+                      s.relname, tn.nspname, t.relname, a.attname) AS ddl
+        FROM pg_depend d
+        JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+        JOIN pg_namespace n ON n.oid = s.relnamespace
+        JOIN pg_class t ON t.oid = d.refobjid
+        JOIN pg_namespace tn ON tn.oid = t.relnamespace
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = d.refobjsubid
+        WHERE d.classid = 'pg_class'::regclass AND d.refclassid = 'pg_class'::regclass
+          AND d.deptype = 'a'
+          {schema_filter}
+        """,
+    ),
+    _Stage("constraints", _TABLE_CONSTRAINTS.replace("{types}", "'p', 'u', 'x', 'c'")),
+    _Stage(
+        "views_and_late_functions",
+        f"""
+        WITH RECURSIVE objects AS (
+            SELECT 'pg_class'::regclass::oid AS classid, c.oid AS objid
+            FROM pg_class c
+            WHERE c.relkind IN ('v', 'm') AND {_not_extension("pg_class", "c.oid")}
+            UNION ALL
+            SELECT 'pg_proc'::regclass::oid, p.oid
+            FROM pg_proc p
+            WHERE p.prokind IN ('f', 'p') AND {_LATE_FUNCTION}
+              AND {_not_extension("pg_proc", "p.oid")}
+        ), deps AS (  -- (object, view or function it needs)
+            SELECT 'pg_class'::regclass::oid AS classid, r.ev_class AS objid,
+                   d.refclassid, d.refobjid
+            FROM pg_rewrite r
+            JOIN pg_depend d ON d.classid = 'pg_rewrite'::regclass AND d.objid = r.oid
+            WHERE d.refobjid <> r.ev_class
+            UNION
+            SELECT d.classid, d.objid,  -- a row type stands for its relation
+                   CASE WHEN ty.typrelid > 0 THEN 'pg_class'::regclass::oid
+                        ELSE d.refclassid END,
+                   CASE WHEN ty.typrelid > 0 THEN ty.typrelid ELSE d.refobjid END
+            FROM pg_depend d
+            LEFT JOIN pg_type ty
+                ON d.refclassid = 'pg_type'::regclass AND ty.oid = d.refobjid
+            WHERE d.classid = 'pg_proc'::regclass AND d.refobjid <> d.objid
+        ), levels AS (
+            SELECT classid, objid, 0 AS level FROM objects
+            UNION ALL
+            SELECT deps.classid, deps.objid, levels.level + 1
+            FROM deps JOIN levels
+                ON deps.refclassid = levels.classid AND deps.refobjid = levels.objid
+        )
+        SELECT concat_ws(chr(1), lpad(l.level::text, 3, '0'), n.nspname,
+                         coalesce(c.relname, p.proname),
+                         pg_get_function_identity_arguments(p.oid)) AS sort_key,
+               CASE WHEN p.oid IS NOT NULL THEN pg_get_functiondef(p.oid) || ';'
+               ELSE format(E'CREATE %s %I.%I%s AS\\n%s%s;',
+                           CASE c.relkind WHEN 'v' THEN 'VIEW'
+                                          ELSE 'MATERIALIZED VIEW' END,
+                           n.nspname, c.relname,
+                           coalesce(' WITH (' || array_to_string(c.reloptions, ', ')
+                                    || ')', ''),
+                           rtrim(pg_get_viewdef(c.oid), ';'),
+                           CASE c.relkind WHEN 'm' THEN E'\\nWITH NO DATA'
+                                          ELSE '' END)
+               END AS ddl
+        FROM (SELECT classid, objid, max(level) AS level
+              FROM levels GROUP BY classid, objid) l
+        JOIN objects o ON o.classid = l.classid AND o.objid = l.objid
+        LEFT JOIN pg_class c ON l.classid = 'pg_class'::regclass AND c.oid = l.objid
+        LEFT JOIN pg_proc p ON l.classid = 'pg_proc'::regclass AND p.oid = l.objid
+        JOIN pg_namespace n ON n.oid = coalesce(c.relnamespace, p.pronamespace)
+        WHERE true {{schema_filter}}
+        """,
+    ),
+    _Stage(
+        "indexes",
+        f"""
+        SELECT concat_ws(chr(1), n.nspname, c.relname, i.relname) AS sort_key,
+               -- On a partitioned table, also build the partitions' indexes.
+               replace(pg_get_indexdef(ix.indexrelid), ' ON ONLY ', ' ON ')
+               || ';' AS ddl
+        FROM pg_index ix
+        JOIN pg_class i ON i.oid = ix.indexrelid
+        JOIN pg_class c ON c.oid = ix.indrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p', 'm')
+          AND NOT EXISTS (  -- created by their constraint
+              SELECT 1 FROM pg_constraint con
+              WHERE con.conrelid = ix.indrelid AND con.conindid = ix.indexrelid
+                AND con.contype IN ('p', 'u', 'x'))
+          AND NOT EXISTS (  -- created by the partitioned table's index
+              SELECT 1 FROM pg_inherits inh WHERE inh.inhrelid = ix.indexrelid)
+          AND {_not_extension("pg_class", "c.oid")}
+          {{schema_filter}}
+        """,
+    ),
+    _Stage("foreign_keys", _TABLE_CONSTRAINTS.replace("{types}", "'f'")),
+    _Stage(
+        "row_security",
+        f"""
+        SELECT concat_ws(chr(1), n.nspname, c.relname) AS sort_key,
+               format('ALTER TABLE %I.%I ENABLE ROW LEVEL SECURITY;',
+                      n.nspname, c.relname)
+               || CASE WHEN c.relforcerowsecurity
+                       THEN format(E'\\nALTER TABLE %I.%I FORCE ROW LEVEL SECURITY;',
+                                   n.nspname, c.relname)
+                       ELSE '' END AS ddl
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p') AND c.relrowsecurity
+          AND {_not_extension("pg_class", "c.oid")}
+          {{schema_filter}}
+        """,
+    ),
+    _Stage(
+        "policies",
+        """
+        SELECT concat_ws(chr(1), n.nspname, c.relname, p.polname) AS sort_key,
+               format(E'CREATE POLICY %I ON %I.%I AS %s FOR %s TO %s%s%s;',
+                      p.polname, n.nspname, c.relname,
+                      CASE WHEN p.polpermissive THEN 'PERMISSIVE'
+                           ELSE 'RESTRICTIVE' END,
+                      CASE p.polcmd WHEN 'r' THEN 'SELECT' WHEN 'a' THEN 'INSERT'
+                                    WHEN 'w' THEN 'UPDATE' WHEN 'd' THEN 'DELETE'
+                                    ELSE 'ALL' END,
+                      CASE WHEN p.polroles = '{{0}}' THEN 'public' ELSE (
+                          SELECT string_agg(quote_ident(r.rolname), ', '
+                                            ORDER BY r.rolname)
+                          FROM pg_roles r WHERE r.oid = ANY(p.polroles)) END,
+                      coalesce(E'\\n    USING ('
+                               || pg_get_expr(p.polqual, p.polrelid) || ')', ''),
+                      coalesce(E'\\n    WITH CHECK ('
+                               || pg_get_expr(p.polwithcheck, p.polrelid) || ')', '')
+               ) AS ddl
+        FROM pg_policy p
+        JOIN pg_class c ON c.oid = p.polrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE true {schema_filter}
+        """,
+    ),
+    _Stage(
+        "triggers",
+        f"""
+        SELECT concat_ws(chr(1), n.nspname, c.relname, t.tgname) AS sort_key,
+               pg_get_triggerdef(t.oid) || ';' AS ddl
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE NOT t.tgisinternal AND t.tgparentid = 0
+          AND {_not_extension("pg_class", "c.oid")}
+          {{schema_filter}}
+        """,
+    ),
+)
+
+# Resume after the (stage, sort_key) of the last statement returned, if any.
+_PAGE = """
+    SELECT s.sort_key, s.ddl FROM ({query}) s
+    WHERE ${after}::text IS NULL OR s.sort_key COLLATE "C" > ${after}
+    ORDER BY s.sort_key COLLATE "C"
+"""
+
+
+async def iter_ddl(
+    schema_name: str, after: tuple[int, str] | None = None
+) -> AsyncIterator[tuple[int, str, str]]:
+    """
+    Yield (stage, sort_key, statement) for `schema_name` ('all' for every
+    user schema) in dependency order, starting after `after`. Rows come
+    from one server-side cursor per stage, so memory does not grow with
+    the schema. Close the iterator (e.g. with aclosing) to stop early.
+    """
+    predicate, args = schema_predicate("n.nspname", schema_name)
+    first, key = after or (0, None)
+    async with consistent_read() as conn:
+        # Qualify every name the pg_get_*def functions print.
+        await conn.execute("SELECT set_config('search_path', '', true)")
+        for index in range(first, len(_STAGES)):
+            query = _PAGE.format(
+                query=_STAGES[index].query.format(schema_filter=predicate),
+                after=len(args) + 1,
+            )
+            start = time.perf_counter()
+            rows = 0
+            cursor = conn.cursor(
+                query, *args, key if index == first else None, prefetch=_PREFETCH
+            )
+            async for row in cursor:
+                rows += 1
+                yield index, row["sort_key"], row["ddl"]
+            record_query(0.0, (time.perf_counter() - start) * 1000, rows)
+
+
+async def write_ddl(schema_name: str, out: TextIO) -> int:
+    """Write the export of `schema_name` to `out`; returns the statement count."""
+    out.write(HEADER)
+    statements = 0
+    async with aclosing(iter_ddl(schema_name)) as rows:
+        async for _, _, ddl in rows:
+            out.write(f"\n{ddl}\n")
+            statements += 1
+    return statements
+
+
+async def export_to_file(schema_name: str, path: Path) -> dict[str, Any]:
+    """Write the export to `path` (via a temporary file, so it is never partial)."""
+    partial = path.with_name(path.name + ".partial")
+    try:
+        with partial.open("w", encoding="utf-8") as out:
+            statements = await write_ddl(schema_name, out)
+        partial.replace(path)
+    finally:
+        partial.unlink(missing_ok=True)
+    return {
+        "schema": schema_name,
+        "path": str(path),
+        "statements": statements,
+        "bytes": path.stat().st_size,
+    }
+
+
+async def export_chunk(
+    schema_name: str, limit: int, cursor: str | None = None
+) -> dict[str, Any]:
+    """
+    The next `limit` statements after `cursor` as `ddl` (the chunks concatenate
+    to the file write_ddl produces), plus the cursor of the following chunk
+    (None after the last). Raises ValueError for a malformed cursor.
+    """
+    after = None
+    if cursor:
+        key = decode_cursor(cursor)
+        if len(key) != 2 or not isinstance(key[0], int) or not isinstance(key[1], str):
+            raise ValueError(f"Invalid cursor {cursor!r}")
+        if not 0 <= key[0] < len(_STAGES):
+            raise ValueError(f"Invalid cursor {cursor!r}")
+        after = (key[0], key[1])
+    parts = [] if cursor else [HEADER]
+    statements = 0
+    last: tuple[int, str] | None = None
+    next_cursor = None
+    async with aclosing(iter_ddl(schema_name, after)) as rows:
+        async for stage, sort_key, ddl in rows:
+            if statements == limit and last is not None:
+                next_cursor = encode_cursor(last)
+                break
+            parts.append(f"\n{ddl}\n")
+            statements += 1
+            last = (stage, sort_key)
+    return {
+        "schema": schema_name,
+        "statements": statements,
+        "ddl": "".join(parts),
+        "next_cursor": next_cursor,
+    }
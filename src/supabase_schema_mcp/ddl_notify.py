@@ -0,0 +1,91 @@
+"""DDL event trigger that pushes schema changes to the cache via LISTEN/NOTIFY."""
+
+import json
+from typing import Any
+
+import asyncpg
+
+CHANNEL = "supabase_schema_mcp_ddl"
+TRIGGER_NAMES = ("supabase_schema_mcp_ddl_end", "supabase_schema_mcp_sql_drop")
+
+# pg_notify payloads are capped at 8000 bytes; past this we send no schema
+# list, which listeners treat as "everything may have changed".
+_MAX_SCHEMAS_PAYLOAD = 7000
+
+INSTALL_SQL = f"""
+CREATE SCHEMA IF NOT EXISTS supabase_schema_mcp;
+
+CREATE OR REPLACE FUNCTION supabase_schema_mcp.notify_ddl()
+RETURNS event_trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    schemas text[];
+    payload text;
+BEGIN
+    IF TG_EVENT = 'sql_drop' THEN
+        SELECT array_agg(DISTINCT schema_name) INTO schemas
+        FROM pg_event_trigger_dropped_objects()
+        WHERE schema_name IS NOT NULL;
+    ELSE
+        SELECT array_agg(DISTINCT schema_name) INTO schemas
+        FROM pg_event_trigger_ddl_commands()
+        WHERE schema_name IS NOT NULL;
+    END IF;
+    -- Schema-level commands (CREATE/DROP SCHEMA, ...) carry no schema_name.
+    IF TG_TAG LIKE '% SCHEMA' OR octet_length(schemas::text) > {_MAX_SCHEMAS_PAYLOAD}
+    THEN
+        schemas := NULL;
+    ELSIF schemas IS NULL THEN
+        -- Nothing schema-scoped changed (or a DROP, reported by sql_drop).
+        RETURN;
+    END IF;
+    payload := json_build_object('tag', TG_TAG, 'schemas', schemas)::text;
+    PERFORM pg_notify('{CHANNEL}', payload);
+END
+$$;
+
+DROP EVENT TRIGGER IF EXISTS {TRIGGER_NAMES[0]};
+CREATE EVENT TRIGGER {TRIGGER_NAMES[0]} ON ddl_command_end
+    EXECUTE FUNCTION supabase_schema_mcp.notify_ddl();
+
+DROP EVENT TRIGGER IF EXISTS {TRIGGER_NAMES[1]};
+CREATE EVENT TRIGGER {TRIGGER_NAMES[1]} ON sql_drop
+    EXECUTE FUNCTION supabase_schema_mcp.notify_ddl();
+"""
+
+
+async def event_trigger_installed(conn: asyncpg.Connection) -> bool:
+    """True if both notify event triggers exist and are enabled."""
+    count = await conn.fetchval(
+        "SELECT count(*) FROM pg_event_trigger"
+        " WHERE evtname = ANY($1::name[]) AND evtenabled <> 'D'",
+        list(TRIGGER_NAMES),
+    )
+    return count == len(TRIGGER_NAMES)
+
+
+async def install_event_trigger(conn: asyncpg.Connection) -> None:
+    """
+    Create the notify function and event triggers in an explicit read-write
+    transaction. Requires a role allowed to create event triggers.
+    """
+    await conn.execute("BEGIN READ WRITE")
+    try:
+        await conn.execute(INSTALL_SQL)
+    except BaseException:
+        await conn.execute("ROLLBACK")
+        raise
+    await conn.execute("COMMIT")
+
+
+def parse_payload(payload: str) -> list[str] | None:
+    """Schemas touched by a DDL notification; None means treat all as changed."""
+    try:
+        data: Any = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+    schemas = data.get("schemas") if isinstance(data, dict) else None
+    if not isinstance(schemas, list) or not schemas:
+        return None
+    return [s for s in schemas if isinstance(s, str)]
@@ -0,0 +1,248 @@
+"""
+EXPLAIN plan summaries (costliest nodes, sequential scans, indexes used,
+subplans) and their per-target cache, keyed by normalized SQL text.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.targets import TargetLRU
+
+# Comments, string literals (incl. dollar quotes) and quoted identifiers.
+_LEXEMES = re.compile(
+    r"--[^\n]*"
+    r"|/\*.*?\*/"
+    r"|[Ee]?'(?:[^']|'')*'"
+    r"|\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$"
+    r'|"(?:[^"]|"")*"',
+    re.S,
+)
+_PARAMETER = re.compile(r"\$(\d+)")
+_EXPLAIN = re.compile(r"^explain\b", re.I)
+
+_INDEX_NODES = frozenset({"Index Scan", "Index Only Scan", "Bitmap Index Scan"})
+_CONDITIONS = ("Index Cond", "Recheck Cond", "Hash Cond", "Merge Cond", "Join Filter")
+
+# Sequential scans of tables with at least this many rows are flagged.
+LARGE_TABLE_ROWS = 10_000
+_TOP_NODES = 5
+_CACHE_SIZE = 256
+
+
+def normalize_sql(sql: str) -> tuple[str, int]:
+    """
+    `sql` with comments removed, whitespace collapsed and trailing semicolons
+    dropped (literals and quoted names kept), and its highest $n parameter.
+    """
+    parts: list[str] = []
+    code = ""  # text since the last literal, comments replaced by a space
+    pos = 0
+    for m in _LEXEMES.finditer(sql):
+        code += sql[pos : m.start()]
+        pos = m.end()
+        if m.group().startswith(("--", "/*")):
+            code += " "
+            continue
+        parts += [re.sub(r"\s+", " ", code), m.group()]
+        code = ""
+    parts.append(re.sub(r"\s+", " ", code + sql[pos:]))
+    parameters = max(
+        (int(n) for code in parts[::2] for n in _PARAMETER.findall(code)), default=0
+    )
+    return "".join(parts).strip().rstrip("; ").strip(), parameters
+
+
+def is_explain(sql: str) -> bool:
+    """True if normalized `sql` is itself an EXPLAIN statement."""
+    return bool(_EXPLAIN.match(sql))
+
+
+def _walk(
+    node: dict[str, Any], parent_relation: str | None = None
+) -> Iterator[tuple[dict[str, Any], str | None]]:
+    """Each plan node with its relation (or its parent's, for bitmap index scans)."""
+    relation = _relation(node) or parent_relation
+    yield node, relation
+    for child in node.get("Plans", ()):
+        yield from _walk(
+            child, relation if node["Node Type"] == "Bitmap Heap Scan" else None
+        )
+
+
+def _relation(node: dict[str, Any]) -> str | None:
+    name = node.get("Relation Name")
+    if name is None:
+        return None
+    schema = node.get("Schema")
+    return f"{schema}.{name}" if schema else name
+
+
+def _condition(node: dict[str, Any]) -> str | None:
+    for key in _CONDITIONS:
+        if key in node:
+            return node[key]
+    return node.get("Filter")
+
+
+def scanned_schemas(plan: dict[str, Any]) -> set[str]:
+    """Schemas of the relations `plan` reads sequentially."""
+    return {
+        node["Schema"]
+        for node, _ in _walk(plan)
+        if node["Node Type"] == "Seq Scan" and "Schema" in node
+    }
+
+
+def summarize(plan: dict[str, Any], table_rows: dict[str, int]) -> dict[str, Any]:
+    """
+    Summarize an EXPLAIN (FORMAT JSON, VERBOSE) plan tree. `table_rows` maps
+    schema.table to its estimated row count, for flagging large seq scans.
+    """
+    nodes: list[dict[str, Any]] = []
+    seq_scans: list[dict[str, Any]] = []
+    indexes: list[dict[str, Any]] = []
+    subplans: list[dict[str, Any]] = []
+    for node, relation in _walk(plan):
+        kind = node["Node Type"]
+        children = sum(c["Total Cost"] for c in node.get("Plans", ()))
+        nodes.append(
+            {
+                "node": kind,
+                "relation": relation,
+                "index": node.get("Index Name"),
+                "self_cost": round(max(node["Total Cost"] - children, 0.0), 2),
+                "total_cost": node["Total Cost"],
+                "rows": node["Plan Rows"],
+                "condition": _condition(node),
+            }
+        )
+        if kind == "Seq Scan" and relation is not None:
+            rows = table_rows.get(relation)
+            seq_scans.append(
+                {
+                    "relation": relation,
+                    "table_rows_estimate": rows,
+                    "plan_rows": node["Plan Rows"],
+                    "filter": node.get("Filter"),
+                    "large": rows is not None and rows >= LARGE_TABLE_ROWS,
+                }
+            )
+        if kind in _INDEX_NODES:
+            indexes.append(
+                {
+                    "index": node["Index Name"],
+                    "relation": relation,
+                    "node": kind,
+                    "condition": node.get("Index Cond"),
+                }
+            )
+        if node.get("Parent Relationship") in ("SubPlan", "InitPlan"):
+            subplans.append(
+                {
+                    "name": node.get("Subplan Name"),
+                    "per_row": node["Parent Relationship"] == "SubPlan",
+                    "total_cost": node["Total Cost"],
+                }
+            )
+    nodes.sort(key=lambda n: -n["self_cost"])
+    warnings = [
+        f"Seq Scan on {s['relation']} (about {s['table_rows_estimate']} rows)"
+        + (f" with filter {s['filter']}" if s["filter"] else "")
+        for s in seq_scans
+        if s["large"]
+    ]
+    warnings += [
+        f"{s['name']} runs once per row (cost {s['total_cost']} each)"
+        for s in subplans
+        if s["per_row"]
+    ]
+    return {
+        "total_cost": plan["Total Cost"],
+        "startup_cost": plan["Startup Cost"],
+        "rows": plan["Plan Rows"],
+        "top_nodes": nodes[:_TOP_NODES],
+        "seq_scans": seq_scans,
+        "indexes_used": indexes,
+        "subplans": subplans,
+        "warnings": warnings,
+    }
+
+
+# (normalized SQL, role, JSON claims)
+ExplainKey = tuple[str, str | None, str | None]
+
+
+@dataclass
+class _Entry:
+    version: int
+    plan: dict[str, Any]
+    summary: dict[str, Any]
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class ExplainCache:
+    """
+    Plan summaries of the current target, valid while the catalog version is
+    unchanged and for at most stats_cache_ttl seconds (plans also follow
+    table statistics, which DDL tracking does not see).
+    """
+
+    def __init__(self, size: int = _CACHE_SIZE) -> None:
+        self.size = size
+        self._entries: OrderedDict[ExplainKey, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, key: ExplainKey, version: int | None
+    ) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or version is None
+            or entry.version != version
+            or time.monotonic() - entry.created_at >= get_settings().stats_cache_ttl
+        ):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.plan, entry.summary
+
+    def put(
+        self,
+        key: ExplainKey,
+        version: int | None,
+        plan: dict[str, Any],
+        summary: dict[str, Any],
+    ) -> None:
+        if version is None:
+            return
+        self._entries[key] = _Entry(version, plan, summary)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_caches: TargetLRU[ExplainCache] | None = None
+
+
+def get_explain_cache() -> ExplainCache:
+    """Return the current target's plan cache, creating it on first use."""
+    global _caches
+    if _caches is None:
+        _caches = TargetLRU(get_settings().schema_cache_max_targets)
+    return _caches.get(lambda _target: ExplainCache())
+
+
+def explain_cache_stats() -> dict[str, dict[str, int]]:
+    """Cached plans, hits and misses by target."""
+    return {} if _caches is None else {n: c.stats() for n, c in _caches.items()}
@@ -0,0 +1,273 @@
+"""In-memory foreign key graph of a snapshot, for join and reachability queries."""
+
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from supabase_schema_mcp.catalog import SchemaSnapshot
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.identifiers import quote_ident, quote_relation
+from supabase_schema_mcp.targets import TargetLRU
+
+
+@dataclass(frozen=True)
+class Edge:
+    """One FK constraint: `child` (referencing) -> `parent` (referenced)."""
+
+    constraint: str
+    child: str
+    parent: str
+    columns: tuple[tuple[str, str], ...]  # (child column, parent column) in key order
+    on_delete: str
+
+    def join_condition(self) -> str:
+        child, parent = quote_relation(self.child), quote_relation(self.parent)
+        return " AND ".join(
+            f"{child}.{quote_ident(c)} = {parent}.{quote_ident(p)}"
+            for c, p in self.columns
+        )
+
+
+def _qualified(schema: str, table: str) -> str:
+    return f"{schema}.{table}"
+
+
+class FKGraph:
+    """
+    Adjacency index of a snapshot's tables and FK constraints. Tables are
+    named `schema.table`; tables referenced from outside the snapshot's
+    schema(s) are included as well. Build once per snapshot, then every
+    query is a graph walk in memory.
+    """
+
+    def __init__(self, snapshot: SchemaSnapshot) -> None:
+        self.tables: set[str] = {
+            _qualified(t["schema"], t["table"]) for t in snapshot.tables
+        }
+        columns: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        heads: dict[tuple[str, str], dict[str, Any]] = {}
+        for fk in snapshot.foreign_keys:
+            child = _qualified(fk["from_schema"], fk["from_table"])
+            key = (child, fk["constraint_name"])
+            heads.setdefault(key, fk)
+            columns.setdefault(key, []).append((fk["from_column"], fk["to_column"]))
+        # outgoing: child -> edges to parents; incoming: parent -> edges from children
+        self.outgoing: dict[str, list[Edge]] = {}
+        self.incoming: dict[str, list[Edge]] = {}
+        for key, fk in sorted(heads.items()):
+            edge = Edge(
+                constraint=fk["constraint_name"],
+                child=key[0],
+                parent=_qualified(fk["to_schema"], fk["to_table"]),
+                columns=tuple(columns[key]),
+                on_delete=fk["on_delete"],
+            )
+            self.tables.update((edge.child, edge.parent))
+            self.outgoing.setdefault(edge.child, []).append(edge)
+            self.incoming.setdefault(edge.parent, []).append(edge)
+        self._cycles: list[dict[str, Any]] | None = None
+        self._by_name: dict[str, list[str]] = {}
+        for name in sorted(self.tables):
+            self._by_name.setdefault(name.split(".", 1)[1], []).append(name)
+
+    def resolve(self, table: str, schema_name: str) -> str:
+        """
+        Qualified name for `table` ('table' or 'schema.table'), looked up in
+        `schema_name` first and then by unique name. Raises ValueError.
+        """
+        if table in self.tables:
+            return table
+        qualified = _qualified(schema_name, table)
+        if qualified in self.tables:
+            return qualified
+        matches = self._by_name.get(table, [])
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise ValueError(
+                f"Table name {table!r} is ambiguous: {', '.join(matches)}"
+            )
+        raise ValueError(f"No table named {table!r} in {schema_name!r}")
+
+    def _steps(self, node: str, direction: str) -> Iterator[tuple[str, Edge, str]]:
+        """(neighbor, edge, 'references' | 'referenced_by') from `node`."""
+        if direction in ("both", "out"):
+            for edge in self.outgoing.get(node, ()):
+                yield edge.parent, edge, "references"
+        if direction in ("both", "in"):
+            for edge in self.incoming.get(node, ()):
+                yield edge.child, edge, "referenced_by"
+
+    def join_path(self, source: str, target: str) -> list[dict[str, Any]] | None:
+        """
+        Shortest chain of FK joins from `source` to `target`, following
+        constraints in either direction. None if the tables are not connected.
+        """
+        previous: dict[str, tuple[str, Edge, str] | None] = {source: None}
+        queue = deque([source])
+        while queue and target not in previous:
+            node = queue.popleft()
+            for neighbor, edge, relation in self._steps(node, "both"):
+                if neighbor not in previous:
+                    previous[neighbor] = (node, edge, relation)
+                    queue.append(neighbor)
+        if target not in previous:
+            return None
+        path: list[dict[str, Any]] = []
+        node = target
+        while (step := previous[node]) is not None:
+            prev, edge, relation = step
+            path.append(
+                {
+                    "from": prev,
+                    "to": node,
+                    "relation": relation,
+                    "constraint": edge.constraint,
+                    "join": f"JOIN {quote_relation(node)} ON {edge.join_condition()}",
+                }
+            )
+            node = prev
+        path.reverse()
+        return path
+
+    def neighbors(
+        self, table: str, max_hops: int, direction: str = "both"
+    ) -> list[dict[str, Any]]:
+        """Tables within `max_hops` FK steps of `table`, nearest first."""
+        distance = {table: 0}
+        via: dict[str, str] = {}
+        queue = deque([table])
+        while queue:
+            node = queue.popleft()
+            if distance[node] >= max_hops:
+                continue
+            for neighbor, edge, _ in self._steps(node, direction):
+                if neighbor not in distance:
+                    distance[neighbor] = distance[node] + 1
+                    via[neighbor] = edge.constraint
+                    queue.append(neighbor)
+        return [
+            {"table": name, "hops": hops, "via": via[name]}
+            for name, hops in sorted(distance.items(), key=lambda kv: (kv[1], kv[0]))
+            if hops
+        ]
+
+    def cascade(self, table: str) -> dict[str, list[dict[str, Any]]]:
+        """
+        What deleting a row of `table` can touch: rows deleted through ON
+        DELETE CASCADE (transitively), columns set to NULL/DEFAULT, and
+        NO ACTION/RESTRICT references that block the delete if rows exist.
+        """
+        depth = {table: 0}
+        queue = deque([table])
+        result: dict[str, list[dict[str, Any]]] = {
+            "deleted": [],
+            "set_null": [],
+            "set_default": [],
+            "blocking": [],
+        }
+        while queue:
+            node = queue.popleft()
+            for edge in self.incoming.get(node, ()):
+                entry = {
+                    "table": edge.child,
+                    "constraint": edge.constraint,
+                    "from": node,
+                }
+                if edge.on_delete == "CASCADE":
+                    if edge.child not in depth:
+                        depth[edge.child] = depth[node] + 1
+                        queue.append(edge.child)
+                        result["deleted"].append({**entry, "depth": depth[edge.child]})
+                elif edge.on_delete == "SET NULL":
+                    result["set_null"].append(entry)
+                elif edge.on_delete == "SET DEFAULT":
+                    result["set_default"].append(entry)
+                else:
+                    result["blocking"].append({**entry, "rule": edge.on_delete})
+        return result
+
+    def cycles(self) -> list[dict[str, Any]]:
+        """
+        Strongly connected components of the child -> parent graph with more
+        than one table, plus self-referencing tables (Tarjan, iterative).
+        Computed on first use; the graph is immutable.
+        """
+        if self._cycles is None:
+            self._cycles = self._find_cycles()
+        return self._cycles
+
+    def _find_cycles(self) -> list[dict[str, Any]]:
+        index: dict[str, int] = {}
+        lowlink: dict[str, int] = {}
+        on_stack: set[str] = set()
+        stack: list[str] = []
+        components: list[list[str]] = []
+        counter = 0
+        for root in sorted(self.tables):
+            if root in index:
+                continue
+            work = [(root, iter(self.outgoing.get(root, ())))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, edges = work[-1]
+                for edge in edges:
+                    successor = edge.parent
+                    if successor not in index:
+                        index[successor] = lowlink[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        successors = iter(self.outgoing.get(successor, ()))
+                        work.append((successor, successors))
+                        break
+                    if successor in on_stack:
+                        lowlink[node] = min(lowlink[node], index[successor])
+                else:
+                    work.pop()
+                    if work:
+                        caller = work[-1][0]
+                        lowlink[caller] = min(lowlink[caller], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(sorted(component))
+        result = []
+        for component in sorted(components):
+            members = set(component)
+            constraints = sorted(
+                f"{edge.child}.{edge.constraint}"
+                for name in component
+                for edge in self.outgoing.get(name, ())
+                if edge.parent in members
+            )
+            if len(component) > 1 or constraints:
+                result.append({"tables": component, "constraints": constraints})
+        return result
+
+
+# Per target: schema -> (snapshot the graph was built from, graph).
+_graphs: TargetLRU[dict[str, tuple[SchemaSnapshot, FKGraph]]] | None = None
+
+
+def get_graph(snapshot: SchemaSnapshot) -> FKGraph:
+    """The graph for `snapshot`, rebuilt only when the cache hands out a new one."""
+    global _graphs
+    if _graphs is None:
+        _graphs = TargetLRU(get_settings().schema_cache_max_targets)
+    graphs = _graphs.get(lambda _target: {})
+    cached = graphs.get(snapshot.schema)
+    if cached is not None and cached[0] is snapshot:
+        return cached[1]
+    graph = FKGraph(snapshot)
+    graphs[snapshot.schema] = (snapshot, graph)
+    return graph
@@ -0,0 +1,465 @@
+"""
+Function definition cache and the table/function dependencies of each
+function, from pg_depend and from parsing SQL and PL/pgSQL bodies.
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from supabase_schema_mcp.catalog import SECTIONS, SchemaSnapshot
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.db import fetch_all
+from supabase_schema_mcp.snapshot import get_schema_snapshots
+from supabase_schema_mcp.targets import TargetLRU
+
+# Languages whose bodies are SQL text we can scan for table references.
+_PARSED_LANGUAGES = frozenset({"sql", "plpgsql"})
+
+_IDENT = r'(?:"(?:[^"]|"")+"|[A-Za-z_][A-Za-z0-9_$]*)'
+_NAME = rf"{_IDENT}(?:\s*\.\s*{_IDENT})?"
+# `name [[AS] alias] [, name [[AS] alias]]...` as in a FROM list.
+_NAME_LIST = rf"{_NAME}(?: (?:AS )?{_IDENT})?(?: ?, ?{_NAME}(?: (?:AS )?{_IDENT})?)*"
+
+# Comments, string literals (incl. nested dollar quotes) and quoted identifiers.
+_LEXEMES = re.compile(
+    r"--[^\n]*"
+    r"|/\*.*?\*/"
+    r"|[Ee]?'(?:[^']|'')*'"
+    r"|\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$"
+    r'|"(?:[^"]|"")*"',
+    re.S,
+)
+_BODY = re.compile(r"^AS (\$\w*\$)\n?(.*)\1", re.M | re.S)
+_ATOMIC = re.compile(r"^(?:BEGIN ATOMIC|RETURN )", re.M)
+
+_WRITES = re.compile(
+    rf"\b(?:INSERT INTO|UPDATE(?: ONLY)?|DELETE FROM(?: ONLY)?|MERGE INTO)"
+    rf" ({_NAME})",
+    re.I,
+)
+_TRUNCATE = re.compile(
+    rf"\bTRUNCATE(?: TABLE)?(?: ONLY)? ({_NAME}(?: ?, ?{_NAME})*)", re.I
+)
+_READS = re.compile(
+    rf"(?<!DELETE )\b(?:FROM|JOIN|USING)(?: ONLY)? ({_NAME_LIST})", re.I
+)
+_CALLS = re.compile(rf"({_NAME}) ?\(")
+_DYNAMIC = re.compile(r"\bEXECUTE\b", re.I)
+
+# (kind, schema or None, name), kind one of 'read', 'write', 'call'.
+Reference = tuple[str, str | None, str]
+
+
+def _unquote(ident: str) -> str:
+    if ident.startswith('"'):
+        return ident[1:-1].replace('""', '"')
+    return ident.lower()
+
+
+def _split_name(text: str) -> tuple[str | None, str]:
+    parts = [_unquote(p) for p in re.findall(_IDENT, text)]
+    return (parts[0], parts[1]) if len(parts) > 1 else (None, parts[0])
+
+
+def _body(definition: str) -> str:
+    """The body of a pg_get_functiondef() result (dollar-quoted or BEGIN ATOMIC)."""
+    match = _BODY.search(definition)
+    if match:
+        return match.group(2)
+    match = _ATOMIC.search(definition)
+    return definition[match.start() :] if match else definition
+
+
+def _strip(body: str) -> str:
+    """Drop comments and literals, keep quoted identifiers, collapse whitespace."""
+    body = _LEXEMES.sub(lambda m: m.group(0) if m.group(0)[0] == '"' else " ", body)
+    return " ".join(body.split())
+
+
+def parse_body(definition: str) -> tuple[frozenset[Reference], bool]:
+    """
+    Table reads and writes and function calls named in a function's body,
+    unresolved, and whether it runs dynamic SQL (EXECUTE), whose statements
+    cannot be seen.
+    """
+    text = _strip(_body(definition))
+    refs: set[Reference] = set()
+    for match in _WRITES.finditer(text):
+        refs.add(("write", *_split_name(match.group(1))))
+    for match in _TRUNCATE.finditer(text):
+        for item in match.group(1).split(","):
+            refs.add(("write", *_split_name(item)))
+    for match in _READS.finditer(text):
+        for item in match.group(1).split(","):
+            name = re.match(rf"\s*({_NAME})", item)
+            if name:
+                refs.add(("read", *_split_name(name.group(1))))
+    for match in _CALLS.finditer(text):
+        refs.add(("call", *_split_name(match.group(1))))
+    return frozenset(refs), bool(_DYNAMIC.search(text))
+
+
+def _search_path(config: list[str] | None, schema: str) -> list[str]:
+    """
+    Schemas unqualified names resolve in: the function's own search_path
+    setting if it has one, else its schema and then public.
+    """
+    for entry in config or ():
+        key, _, value = entry.partition("=")
+        if key == "search_path":
+            names = (n.strip().strip('"') for n in value.split(","))
+            return [n for n in names if n and n not in ("$user", "pg_temp")]
+    return [schema, "public"]
+
+
+@dataclass(frozen=True)
+class FunctionRef:
+    """One pg_proc row; `version` (its xmin) changes whenever it is replaced."""
+
+    oid: int
+    version: int
+    schema: str
+    name: str
+    arguments: str
+    language: str
+    search_path: tuple[str, ...]
+
+
+@dataclass
+class FunctionDependencies:
+    function: FunctionRef
+    reads: list[str]
+    writes: list[str]
+    calls: list[str]
+    dynamic_sql: bool
+
+    def as_row(self) -> dict[str, Any]:
+        return {
+            "schema": self.function.schema,
+            "function": self.function.name,
+            "arguments": self.function.arguments,
+            "language": self.function.language,
+            "reads": self.reads,
+            "writes": self.writes,
+            "calls": self.calls,
+            "dynamic_sql": self.dynamic_sql,
+        }
+
+
+class DependencyIndex:
+    """Dependencies of every function, and the functions using each relation."""
+
+    def __init__(
+        self, functions: list[FunctionDependencies], relations: set[str]
+    ) -> None:
+        self.functions = functions
+        self.relations = relations
+        self.by_relation: dict[str, list[tuple[FunctionDependencies, str]]] = {}
+        for deps in functions:
+            for relation in sorted(set(deps.reads) | set(deps.writes)):
+                access = (
+                    "read_write"
+                    if relation in deps.reads and relation in deps.writes
+                    else "write"
+                    if relation in deps.writes
+                    else "read"
+                )
+                self.by_relation.setdefault(relation, []).append((deps, access))
+        self._by_name: dict[str, list[str]] = {}
+        for name in sorted(relations):
+            self._by_name.setdefault(name.split(".", 1)[1], []).append(name)
+
+    def resolve(self, table: str, schema_name: str) -> str:
+        """
+        Qualified name for `table` ('table' or 'schema.table'), looked up in
+        `schema_name` first and then by unique name. Raises ValueError.
+        """
+        if table in self.relations:
+            return table
+        qualified = f"{schema_name}.{table}"
+        if qualified in self.relations:
+            return qualified
+        matches = self._by_name.get(table, [])
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise ValueError(
+                f"Table name {table!r} is ambiguous: {', '.join(matches)}"
+            )
+        raise ValueError(f"No table or view named {table!r} in {schema_name!r}")
+
+
+def _resolve(
+    refs: frozenset[Reference],
+    function: FunctionRef,
+    relations: set[str],
+    functions: set[str],
+) -> dict[str, set[str]]:
+    found: dict[str, set[str]] = {"read": set(), "write": set(), "call": set()}
+    for kind, schema, name in refs:
+        known = functions if kind == "call" else relations
+        for candidate in [schema] if schema else function.search_path:
+            qualified = f"{candidate}.{name}"
+            if qualified in known:
+                found[kind].add(qualified)
+                break
+    return found
+
+
+class FunctionIndex:
+    """
+    Per target: pg_proc rows per schema (re-read when that schema's snapshot
+    changes), function definitions by oid (fetched in bulk on first use and
+    dropped when the function is replaced), and the dependency indexes built
+    from them, over every user schema or a few (rebuilt when a snapshot they
+    use changes, re-parsing only bodies of replaced functions).
+    """
+
+    def __init__(self) -> None:
+        self._refs: dict[str, tuple[SchemaSnapshot, list[FunctionRef]]] = {}
+        self._definitions: dict[int, tuple[int, str | None]] = {}
+        self._parsed: dict[int, tuple[int, frozenset[Reference], bool]] = {}
+        # scope (None for all) -> (snapshots used, index). The snapshots are
+        # kept so a changed schema is a new object, never a reused id().
+        self._indexes: dict[
+            frozenset[str] | None,
+            tuple[dict[str, SchemaSnapshot], DependencyIndex],
+        ] = {}
+        self._lock = asyncio.Lock()
+
+    async def _refresh(self, snapshots: dict[str, SchemaSnapshot]) -> None:
+        changed = [
+            name
+            for name, snapshot in snapshots.items()
+            if name not in self._refs or self._refs[name][0] is not snapshot
+        ]
+        if not changed:
+            return
+        rows = await fetch_all(
+            """
+            SELECT p.oid, p.xmin::text::bigint AS version,
+                   n.nspname AS schema_name, p.proname AS function_name,
+                   pg_get_function_arguments(p.oid) AS arguments,
+                   l.lanname AS language, p.proconfig AS config
+            FROM pg_proc p
+            JOIN pg_namespace n ON n.oid = p.pronamespace
+            JOIN pg_language l ON l.oid = p.prolang
+            WHERE n.nspname = ANY($1::text[])
+            ORDER BY n.nspname, p.proname, 5
+            """,
+            changed,
+        )
+        by_schema: dict[str, list[FunctionRef]] = {name: [] for name in changed}
+        for r in rows:
+            by_schema[r["schema_name"]].append(
+                FunctionRef(
+                    oid=r["oid"],
+                    version=r["version"],
+                    schema=r["schema_name"],
+                    name=r["function_name"],
+                    arguments=r["arguments"],
+                    language=r["language"],
+                    search_path=tuple(_search_path(r["config"], r["schema_name"])),
+                )
+            )
+        for name in changed:
+            versions = {ref.oid: ref.version for ref in by_schema[name]}
+            # Forget replaced and dropped functions; keep the unchanged ones.
+            for ref in self._refs.get(name, (None, []))[1]:
+                if versions.get(ref.oid) != ref.version:
+                    self._definitions.pop(ref.oid, None)
+                    self._parsed.pop(ref.oid, None)
+            self._refs[name] = (snapshots[name], by_schema[name])
+
+    async def functions(self, schema_name: str) -> list[FunctionRef]:
+        """pg_proc rows of one schema, or of every user schema for 'all'."""
+        snapshots = await get_schema_snapshots(schema_name)
+        async with self._lock:
+            await self._refresh(snapshots)
+            if schema_name == "all":
+                for name in set(self._refs) - set(snapshots):
+                    del self._refs[name]
+            return [ref for name in snapshots for ref in self._refs[name][1]]
+
+    async def definitions(self, refs: list[FunctionRef]) -> dict[int, str | None]:
+        """pg_get_functiondef() of each function by oid; missing ones in one query."""
+        missing = [
+            ref.oid
+            for ref in refs
+            if self._definitions.get(ref.oid, (None,))[0] != ref.version
+        ]
+        if missing:
+            rows = await fetch_all(
+                """
+                SELECT p.oid, p.xmin::text::bigint AS version,
+                       CASE WHEN p.prokind = 'a' THEN NULL
+                            ELSE pg_get_functiondef(p.oid) END AS definition
+                FROM pg_proc p
+                WHERE p.oid = ANY($1::oid[])
+                """,
+                missing,
+            )
+            for r in rows:
+                self._definitions[r["oid"]] = (r["version"], r["definition"])
+        return {
+            ref.oid: self._definitions[ref.oid][1]
+            for ref in refs
+            if ref.oid in self._definitions
+        }
+
+    async def dependencies(self, schemas: list[str] | None = None) -> DependencyIndex:
+        """
+        The dependency index over every user schema, or over the functions of
+        `schemas`. Their bodies' names then resolve against the relations of
+        those schemas and of every schema the bodies search or qualify names
+        with, and calls only against functions of `schemas`.
+        """
+        scope = None if schemas is None else frozenset(schemas)
+        cached = self._indexes.get(scope)
+        if cached is not None:
+            used, index = cached
+            current = await _snapshots(None if scope is None else frozenset(used))
+            if current.keys() == used.keys() and all(
+                current[name] is snapshot for name, snapshot in used.items()
+            ):
+                return index
+        snapshots = await _snapshots(scope)
+        if scope is None:
+            refs = await self.functions("all")
+        else:
+            refs = [ref for name in snapshots for ref in await self.functions(name)]
+        definitions = await self.definitions(
+            [r for r in refs if self._parsed.get(r.oid, (None,))[0] != r.version]
+        )
+        for ref in refs:
+            if ref.oid in definitions:
+                definition = definitions[ref.oid]
+                if ref.language in _PARSED_LANGUAGES and definition:
+                    parsed, dynamic = parse_body(definition)
+                else:
+                    parsed, dynamic = frozenset(), False
+                self._parsed[ref.oid] = (ref.version, parsed, dynamic)
+        depend = await _load_depend([r.oid for r in refs])
+        if scope is not None:
+            named = {name for ref in refs for name in ref.search_path}
+            for ref in refs:
+                for kind, schema, _ in self._parsed.get(ref.oid, (0, ()))[1]:
+                    if kind != "call" and schema:
+                        named.add(schema)
+            for found in depend.values():
+                for kind, qualified in found:
+                    if kind == "relation":
+                        named.add(qualified.split(".", 1)[0])
+            snapshots = await _snapshots(
+                scope
+                | {
+                    name
+                    for name in named
+                    if name != "information_schema" and not name.startswith("pg_")
+                }
+            )
+        relations = {
+            f"{row['schema']}.{row[kind]}"
+            for snapshot in snapshots.values()
+            for kind, rows in (("table", snapshot.tables), ("view", snapshot.views))
+            for row in rows
+        }
+        names = {f"{r.schema}.{r.name}" for r in refs}
+        functions = []
+        for ref in refs:
+            _, parsed, dynamic = self._parsed.get(ref.oid, (None, frozenset(), False))
+            found = _resolve(parsed, ref, relations, names)
+            for kind, qualified in depend.get(ref.oid, ()):
+                if kind == "call":
+                    found["call"].add(qualified)
+                elif qualified in relations and qualified not in found["write"]:
+                    found["read"].add(qualified)
+            functions.append(
+                FunctionDependencies(
+                    ref,
+                    reads=sorted(found["read"]),
+                    writes=sorted(found["write"]),
+                    calls=sorted(found["call"] - {f"{ref.schema}.{ref.name}"}),
+                    dynamic_sql=dynamic,
+                )
+            )
+        index = DependencyIndex(functions, relations)
+        async with self._lock:
+            self._indexes[scope] = (dict(snapshots), index)
+        return index
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "functions": sum(len(refs) for _, refs in self._refs.values()),
+            "definitions": len(self._definitions),
+            "parsed": len(self._parsed),
+        }
+
+
+async def _snapshots(schemas: frozenset[str] | None) -> dict[str, SchemaSnapshot]:
+    """
+    Snapshots of every user schema for None, else of those of `schemas` that
+    have objects (a missing schema's empty snapshot is new on every call).
+    """
+    if schemas is None:
+        return await get_schema_snapshots("all")
+    loaded = await asyncio.gather(*(get_schema_snapshots(s) for s in sorted(schemas)))
+    return {
+        name: snapshot
+        for found in loaded
+        for name, snapshot in found.items()
+        if any(getattr(snapshot, section) for section in SECTIONS)
+    }
+
+
+async def _load_depend(oids: list[int]) -> dict[int, list[tuple[str, str]]]:
+    """
+    Relations and functions each function depends on per pg_depend, which
+    records them for SQL-standard (BEGIN ATOMIC) bodies.
+    """
+    rows = await fetch_all(
+        """
+        SELECT DISTINCT d.objid AS oid, 'relation' AS kind,
+               n.nspname AS schema_name, c.relname AS name
+        FROM pg_depend d
+        JOIN pg_class c ON c.oid = d.refobjid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE d.classid = 'pg_proc'::regclass
+          AND d.refclassid = 'pg_class'::regclass
+          AND d.objid = ANY($1::oid[])
+        UNION
+        SELECT d.objid, 'call', n.nspname, p.proname
+        FROM pg_depend d
+        JOIN pg_proc p ON p.oid = d.refobjid
+        JOIN pg_namespace n ON n.oid = p.pronamespace
+        WHERE d.classid = 'pg_proc'::regclass
+          AND d.refclassid = 'pg_proc'::regclass
+          AND d.deptype = 'n'
+          AND d.objid = ANY($1::oid[])
+        """,
+        oids,
+    )
+    result: dict[int, list[tuple[str, str]]] = {}
+    for r in rows:
+        result.setdefault(r["oid"], []).append(
+            (r["kind"], f"{r['schema_name']}.{r['name']}")
+        )
+    return result
+
+
+_indexes: TargetLRU[FunctionIndex] | None = None
+
+
+def get_function_index() -> FunctionIndex:
+    """Return the current target's function index, creating it on first use."""
+    global _indexes
+    if _indexes is None:
+        _indexes = TargetLRU(get_settings().schema_cache_max_targets)
+    return _indexes.get(lambda _target: FunctionIndex())
+
+
+def function_index_stats() -> dict[str, dict[str, int]]:
+    """Functions listed, definitions cached and bodies parsed, by target."""
+    return {} if _indexes is None else {n: i.stats() for n, i in _indexes.items()}
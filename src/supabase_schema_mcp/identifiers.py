@@ -0,0 +1,47 @@
+"""Quoting of identifiers in the SQL text that tools suggest or return."""
+
+import re
+
+_PLAIN = re.compile(r"[a-z_][a-z0-9_]*")
+
+# Keywords quote_ident() quotes (every category but unreserved), as of
+# PostgreSQL 16: `SELECT word FROM pg_get_keywords() WHERE catcode <> 'U'`.
+_KEYWORDS = frozenset(
+    """
+    all analyse analyze and any array as asc asymmetric authorization between
+    bigint binary bit boolean both case cast char character check coalesce
+    collate collation column concurrently constraint create cross
+    current_catalog current_date current_role current_schema current_time
+    current_timestamp current_user dec decimal default deferrable desc distinct
+    do else end except exists extract false fetch float for foreign freeze from
+    full grant greatest group grouping having ilike in initially inner inout int
+    integer intersect interval into is isnull join json_array json_arrayagg
+    json_object json_objectagg lateral leading least left like limit localtime
+    localtimestamp national natural nchar none normalize not notnull null nullif
+    numeric offset on only or order out outer overlaps overlay placing position
+    precision primary real references returning right row select session_user
+    setof similar smallint some substring symmetric system_user table
+    tablesample then time timestamp to trailing treat trim true union unique
+    user using values varchar variadic verbose when where window with
+    xmlattributes xmlconcat xmlelement xmlexists xmlforest xmlnamespaces
+    xmlparse xmlpi xmlroot xmlserialize xmltable
+    """.split()
+)
+
+
+def quote_ident(name: str) -> str:
+    """`name` as an SQL identifier, double-quoted where SQL requires it."""
+    if _PLAIN.fullmatch(name) and name not in _KEYWORDS:
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_qualified(schema: str, name: str) -> str:
+    """`schema.name` with each part quoted where SQL requires it."""
+    return f"{quote_ident(schema)}.{quote_ident(name)}"
+
+
+def quote_relation(relation: str) -> str:
+    """A `schema.table` name (split at the first dot) quoted for SQL."""
+    schema, dot, name = relation.partition(".")
+    return quote_qualified(schema, name) if dot else quote_ident(relation)
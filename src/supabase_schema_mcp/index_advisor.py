@@ -0,0 +1,270 @@
+"""
+Index advice: foreign keys without a supporting index, duplicate and
+prefix-redundant indexes, and partial or expression indexes.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from supabase_schema_mcp.fk_graph import FKGraph
+from supabase_schema_mcp.identifiers import quote_ident, quote_qualified, quote_relation
+
+_SEVERITY = {"high": 0, "medium": 1, "low": 2}
+
+# B-tree leaf tuple overhead: 8-byte IndexTupleData plus a 4-byte line pointer.
+_BTREE_TUPLE_OVERHEAD = 12
+_BTREE_FILL = 0.9
+
+
+@dataclass(frozen=True)
+class Index:
+    """One index with its key definition, usage and size."""
+
+    schema: str
+    table: str
+    name: str
+    method: str
+    keys: tuple[str, ...]  # column names or expression text, in key order
+    key_options: tuple[tuple[int, int, int], ...]  # (opclass, collation, option)
+    include: tuple[str, ...]
+    predicate: str | None
+    has_expressions: bool
+    is_unique: bool
+    is_valid: bool
+    constraint: str | None
+    size_bytes: int
+    scans: int | None
+
+    @property
+    def relation(self) -> str:
+        return f"{self.schema}.{self.table}"
+
+    @property
+    def signature(self) -> tuple[Any, ...]:
+        """What makes two indexes interchangeable for lookups."""
+        keys = tuple(zip(self.keys, self.key_options))
+        return (self.method, keys, self.predicate, self.include)
+
+    def as_row(self) -> dict[str, Any]:
+        return {
+            "index": self.name,
+            "columns": list(self.keys),
+            "size_bytes": self.size_bytes,
+            "scans": self.scans,
+        }
+
+
+def _unquote(key: str) -> str:
+    return key[1:-1].replace('""', '"') if key.startswith('"') else key
+
+
+def _covers(index: Index, columns: set[str]) -> bool:
+    """True if the index's leading keys are exactly `columns`, in any order."""
+    if index.predicate or not index.is_valid or index.method not in ("btree", "hash"):
+        return False
+    if index.method == "hash" and len(columns) > 1:
+        return False
+    leading = {_unquote(k) for k in index.keys[: len(columns)]}
+    return len(index.keys) >= len(columns) and leading == columns
+
+
+def _extends(wider: Index, index: Index) -> bool:
+    """
+    True if b-tree `wider` serves every lookup `index` does: its keys start
+    with the same keys and add more, or repeat them with extra INCLUDE columns.
+    """
+    width = len(index.keys)
+    if not (
+        wider.is_valid
+        and wider.method == "btree"
+        and wider.predicate == index.predicate
+        and wider.signature[1][:width] == index.signature[1]
+    ):
+        return False
+    if len(wider.keys) > width:
+        return True
+    return set(index.include) < set(wider.include)
+
+
+def _keep_order(index: Index) -> tuple[Any, ...]:
+    """Which of several duplicate indexes to keep: constraints, unique, most used."""
+    return (
+        index.constraint is None,
+        not index.is_unique,
+        -(index.scans or 0),
+        index.name,
+    )
+
+
+def _drop(index: Index) -> str:
+    if index.constraint:
+        return (
+            f"ALTER TABLE {quote_qualified(index.schema, index.table)} "
+            f"DROP CONSTRAINT {quote_ident(index.constraint)};"
+        )
+    return f"DROP INDEX CONCURRENTLY {quote_qualified(index.schema, index.name)};"
+
+
+def estimate_btree_bytes(rows: float, widths: list[int]) -> int:
+    """Rough leaf size of a b-tree over columns of the given average widths."""
+    data = sum(widths)
+    aligned = (data + 7) // 8 * 8
+    return int(max(rows, 0) * (_BTREE_TUPLE_OVERHEAD + aligned) / _BTREE_FILL)
+
+
+def advise(
+    graph: FKGraph,
+    indexes: list[Index],
+    tables: dict[str, dict[str, Any]],
+    widths: dict[tuple[str, str], int],
+) -> list[dict[str, Any]]:
+    """
+    Findings, most severe and then largest first. `tables` maps schema.table
+    to its usage stats row (rows_estimate and seq_scans are read); `widths`
+    maps (schema.table, column) to its average width in bytes.
+    """
+    by_table: dict[str, list[Index]] = {}
+    for index in indexes:
+        by_table.setdefault(index.relation, []).append(index)
+    findings: list[dict[str, Any]] = []
+
+    def add(relation: str, kind: str, severity: str, **fields: Any) -> None:
+        schema, table = relation.split(".", 1)
+        findings.append(
+            {
+                "schema": schema,
+                "table": table,
+                "kind": kind,
+                "severity": severity,
+                "index": None,
+                "columns": [],
+                "size_bytes": None,
+                "scans": None,
+                **fields,
+            }
+        )
+
+    for child in sorted(graph.outgoing):
+        if child not in tables:
+            continue
+        stats = tables[child]
+        for edge in graph.outgoing[child]:
+            columns = [c for c, _ in edge.columns]
+            if any(_covers(ix, set(columns)) for ix in by_table.get(child, ())):
+                continue
+            cascades = edge.on_delete in ("CASCADE", "SET NULL", "SET DEFAULT")
+            add(
+                child,
+                "missing_fk_index",
+                "high" if cascades or stats["rows_estimate"] > 10_000 else "medium",
+                columns=columns,
+                size_bytes=estimate_btree_bytes(
+                    stats["rows_estimate"],
+                    [widths.get((child, c), 8) for c in columns],
+                ),
+                scans=stats["seq_scans"],
+                detail=(
+                    f"Foreign key {edge.constraint} to {edge.parent} "
+                    f"(ON DELETE {edge.on_delete}) has no index starting with "
+                    f"({', '.join(columns)}): every delete or key update on "
+                    f"{edge.parent} scans {child} (about "
+                    f"{stats['rows_estimate']} rows) while holding its locks. "
+                    "size_bytes is the estimated index size; scans counts "
+                    "sequential scans of the table"
+                ),
+                suggestion=(
+                    f"CREATE INDEX CONCURRENTLY ON {quote_relation(child)} "
+                    f"({', '.join(quote_ident(c) for c in columns)});"
+                ),
+            )
+
+    redundant: set[str] = set()
+    for relation, table_indexes in sorted(by_table.items()):
+        # Prefixes first: an index and its copy both covered by a wider
+        # index are reported as prefixes rather than as duplicates of each other.
+        for index in table_indexes:
+            if index.is_unique or index.constraint:
+                continue
+            if index.method != "btree" or index.has_expressions:
+                continue
+            other = next(
+                (o for o in table_indexes if o is not index and _extends(o, index)),
+                None,
+            )
+            if other is None:
+                continue
+            redundant.add(index.name)
+            add(
+                relation,
+                "prefix_index",
+                "medium",
+                **index.as_row(),
+                detail=(
+                    f"Its columns are a leading prefix of {other.name} "
+                    f"({', '.join(other.keys + other.include)}), which serves "
+                    "the same lookups"
+                ),
+                suggestion=_drop(index),
+            )
+        groups: dict[tuple[Any, ...], list[Index]] = {}
+        for index in table_indexes:
+            if index.name not in redundant:
+                groups.setdefault(index.signature, []).append(index)
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            keep, *others = sorted(group, key=_keep_order)
+            for index in others:
+                redundant.add(index.name)
+                add(
+                    relation,
+                    "duplicate_index",
+                    "high",
+                    **index.as_row(),
+                    detail=(
+                        f"Same definition as {keep.name}; every write "
+                        "maintains both"
+                    ),
+                    suggestion=_drop(index),
+                )
+        for index in table_indexes:
+            if index.name in redundant:
+                continue
+            unused = index.scans == 0 and not index.constraint
+            note = " It has not been scanned since statistics were reset." if (
+                unused
+            ) else ""
+            if index.predicate:
+                add(
+                    relation,
+                    "partial_index",
+                    "medium" if unused else "low",
+                    **index.as_row(),
+                    detail=(
+                        f"Partial index WHERE {index.predicate}: used only by "
+                        f"queries whose conditions imply the predicate.{note}"
+                    ),
+                    suggestion=_drop(index) if unused else None,
+                )
+            if index.has_expressions:
+                add(
+                    relation,
+                    "expression_index",
+                    "medium" if unused else "low",
+                    **index.as_row(),
+                    detail=(
+                        "Expression index: used only by queries that filter or "
+                        f"sort on the same expression.{note}"
+                    ),
+                    suggestion=_drop(index) if unused else None,
+                )
+    findings.sort(
+        key=lambda f: (
+            _SEVERITY[f["severity"]],
+            -(f["size_bytes"] or 0),
+            f["schema"],
+            f["table"],
+            f["index"] or "",
+        )
+    )
+    return findings
@@ -0,0 +1,67 @@
+"""Per-client concurrency limits for tool calls."""
+
+import asyncio
+import functools
+import weakref
+from collections.abc import Awaitable, Callable
+from typing import Any, ParamSpec
+
+from mcp.server.lowlevel.server import request_ctx
+
+from supabase_schema_mcp.config import get_settings
+
+P = ParamSpec("P")
+
+# One semaphore per MCP session, dropped with the session.
+_semaphores: weakref.WeakKeyDictionary[Any, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _client() -> Any | None:
+    """The MCP session of the running request (one per connected client)."""
+    try:
+        return request_ctx.get().session
+    except LookupError:
+        return None
+
+
+_waiting = 0
+
+
+def client_stats() -> dict[str, int]:
+    """Clients seen (while connected), the per-client limit and queued calls."""
+    return {
+        "clients": len(_semaphores),
+        "limit": get_settings().client_max_concurrent_calls,
+        "waiting": _waiting,
+    }
+
+
+def limited(fn: Callable[P, Awaitable[str]]) -> Callable[P, Awaitable[str]]:
+    """
+    Queue a client's tool calls beyond client_max_concurrent_calls, so one
+    busy client cannot take every pool connection from the others.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> str:
+        global _waiting
+        limit = get_settings().client_max_concurrent_calls
+        client = _client()
+        if limit <= 0 or client is None:
+            return await fn(*args, **kwargs)
+        semaphore = _semaphores.get(client)
+        if semaphore is None:
+            semaphore = _semaphores[client] = asyncio.Semaphore(limit)
+        _waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            _waiting -= 1
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            semaphore.release()
+
+    return wrapper
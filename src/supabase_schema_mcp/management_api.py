@@ -1,11 +1,29 @@
 """Supabase Management API HTTP client (httpx)."""
 
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any
+
 import httpx
 from pydantic import BaseModel
 
 from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.targets import get_target
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # optional: pip install supabase-schema-mcp[http2]
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
 
-MANAGEMENT_API_BASE = "https://api.supabase.com/v1"
+# Retried with backoff; anything else is returned (or raised) immediately.
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_MAX_SECONDS = 8.0
 
 
 class ProjectInfo(BaseModel):
@@ -17,26 +35,202 @@ class ProjectInfo(BaseModel):
     region: str | None = None
 
 
-async def get_project_info() -> ProjectInfo | None:
+class ManagementAPIError(RuntimeError):
+    """A Management API request failed (after retries, where they apply)."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class _Entry:
+    data: Any
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class ManagementClient:
     """
-    Fetch project details from the Supabase Management API.
-    Returns None if Management API is not configured or the request fails.
+    One long-lived httpx client (keep-alive, HTTP/2 when h2 is installed) with
+    a TTL cache of GET responses. Expired entries are revalidated with
+    If-None-Match / If-Modified-Since, so an unchanged resource costs a 304.
+    429 and 5xx responses and connection errors are retried with exponential
+    backoff and jitter, honouring Retry-After.
     """
-    settings = get_settings()
-    if not settings.management_api_configured:
-        return None
-    url = f"{MANAGEMENT_API_BASE}/projects/{settings.supabase_project_ref}"
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        resp = await client.get(
-            url,
-            headers={"Authorization": f"Bearer {settings.supabase_service_role_key}"},
+
+    def __init__(
+        self,
+        base_url: str,
+        ttl: float,
+        retries: int,
+        timeout: float,
+        http2: bool,
+    ) -> None:
+        self.ttl = ttl
+        self.retries = retries
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            http2=self.http2,
+            limits=httpx.Limits(keepalive_expiry=60.0),
         )
+        # (token, path) -> response, so targets with different keys never share.
+        self._cache: dict[tuple[str, str], _Entry] = {}
+        self._inflight: dict[tuple[str, str], asyncio.Task[Any]] = {}
+        self.counts = {"hits": 0, "revalidated": 0, "fetched": 0, "retries": 0}
+
+    async def get_json(self, path: str, token: str) -> Any:
+        """GET `path` as JSON, from the cache while fresh. Raises ManagementAPIError."""
+        key = (token, path)
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry.fetched_at < self.ttl:
+            self.counts["hits"] += 1
+            return entry.data
+        # Concurrent misses for the same resource share one request.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, entry))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: tuple[str, str], task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _fetch(self, key: tuple[str, str], entry: _Entry | None) -> Any:
+        token, path = key
+        headers = {"Authorization": f"Bearer {token}"}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        resp = await self._request(path, headers)
+        if resp.status_code == 304 and entry is not None:
+            entry.fetched_at = time.monotonic()
+            self.counts["revalidated"] += 1
+            return entry.data
         if resp.status_code != 200:
-            return None
+            raise ManagementAPIError(
+                f"GET {path} returned {resp.status_code}: {resp.text[:200]}",
+                resp.status_code,
+            )
         data = resp.json()
-        return ProjectInfo(
-            id=data.get("id", ""),
-            name=data.get("name", ""),
-            ref=data.get("ref", settings.supabase_project_ref),
-            region=data.get("region"),
+        self._cache[key] = _Entry(
+            data,
+            resp.headers.get("ETag"),
+            resp.headers.get("Last-Modified"),
+            time.monotonic(),
+        )
+        self.counts["fetched"] += 1
+        return data
+
+    async def _request(self, path: str, headers: dict[str, str]) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                resp = await self._http.get(path, headers=headers)
+            except httpx.TransportError as e:
+                if attempt >= self.retries:
+                    raise ManagementAPIError(f"GET {path} failed: {e}") from e
+                delay = _backoff(attempt)
+            else:
+                if resp.status_code not in _RETRY_STATUSES or attempt >= self.retries:
+                    return resp
+                delay = _retry_after(resp) or _backoff(attempt)
+            attempt += 1
+            self.counts["retries"] += 1
+            await asyncio.sleep(min(delay, _BACKOFF_MAX_SECONDS))
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.counts, "cached": len(self._cache), "http2": self.http2}
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff: up to base * 2^attempt seconds."""
+    return random.uniform(0, _BACKOFF_BASE_SECONDS * 2**attempt)
+
+
+def _retry_after(resp: httpx.Response) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), if any."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_client: ManagementClient | None = None
+
+
+def get_client() -> ManagementClient:
+    """Return the shared Management API client, creating it on first use."""
+    global _client
+    if _client is None:
+        settings = get_settings()
+        _client = ManagementClient(
+            settings.management_api_url,
+            ttl=settings.management_api_cache_ttl,
+            retries=settings.management_api_retries,
+            timeout=settings.management_api_timeout,
+            http2=settings.management_api_http2,
         )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client's connections (e.g. on shutdown)."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+
+
+def client_stats() -> dict[str, Any] | None:
+    """Cache hits, revalidations, fetches and retries; None before first use."""
+    return None if _client is None else _client.stats()
+
+
+async def fetch_project_info() -> ProjectInfo:
+    """
+    Project details of the current target from the Management API.
+    Raises ManagementAPIError if credentials are missing or the request fails.
+    """
+    target = get_target()
+    if not (target.project_ref and target.service_role_key):
+        raise ManagementAPIError(
+            f"Management API not configured for target {target.name!r}: set "
+            "SUPABASE_PROJECT_REF and SUPABASE_SERVICE_ROLE_KEY"
+        )
+    data = await get_client().get_json(
+        f"/projects/{target.project_ref}", target.service_role_key
+    )
+    return ProjectInfo(
+        id=data.get("id", ""),
+        name=data.get("name", ""),
+        ref=data.get("ref", target.project_ref),
+        region=data.get("region"),
+    )
+
+
+async def get_project_info() -> ProjectInfo | None:
+    """
+    Fetch project details from the Supabase Management API.
+    Returns None if Management API is not configured or the request fails.
+    """
+    try:
+        return await fetch_project_info()
+    except ManagementAPIError:
+        return None
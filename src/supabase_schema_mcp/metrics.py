@@ -0,0 +1,212 @@
+"""Rolling per-tool metrics: latency, pool wait, query time, rows and payload size."""
+
+import functools
+import math
+import sys
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, ParamSpec
+
+from supabase_schema_mcp.config import get_settings
+
+P = ParamSpec("P")
+
+# Per-call measures, in the order server_stats reports them.
+MEASURES = (
+    "latency_ms",
+    "acquire_ms",
+    "query_ms",
+    "queries",
+    "rows",
+    "serialize_ms",
+    "bytes",
+)
+
+
+class Histogram:
+    """The last `window` samples of one measure, plus all-time count and sum."""
+
+    def __init__(self, window: int) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def summary(self) -> dict[str, float]:
+        """All-time count and mean; percentiles and max over the window."""
+        if not self._samples:
+            return {"count": 0}
+        ordered = sorted(self._samples)
+
+        def rank(q: float) -> float:
+            return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)], 3)
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3),
+            "p50": rank(0.50),
+            "p95": rank(0.95),
+            "p99": rank(0.99),
+            "max": round(ordered[-1], 3),
+        }
+
+
+@dataclass
+class CallMetrics:
+    """What one tool call spent, accumulated by the db and output hooks."""
+
+    acquire_ms: float = 0.0
+    query_ms: float = 0.0
+    queries: int = 0
+    rows: int = 0
+    serialize_ms: float = 0.0
+
+
+_current: ContextVar[CallMetrics | None] = ContextVar(
+    "supabase_schema_mcp_call", default=None
+)
+
+
+class Metrics:
+    """Histograms per tool and for every database query, in this process."""
+
+    def __init__(self, window: int, slow_call_ms: float) -> None:
+        self.window = window
+        self.slow_call_ms = slow_call_ms
+        self.started = time.monotonic()
+        self.tools: dict[str, dict[str, Histogram]] = {}
+        self.calls: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self.queries = {
+            name: Histogram(window) for name in ("acquire_ms", "query_ms", "rows")
+        }
+
+    def record_query(self, acquire_ms: float, query_ms: float, rows: int) -> None:
+        self.queries["acquire_ms"].add(acquire_ms)
+        self.queries["query_ms"].add(query_ms)
+        self.queries["rows"].add(rows)
+
+    def record_call(
+        self,
+        tool: str,
+        call: CallMetrics,
+        latency_ms: float,
+        size: int,
+        failed: bool,
+        arguments: dict[str, Any],
+    ) -> None:
+        histograms = self.tools.get(tool)
+        if histograms is None:
+            histograms = {name: Histogram(self.window) for name in MEASURES}
+            self.tools[tool] = histograms
+        values = {
+            "latency_ms": latency_ms,
+            "acquire_ms": call.acquire_ms,
+            "query_ms": call.query_ms,
+            "queries": call.queries,
+            "rows": call.rows,
+            "serialize_ms": call.serialize_ms,
+            "bytes": size,
+        }
+        for name, value in values.items():
+            histograms[name].add(value)
+        self.calls[tool] = self.calls.get(tool, 0) + 1
+        if failed:
+            self.errors[tool] = self.errors.get(tool, 0) + 1
+        if self.slow_call_ms and latency_ms >= self.slow_call_ms:
+            print(
+                f"supabase-schema-mcp: slow call {tool}({_format_args(arguments)})"
+                f" {latency_ms:.1f} ms: pool wait {call.acquire_ms:.1f} ms,"
+                f" {call.queries} queries {call.query_ms:.1f} ms,"
+                f" {call.rows} rows, serialize {call.serialize_ms:.1f} ms,"
+                f" {size} bytes{', failed' if failed else ''}",
+                file=sys.stderr,
+            )
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started, 1),
+            "window": self.window,
+            "queries": {name: h.summary() for name, h in self.queries.items()},
+            "tools": {
+                tool: {
+                    "calls": self.calls[tool],
+                    "errors": self.errors.get(tool, 0),
+                    **{name: h.summary() for name, h in histograms.items()},
+                }
+                for tool, histograms in sorted(self.tools.items())
+            },
+        }
+
+
+def _format_args(arguments: dict[str, Any]) -> str:
+    return ", ".join(f"{k}={v!r}" for k, v in arguments.items() if v is not None)
+
+
+_metrics: Metrics | None = None
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry, creating it on first use."""
+    global _metrics
+    if _metrics is None:
+        settings = get_settings()
+        _metrics = Metrics(settings.metrics_window, settings.metrics_slow_call_ms)
+    return _metrics
+
+
+def record_query(acquire_ms: float, query_ms: float, rows: int) -> None:
+    """Account one database query to the running tool call (if any)."""
+    if not get_settings().metrics_enabled:
+        return
+    get_metrics().record_query(acquire_ms, query_ms, rows)
+    call = _current.get()
+    if call is not None:
+        call.acquire_ms += acquire_ms
+        call.query_ms += query_ms
+        call.queries += 1
+        call.rows += rows
+
+
+def record_serialize(ms: float) -> None:
+    """Account JSON serialization time to the running tool call (if any)."""
+    call = _current.get()
+    if call is not None:
+        call.serialize_ms += ms
+
+
+def instrumented(fn: Callable[P, Awaitable[str]]) -> Callable[P, Awaitable[str]]:
+    """Record latency, database work, serialization and response size of a tool."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> str:
+        if not get_settings().metrics_enabled:
+            return await fn(*args, **kwargs)
+        call = CallMetrics()
+        token = _current.set(call)
+        start = time.perf_counter()
+        result = ""
+        failed = True
+        try:
+            result = await fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            _current.reset(token)
+            get_metrics().record_call(
+                fn.__name__,
+                call,
+                (time.perf_counter() - start) * 1000,
+                len(result.encode()),
+                failed,
+                kwargs,
+            )
+
+    return wrapper
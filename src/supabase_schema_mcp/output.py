@@ -0,0 +1,166 @@
+"""Rendering of tool results: keyset pagination, layouts and JSON serialization."""
+
+import base64
+import binascii
+import json
+import time
+from bisect import bisect_right
+from typing import Any
+
+from supabase_schema_mcp.catalog import SECTION_KEYS, Rows
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.metrics import record_serialize
+
+try:
+    import orjson
+except ImportError:  # optional: pip install supabase-schema-mcp[fast]
+    orjson = None
+
+# json: pretty-printed list of objects (the default).
+# compact: the same objects, minified.
+# columnar: {"columns": [...], "rows": [[...], ...]}, minified.
+# grouped: {schema: {table: [objects without schema/table]}}, minified.
+OUTPUT_FORMATS = ("json", "compact", "columnar", "grouped")
+
+
+def resolve_format(fmt: str | None) -> str:
+    """Return `fmt` or the configured default. Raises ValueError if unknown."""
+    fmt = fmt or get_settings().output_format
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown format {fmt!r}; expected one of {', '.join(OUTPUT_FORMATS)}"
+        )
+    return fmt
+
+
+def dump_json(obj: Any, fmt: str = "json") -> str:
+    """Serialize `obj`: indented for 'json', minified (orjson if present) otherwise."""
+    start = time.perf_counter()
+    if fmt == "json":
+        text = json.dumps(obj, indent=2)
+    elif orjson is not None:
+        text = orjson.dumps(obj).decode()
+    else:
+        text = json.dumps(obj, separators=(",", ":"))
+    record_serialize((time.perf_counter() - start) * 1000)
+    return text
+
+
+def _group_keys(row: dict[str, Any]) -> tuple[str, ...]:
+    if "table" in row:
+        return ("schema", "table")
+    if "from_table" in row:
+        return ("from_schema", "from_table")
+    return ("schema",)
+
+
+def apply_layout(rows: Rows, fmt: str) -> Any:
+    """Reshape rows for the columnar or grouped formats; other formats pass through."""
+    if fmt == "columnar":
+        columns = list(rows[0]) if rows else []
+        return {"columns": columns, "rows": [[r[c] for c in columns] for r in rows]}
+    if fmt == "grouped":
+        grouped: dict[str, Any] = {}
+        for r in rows:
+            keys = _group_keys(r)
+            rest = {k: v for k, v in r.items() if k not in keys}
+            if len(keys) == 1:
+                grouped.setdefault(r[keys[0]], []).append(rest)
+            else:
+                by_table = grouped.setdefault(r[keys[0]], {})
+                by_table.setdefault(r[keys[1]], []).append(rest)
+        return grouped
+    return rows
+
+
+def encode_cursor(key: tuple) -> str:
+    """Opaque cursor for the row whose sort key is `key`."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor. Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
+    if not isinstance(key, list):
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return tuple(key)
+
+
+def paginate(
+    section: str,
+    rows: Rows,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[Rows, str | None]:
+    """
+    Return the page of `rows` (sorted by the section key) that follows `cursor`,
+    at most `limit` rows (capped by page_size_max), plus the cursor of the next
+    page or None on the last page.
+    """
+    key_fn = SECTION_KEYS[section]
+    page_size = get_settings().page_size_max
+    if limit is not None:
+        page_size = max(1, min(limit, page_size))
+    start = 0
+    if cursor:
+        after = decode_cursor(cursor)
+        try:
+            start = bisect_right(rows, after, key=key_fn)
+        except TypeError as e:
+            raise ValueError(f"Invalid cursor {cursor!r}") from e
+    page = rows[start : start + page_size]
+    if start + page_size < len(rows):
+        return page, encode_cursor(key_fn(page[-1]))
+    return page, None
+
+
+def render(obj: Any, fmt: str | None = None) -> str:
+    """Serialize a single-object tool result (or error) in the requested format."""
+    try:
+        resolved = resolve_format(fmt)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    return dump_json(obj, "json" if resolved == "json" else "compact")
+
+
+def render_list(rows: Rows, fmt: str | None = None) -> str:
+    """Serialize a list result in its own order, with the columnar/grouped layouts."""
+    try:
+        resolved = resolve_format(fmt)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    return dump_json(apply_layout(rows, resolved), resolved)
+
+
+def render_rows(
+    section: str,
+    rows: Rows,
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
+    """
+    Serialize a list tool result. Without `limit` and `cursor`, a result of
+    at most page_size_max rows is a bare list (or layout); a paginated call,
+    or a larger result (its first page), returns {"items", "next_cursor",
+    "total"}, so no call sends an unbounded response.
+    """
+    if limit is None and cursor is None and len(rows) <= get_settings().page_size_max:
+        return render_list(rows, fmt)
+    try:
+        resolved = resolve_format(fmt)
+        page, next_cursor = paginate(section, rows, limit, cursor)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    items = apply_layout(page, resolved)
+    out: dict[str, Any] = {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total": len(rows),
+    }
+    return dump_json(out, resolved)
@@ -0,0 +1,543 @@
+"""
+Performance review of RLS policy expressions: per-row function calls,
+subqueries into other tables, and filter columns without an index.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from supabase_schema_mcp.catalog import SchemaSnapshot
+from supabase_schema_mcp.identifiers import quote_ident, quote_relation
+
+_TOKEN = re.compile(
+    r"""
+      (?P<literal>'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b)
+    | (?P<name>(?:"(?:[^"]|"")+"|[A-Za-z_][\w$]*)
+               (?:\.(?:"(?:[^"]|"")+"|[A-Za-z_][\w$]*))*)
+    | (?P<cast>::)
+    | (?P<op><>|!=|<=|>=|=|<|>)
+    | (?P<punct>[(),\[\]])
+    | (?P<other>\S)
+    """,
+    re.X,
+)
+_PART = re.compile(r'"(?:[^"]|"")+"|[^.]+')
+
+_KEYWORDS = frozenset(
+    """
+    all and any array as asc between by case cross current_role current_user
+    desc distinct else end exists false from full group having ilike in inner
+    is join lateral left like limit not null offset on or order outer right
+    select session_user similar some then true using when where
+    """.split()
+)
+# Function-call syntax that is an expression, not a function.
+_EXPRESSIONS = frozenset(
+    {"exists", "any", "all", "some", "array", "in", "coalesce", "nullif",
+     "greatest", "least", "not", "and", "or", "row", "values"}
+)
+# Words that continue a type name after `::`, e.g. ::character varying.
+_TYPE_WORDS = frozenset({"varying", "precision", "with", "without", "time", "zone"})
+# Non-immutable built-ins worth caching; others (now(), ...) are cheap.
+_BUILTIN_PER_ROW = frozenset({"current_setting"})
+
+_SEVERITY = {"high": 0, "medium": 1, "low": 2}
+_STRICTNESS = {"IMMUTABLE": 0, "STABLE": 1, "VOLATILE": 2}
+
+
+@dataclass
+class _Token:
+    kind: str
+    text: str
+    start: int
+    end: int
+    scope: int = 0
+
+
+@dataclass
+class _Scope:
+    parent: int | None
+    tables: dict[str, str] = field(default_factory=dict)  # alias -> schema.table
+    correlated: bool = False
+
+
+def _parts(name: str) -> list[str]:
+    return [
+        p[1:-1].replace('""', '"') if p.startswith('"') else p.lower()
+        for p in _PART.findall(name)
+    ]
+
+
+def _is_word(token: _Token) -> bool:
+    return token.kind == "name" and token.text.lower() not in _KEYWORDS
+
+
+def _tokenize(expr: str) -> list[_Token]:
+    """Tokens of a deparsed expression, without casts and `(column)` parens."""
+    raw = [
+        _Token(m.lastgroup or "other", m.group(), m.start(), m.end())
+        for m in _TOKEN.finditer(expr)
+    ]
+    tokens: list[_Token] = []
+    i = 0
+    while i < len(raw):
+        if raw[i].kind != "cast":
+            tokens.append(raw[i])
+            i += 1
+            continue
+        i += 2  # `::` and the type name
+        while i < len(raw) and raw[i].text.lower() in _TYPE_WORDS:
+            i += 1
+        if i < len(raw) and raw[i].text == "(":  # typmod, e.g. numeric(10,2)
+            while i < len(raw) and raw[i].text != ")":
+                i += 1
+            i += 1
+        while i + 1 < len(raw) and raw[i].text == "[" and raw[i + 1].text == "]":
+            i += 2
+    # `(user_id)` -> `user_id` (deparse parenthesizes cast operands).
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(tokens) - 2):
+            if (
+                tokens[i].text == "("
+                and _is_word(tokens[i + 1])
+                and tokens[i + 2].text == ")"
+                and not (i > 0 and tokens[i - 1].kind == "name")
+            ):
+                tokens[i : i + 3] = [tokens[i + 1]]
+                changed = True
+                break
+    return tokens
+
+
+@dataclass
+class Finding:
+    kind: str
+    severity: str
+    detail: str
+    suggestion: str | None = None
+
+
+class _PolicyAnalysis:
+    """Scopes, column references, comparisons and calls of one expression."""
+
+    def __init__(
+        self,
+        expr: str,
+        table: str,
+        catalog: "_Catalog",
+    ) -> None:
+        self.expr = expr
+        self.table = table
+        self.catalog = catalog
+        self.tokens = _tokenize(expr)
+        self.scopes = [_Scope(None, {table.split(".", 1)[1]: table, table: table})]
+        self._skip: set[int] = set()  # table names and aliases in FROM lists
+        self._assign_scopes()
+        self._read_from_lists()
+        self._mark_correlation()
+
+    def _assign_scopes(self) -> None:
+        stack: list[int | None] = []
+        current = 0
+        for i, token in enumerate(self.tokens):
+            token.scope = current
+            if token.text == "(":
+                nxt = self.tokens[i + 1] if i + 1 < len(self.tokens) else None
+                if nxt is not None and nxt.text.lower() == "select":
+                    self.scopes.append(_Scope(current))
+                    current = len(self.scopes) - 1
+                    stack.append(current)
+                else:
+                    stack.append(None)
+            elif token.text == ")" and stack:
+                if stack.pop() is not None:
+                    parent = self.scopes[current].parent
+                    current = 0 if parent is None else parent
+
+    def _read_from_lists(self) -> None:
+        tokens = self.tokens
+        for i, token in enumerate(tokens):
+            if token.text.lower() == "as" and i + 1 < len(tokens):
+                self._skip.add(i + 1)  # output column alias
+            if token.text.lower() not in ("from", "join"):
+                continue
+            j = i + 1
+            while j < len(tokens) and _is_word(tokens[j]):
+                if j + 1 < len(tokens) and tokens[j + 1].text == "(":
+                    break  # set-returning function
+                relation = self.catalog.relation(_parts(tokens[j].text), self.table)
+                alias = _parts(tokens[j].text)[-1]
+                self._skip.add(j)
+                j += 1
+                if j < len(tokens) and tokens[j].text.lower() == "as":
+                    j += 1
+                if j < len(tokens) and _is_word(tokens[j]):
+                    alias = _parts(tokens[j].text)[0]
+                    self._skip.add(j)
+                    j += 1
+                if relation is not None:
+                    self.scopes[token.scope].tables[alias] = relation
+                if j < len(tokens) and tokens[j].text == ",":
+                    j += 1
+                    continue
+                break
+
+    def _chain(self, scope: int) -> list[int]:
+        chain: list[int] = []
+        current: int | None = scope
+        while current is not None:
+            chain.append(current)
+            current = self.scopes[current].parent
+        return chain
+
+    def column(self, i: int) -> tuple[str, str, int] | None:
+        """(relation, column, scope it is bound in) of a column reference token."""
+        token = self.tokens[i]
+        if i in self._skip or not _is_word(token):
+            return None
+        if i + 1 < len(self.tokens) and self.tokens[i + 1].text == "(":
+            return None
+        parts = _parts(token.text)
+        for scope in self._chain(token.scope):
+            tables = self.scopes[scope].tables
+            if len(parts) >= 2:
+                relation = tables.get(".".join(parts[:-1])) or tables.get(parts[-2])
+                if relation is not None:
+                    return relation, parts[-1], scope
+            else:
+                owners = [
+                    r for r in set(tables.values())
+                    if parts[0] in self.catalog.columns.get(r, ())
+                ]
+                if len(owners) == 1:
+                    return owners[0], parts[0], scope
+        return None
+
+    def _mark_correlation(self) -> None:
+        for i, token in enumerate(self.tokens):
+            ref = self.column(i)
+            if ref is None:
+                continue
+            for scope in self._chain(token.scope):
+                if scope == ref[2]:
+                    break
+                self.scopes[scope].correlated = True
+
+    def _runs_once(self, scope: int) -> bool:
+        """True inside a subquery that does not reference the outer row."""
+        return any(not self.scopes[s].correlated for s in self._chain(scope)[:-1])
+
+    def _operand(self, i: int) -> str:
+        """'column', 'literal' or 'expression' for the operand token at i."""
+        if i < 0 or i >= len(self.tokens):
+            return "expression"
+        token = self.tokens[i]
+        if token.kind == "literal" or token.text.lower() in ("null", "true", "false"):
+            return "literal"
+        if token.text == "(" and i + 1 < len(self.tokens):
+            if self.tokens[i + 1].kind == "literal":
+                return "literal"
+        if self.column(i) is not None:
+            return "column"
+        return "expression"
+
+    def filter_columns(self) -> list[tuple[str, str, str]]:
+        """(relation, column, compared-with text) compared per row to a value."""
+        found: list[tuple[str, str, str]] = []
+        tokens = self.tokens
+        for i, token in enumerate(tokens):
+            if not (token.text == "=" or token.text.lower() == "in"):
+                continue
+            right = i + 1
+            if right < len(tokens) and tokens[right].text.lower() in ("any", "some"):
+                right += 1
+            sides = ((i - 1, right), (right, i - 1))
+            for this, other in sides:
+                if self._operand(this) != "column":
+                    continue
+                relation, name, scope = self.column(this) or ("", "", -1)
+                if scope != tokens[this].scope:
+                    continue  # an outer row's value, not scanned here
+                kind = self._operand(other)
+                if kind == "literal":
+                    continue
+                if kind == "column":
+                    other_ref = self.column(other)
+                    if other_ref and other_ref[2] == scope:
+                        continue  # two columns of the same row(s)
+                found.append((relation, name, self._describe(other)))
+        return found
+
+    def _match(self, i: int, step: int) -> int:
+        """Index of the parenthesis matching the one at i (step 1 or -1)."""
+        depth = 0
+        while 0 <= i < len(self.tokens):
+            if self.tokens[i].text in "()":
+                depth += 1 if self.tokens[i].text == ("(" if step > 0 else ")") else -1
+                if depth == 0:
+                    return i
+            i += step
+        return i - step
+
+    def _span(self, i: int) -> str:
+        """Source text of the call or parenthesized expression around token i."""
+        tokens = self.tokens
+        if tokens[i].text == ")":
+            start = self._match(i, -1)
+            if start > 0 and tokens[start - 1].kind == "name":
+                start -= 1
+            end = i
+        else:
+            start = i
+            end = self._match(i + 1 if tokens[i].kind == "name" else i, 1)
+        text = " ".join(self.expr[tokens[start].start : tokens[end].end].split())
+        return text if len(text) <= 80 else text[:77] + "..."
+
+    def _describe(self, i: int) -> str:
+        if not 0 <= i < len(self.tokens):
+            return "an expression"
+        token = self.tokens[i]
+        nxt = self.tokens[i + 1] if i + 1 < len(self.tokens) else None
+        if token.text in "()" or (nxt is not None and nxt.text == "("):
+            return self._span(i)
+        return token.text
+
+    def calls(self) -> list[tuple[str, str, bool, bool]]:
+        """(function, call text, has column arguments, per row) of each call."""
+        found = []
+        tokens = self.tokens
+        for i, token in enumerate(tokens[:-1]):
+            if token.kind != "name" or tokens[i + 1].text != "(":
+                continue
+            if token.text.lower() in _EXPRESSIONS or i in self._skip:
+                continue
+            depth, j, uses_columns = 0, i + 1, False
+            while j < len(tokens):
+                if tokens[j].text == "(":
+                    depth += 1
+                elif tokens[j].text == ")":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                elif self.column(j) is not None:
+                    uses_columns = True
+                j += 1
+            per_row = not self._runs_once(token.scope)
+            found.append((token.text, self._span(i), uses_columns, per_row))
+        return found
+
+    def schemas(self) -> set[str]:
+        """Schema qualifiers of the relations and functions the expression names."""
+        found = set()
+        for i, token in enumerate(self.tokens):
+            parts = _parts(token.text) if token.kind == "name" else []
+            if len(parts) < 2:
+                continue
+            nxt = self.tokens[i + 1] if i + 1 < len(self.tokens) else None
+            if i in self._skip or (nxt is not None and nxt.text == "("):
+                found.add(parts[-2])
+        return found
+
+    def subqueries(self) -> list[tuple[list[str], bool]]:
+        """(tables, correlated) of each subquery that reads tables."""
+        return [
+            (sorted(set(scope.tables.values())), scope.correlated)
+            for scope in self.scopes[1:]
+            if scope.tables
+        ]
+
+
+class _Catalog:
+    """Lookups over the 'all' snapshot: relations, columns, indexes, functions."""
+
+    def __init__(self, snapshot: SchemaSnapshot) -> None:
+        self.columns: dict[str, set[str]] = {}
+        for c in snapshot.columns:
+            self.columns.setdefault(f"{c['schema']}.{c['table']}", set()).add(
+                c["column"]
+            )
+        self._by_name: dict[str, list[str]] = {}
+        for name in sorted(self.columns):
+            self._by_name.setdefault(name.split(".", 1)[1], []).append(name)
+        self.leading: dict[str, set[str]] = {}
+        for ix in snapshot.indexes:
+            if ix["columns"]:
+                self.leading.setdefault(f"{ix['schema']}.{ix['table']}", set()).add(
+                    ix["columns"][0]
+                )
+        # Overloads may differ; keep the least strict volatility per name.
+        self.volatility: dict[str, str] = {}
+        for f in snapshot.functions:
+            key = f"{f['schema']}.{f['function']}"
+            current = self.volatility.get(key, "IMMUTABLE")
+            if _STRICTNESS.get(f["volatility"], 2) >= _STRICTNESS.get(current, 2):
+                self.volatility[key] = f["volatility"]
+
+    def relation(self, parts: list[str], table: str) -> str | None:
+        """schema.table of a (possibly unqualified) relation name in a policy."""
+        if len(parts) >= 2:
+            name = f"{parts[-2]}.{parts[-1]}"
+            return name if name in self.columns else None
+        # Deparsed names are unqualified when visible on the search_path.
+        for schema in ("public", table.split(".", 1)[0]):
+            if f"{schema}.{parts[0]}" in self.columns:
+                return f"{schema}.{parts[0]}"
+        matches = self._by_name.get(parts[0], [])
+        return matches[0] if len(matches) == 1 else None
+
+    def function(self, name: str) -> tuple[str, str] | None:
+        """(qualified name, volatility) of a non-immutable function, else None."""
+        parts = _parts(name)
+        if len(parts) == 1 and parts[0] in _BUILTIN_PER_ROW:
+            return parts[0], "STABLE"
+        candidates = [".".join(parts[-2:])] if len(parts) >= 2 else [
+            f"public.{parts[0]}"
+        ]
+        for key in candidates:
+            volatility = self.volatility.get(key)
+            if volatility is not None:
+                return (key, volatility) if volatility != "IMMUTABLE" else None
+        return None
+
+
+def audit_policy(
+    policy: dict[str, Any],
+    catalog: _Catalog,
+    function_reads: dict[str, list[str]],
+) -> list[Finding]:
+    """Findings for the USING and WITH CHECK expressions of one policy."""
+    table = f"{policy['schema']}.{policy['table']}"
+    findings: list[Finding] = []
+    seen: set[tuple[str, str]] = set()
+
+    def add(key: tuple[str, str], finding: Finding) -> None:
+        if key not in seen:
+            seen.add(key)
+            findings.append(finding)
+
+    for clause in ("using", "with_check"):
+        expr = policy.get(clause)
+        if not expr:
+            continue
+        analysis = _PolicyAnalysis(expr, table, catalog)
+        for relation, column, other in analysis.filter_columns():
+            if column in catalog.leading.get(relation, ()):
+                continue
+            quoted, quoted_column = quote_relation(relation), quote_ident(column)
+            add(
+                ("index", f"{relation}.{column}"),
+                Finding(
+                    "unindexed_column",
+                    "high",
+                    f"{quoted}.{quoted_column} is compared with {other}, "
+                    f"but no index on {quoted} starts with it, so rows "
+                    "are filtered by a scan",
+                    f"CREATE INDEX ON {quoted} ({quoted_column});",
+                ),
+            )
+        for name, call, uses_columns, per_row in analysis.calls():
+            function = catalog.function(name)
+            if function is None or not per_row:
+                continue
+            qualified, volatility = function
+            reads = function_reads.get(qualified, [])
+            names = ", ".join(quote_relation(r) for r in reads)
+            also = f" and reads {names}" if reads else ""
+            if uses_columns:
+                finding = Finding(
+                    "row_dependent_function",
+                    "high" if reads else "medium",
+                    f"{call} ({volatility}) takes column values, so it runs "
+                    f"for every row{also}",
+                    "Compare the column with a set computed once instead, e.g. "
+                    "column IN (SELECT ...) over the function's lookup",
+                )
+            else:
+                finding = Finding(
+                    "per_row_function",
+                    "high" if reads else "medium",
+                    f"{call} ({volatility}) is evaluated for every row{also}",
+                    f"Wrap it in a subquery so it runs once: (SELECT {call})",
+                )
+            add(("call", name), finding)
+        for tables, correlated in analysis.subqueries():
+            names = ", ".join(quote_relation(t) for t in tables)
+            if correlated:
+                finding = Finding(
+                    "correlated_subquery",
+                    "medium",
+                    f"Subquery on {names} references the row, so it runs for "
+                    "every row checked",
+                    "Rewrite as column IN (SELECT ...) without outer references "
+                    "so it runs once per statement",
+                )
+            else:
+                finding = Finding(
+                    "subquery",
+                    "low",
+                    f"Joins to {names} in a subquery that runs once per statement",
+                )
+            add(("subquery", names), finding)
+    return findings
+
+
+def referenced_schemas(policies: list[dict[str, Any]]) -> list[str]:
+    """
+    Schemas the audit of `policies` looks into: the policies' own, public
+    (where unqualified names resolve), and the schema of every qualified
+    relation or function in their expressions, such as auth for auth.uid().
+    """
+    catalog = _Catalog(SchemaSnapshot(""))
+    schemas = {"public"}
+    for policy in policies:
+        schemas.add(policy["schema"])
+        table = f"{policy['schema']}.{policy['table']}"
+        for clause in ("using", "with_check"):
+            if policy.get(clause):
+                schemas |= _PolicyAnalysis(policy[clause], table, catalog).schemas()
+    return sorted(schemas)
+
+
+def audit(
+    policies: list[dict[str, Any]],
+    snapshot: SchemaSnapshot,
+    sizes: dict[str, tuple[int, int]],
+    function_reads: dict[str, list[str]],
+) -> list[dict[str, Any]]:
+    """
+    Findings of every policy, largest tables first (then by severity).
+    `sizes` maps schema.table to (estimated rows, total bytes).
+    """
+    catalog = _Catalog(snapshot)
+    rows = []
+    for policy in policies:
+        table = f"{policy['schema']}.{policy['table']}"
+        estimate, total_bytes = sizes.get(table, (0, 0))
+        for finding in audit_policy(policy, catalog, function_reads):
+            rows.append(
+                {
+                    "schema": policy["schema"],
+                    "table": policy["table"],
+                    "policy": policy["policy"],
+                    "command": policy["command"],
+                    "rows_estimate": estimate,
+                    "total_bytes": total_bytes,
+                    "kind": finding.kind,
+                    "severity": finding.severity,
+                    "detail": finding.detail,
+                    "suggestion": finding.suggestion,
+                }
+            )
+    rows.sort(
+        key=lambda r: (
+            -r["total_bytes"],
+            _SEVERITY[r["severity"]],
+            r["schema"],
+            r["table"],
+            r["policy"],
+        )
+    )
+    return rows
@@ -0,0 +1,319 @@
+"""In-memory token and trigram index over schema object names and definitions."""
+
+import re
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from supabase_schema_mcp.catalog import SchemaSnapshot
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.db import fetch_all
+from supabase_schema_mcp.snapshot import get_schema_snapshots
+from supabase_schema_mcp.targets import TargetLRU
+
+KINDS = (
+    "table",
+    "view",
+    "column",
+    "enum",
+    "enum_value",
+    "function",
+    "policy",
+    "trigger",
+)
+
+_WORD = re.compile(r"[a-z0-9]+")
+# A word of an identifier or text: snake_case splits at the underscore,
+# camelCase before an upper-case letter that follows a lower-case one or digit.
+_TOKEN = re.compile(r"[A-Z]+[a-z0-9]*|[a-z0-9]+")
+# Too common in function bodies and policy expressions to say anything.
+_STOPWORDS = frozenset(
+    "select from where and or not null is as on in the begin end return returns"
+    " then if else into new old true false with declare perform".split()
+)
+
+# Score of one query word against a document, by the best way it matches.
+_EXACT_NAME = 100.0  # the whole name is this word
+_NAME_WORD = 60.0  # one of the name's words
+_NAME_PREFIX = 40.0  # a name word starts with it (3+ characters)
+_TRIGRAM = 50.0  # times trigram similarity, if at least _MIN_SIMILARITY
+_BODY_WORD = 8.0  # appears in the function body / policy / view definition
+_MIN_SIMILARITY = 0.3
+
+
+def _fold(word: str) -> str:
+    """Crude plural folding so 'invoices' finds 'invoice' and vice versa."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def words(text: str) -> list[str]:
+    """Lowercased, plural-folded words of an identifier or text (snake/camelCase)."""
+    return [_fold(m.group().lower()) for m in _TOKEN.finditer(text)]
+
+
+def trigrams(text: str) -> set[str]:
+    """pg_trgm-style trigrams: each word padded with two spaces before, one after."""
+    result: set[str] = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+@dataclass(frozen=True)
+class Document:
+    """One searchable schema object."""
+
+    kind: str
+    schema: str
+    table: str | None
+    name: str
+    detail: str | None = None
+    body: str = ""
+
+
+class SchemaIndex:
+    """
+    Postings for one schema's objects: name words and body words to
+    documents, and trigrams to the name words containing them, so a typo is
+    matched against each word of a name rather than the name as a whole.
+    """
+
+    def __init__(self, documents: list[Document]) -> None:
+        self.documents = documents
+        self._name_words: dict[str, list[int]] = {}
+        self._body_words: dict[str, list[int]] = {}
+        self._single_word: list[str | None] = []
+        for i, doc in enumerate(documents):
+            name_words = set(words(doc.name))
+            for word in name_words:
+                self._name_words.setdefault(word, []).append(i)
+            self._single_word.append(
+                next(iter(name_words)) if len(name_words) == 1 else None
+            )
+            for word in set(words(doc.body)) - _STOPWORDS:
+                self._body_words.setdefault(word, []).append(i)
+        self._sorted_words = sorted(self._name_words)
+        self._trigrams: dict[str, list[str]] = {}
+        self._trigram_counts: dict[str, int] = {}
+        for word in self._sorted_words:
+            grams = trigrams(word)
+            self._trigram_counts[word] = len(grams)
+            for gram in grams:
+                self._trigrams.setdefault(gram, []).append(word)
+
+    def _prefixed(self, word: str) -> list[str]:
+        """Name words that start with `word` (other than `word` itself)."""
+        start = bisect_left(self._sorted_words, word)
+        result = []
+        for candidate in self._sorted_words[start:]:
+            if not candidate.startswith(word):
+                break
+            if candidate != word:
+                result.append(candidate)
+        return result
+
+    def score(self, word: str) -> tuple[dict[int, float], dict[int, float]]:
+        """(name score, body score) per matching document for one query word."""
+        name: dict[int, float] = {}
+
+        def offer(docs: list[int], value: float) -> None:
+            for doc in docs:
+                if value > name.get(doc, 0.0):
+                    name[doc] = value
+
+        for doc in self._name_words.get(word, ()):
+            exact = self._single_word[doc] == word
+            offer([doc], _EXACT_NAME if exact else _NAME_WORD)
+        if len(word) >= 3:
+            for prefixed in self._prefixed(word):
+                offer(self._name_words[prefixed], _NAME_PREFIX)
+        grams = trigrams(word)
+        common = Counter[str]()
+        for gram in grams:
+            common.update(self._trigrams.get(gram, ()))
+        for candidate, shared in common.items():
+            union = len(grams) + self._trigram_counts[candidate] - shared
+            if candidate != word and shared / union >= _MIN_SIMILARITY:
+                offer(self._name_words[candidate], _TRIGRAM * shared / union)
+        body = {doc: _BODY_WORD for doc in self._body_words.get(word, ())}
+        return name, body
+
+
+def _snippet(body: str, word: str, width: int = 60) -> str:
+    """
+    The part of `body` around the first word that `words` turns into `word`
+    (a folded query word), on one line.
+    """
+    for match in _TOKEN.finditer(body):
+        if _fold(match.group().lower()) == word:
+            break
+    else:
+        return ""
+    start, end = max(0, match.start() - width), match.end() + width
+    text = " ".join(body[start:end].split())
+    return ("..." if start else "") + text + ("..." if end < len(body) else "")
+
+
+def _documents(
+    snapshot: SchemaSnapshot, sources: dict[tuple[str, str], str]
+) -> list[Document]:
+    schema = snapshot.schema
+    docs = [Document("table", schema, None, t["table"]) for t in snapshot.tables]
+    docs += [
+        Document("view", schema, None, v["view"], body=v["definition_preview"])
+        for v in snapshot.views
+    ]
+    docs += [
+        Document("column", schema, c["table"], c["column"], c["full_type"])
+        for c in snapshot.columns
+    ]
+    for e in snapshot.enums:
+        docs.append(Document("enum", schema, None, e["enum"], ", ".join(e["labels"])))
+        docs += [
+            Document("enum_value", schema, None, label, e["enum"])
+            for label in e["labels"]
+        ]
+    docs += [
+        Document(
+            "function",
+            schema,
+            None,
+            f["function"],
+            f"({f['arguments']})",
+            sources.get((f["function"], f["arguments"]), ""),
+        )
+        for f in snapshot.functions
+    ]
+    docs += [
+        Document(
+            "policy",
+            schema,
+            p["table"],
+            p["policy"],
+            p["command"],
+            "\n".join(e for e in (p["using"], p["with_check"]) if e),
+        )
+        for p in snapshot.policies
+    ]
+    triggers: dict[tuple[str, str], dict[str, Any]] = {}
+    for t in snapshot.triggers:
+        triggers.setdefault((t["table"], t["trigger"]), t)
+    docs += [
+        Document("trigger", schema, table, name, t["timing"], t["action"] or "")
+        for (table, name), t in triggers.items()
+    ]
+    return docs
+
+
+async def _load_function_sources(
+    schemas: list[str],
+) -> dict[str, dict[tuple[str, str], str]]:
+    """prosrc of every function in `schemas`, by schema then (name, arguments)."""
+    rows = await fetch_all(
+        """
+        SELECT n.nspname AS schema_name, p.proname AS function_name,
+               pg_get_function_arguments(p.oid) AS arguments, p.prosrc AS source
+        FROM pg_proc p
+        JOIN pg_namespace n ON n.oid = p.pronamespace
+        WHERE n.nspname = ANY($1::text[])
+        """,
+        schemas,
+    )
+    result: dict[str, dict[tuple[str, str], str]] = {}
+    for r in rows:
+        key = (r["function_name"], r["arguments"])
+        result.setdefault(r["schema_name"], {})[key] = r["source"] or ""
+    return result
+
+
+class SearchIndex:
+    """
+    One SchemaIndex per schema, each rebuilt only when the snapshot cache
+    hands out a new snapshot for that schema (i.e. after its DDL changed).
+    """
+
+    def __init__(self) -> None:
+        self._schemas: dict[str, tuple[SchemaSnapshot, SchemaIndex]] = {}
+
+    async def refresh(self, schema_name: str) -> list[SchemaIndex]:
+        """Rebuild the indexes of changed schemas; return those for `schema_name`."""
+        snapshots = await get_schema_snapshots(schema_name)
+        changed = [
+            name
+            for name, snapshot in snapshots.items()
+            if name not in self._schemas or self._schemas[name][0] is not snapshot
+        ]
+        if changed:
+            sources = await _load_function_sources(changed)
+            for name in changed:
+                documents = _documents(snapshots[name], sources.get(name, {}))
+                self._schemas[name] = (snapshots[name], SchemaIndex(documents))
+        if schema_name == "all":
+            for name in set(self._schemas) - set(snapshots):
+                del self._schemas[name]
+        return [self._schemas[name][1] for name in snapshots]
+
+    async def search(
+        self,
+        query: str,
+        schema_name: str = "all",
+        kinds: list[str] | None = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """Best matches for `query`, highest score first."""
+        query_words = list(dict.fromkeys(w for w in words(query) if len(w) > 1))
+        hits: list[tuple[float, int, Document, bool, bool]] = []
+        for index in await self.refresh(schema_name):
+            name_scores: Counter[int] = Counter()
+            body_scores: Counter[int] = Counter()
+            for word in query_words:
+                name, body = index.score(word)
+                name_scores.update(name)
+                body_scores.update(body)
+            for doc_id in name_scores.keys() | body_scores.keys():
+                doc = index.documents[doc_id]
+                if kinds and doc.kind not in kinds:
+                    continue
+                score = name_scores[doc_id] + body_scores[doc_id]
+                kind = KINDS.index(doc.kind)
+                in_name, in_body = doc_id in name_scores, doc_id in body_scores
+                hits.append((score, kind, doc, in_name, in_body))
+        hits.sort(
+            key=lambda h: (-h[0], h[1], h[2].schema, h[2].table or "", h[2].name)
+        )
+        results = []
+        for score, _, doc, in_name, in_body in hits[:limit]:
+            result: dict[str, Any] = {"kind": doc.kind, "schema": doc.schema}
+            if doc.table is not None:
+                result["table"] = doc.table
+            result["name"] = doc.name
+            if doc.detail:
+                result["detail"] = doc.detail
+            result["score"] = round(score, 1)
+            result["matched"] = ", ".join(
+                part for part, hit in (("name", in_name), ("body", in_body)) if hit
+            )
+            if in_body:
+                body_words = set(words(doc.body))
+                word = next(w for w in query_words if w in body_words)
+                if snippet := _snippet(doc.body, word):
+                    result["snippet"] = snippet
+            results.append(result)
+        return results
+
+
+_indexes: TargetLRU[SearchIndex] | None = None
+
+
+def get_index() -> SearchIndex:
+    """Return the current target's search index, creating it on first use."""
+    global _indexes
+    if _indexes is None:
+        _indexes = TargetLRU(get_settings().schema_cache_max_targets)
+    return _indexes.get(lambda _target: SearchIndex())
@@ -1,124 +1,642 @@
 """MCP server entry point and tool registration."""
 
+import argparse
+import asyncio
+import importlib
 import json
+import sys
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, ParamSpec
 
 from mcp.server.fastmcp import FastMCP
-from rich.console import Console
-from rich.panel import Panel
-from rich.syntax import Syntax
+from mcp.server.transport_security import TransportSecuritySettings
+from starlette.applications import Starlette
+
+from supabase_schema_mcp.coalesce import coalesced
+from supabase_schema_mcp.config import get_env_warnings, get_settings
+from supabase_schema_mcp.limits import limited
+from supabase_schema_mcp.metrics import instrumented
+from supabase_schema_mcp.targets import targeted
+from supabase_schema_mcp.timeouts import stale_on_timeout
+
+P = ParamSpec("P")
+
+# Set when serving over HTTP, where sessions come and go but share the pool.
+_pool_owned_by_app = False
+_LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+_WILDCARD_HOSTS = ("0.0.0.0", "::", "")
+
+
+@asynccontextmanager
+async def _lifespan(_server: FastMCP) -> AsyncIterator[None]:
+    """
+    Per-session lifespan. Over stdio the one session lasts as long as the
+    process, so it owns the pool; over HTTP the app lifespan does.
+    """
+    if _pool_owned_by_app:
+        yield
+        return
+    async with _pool_lifespan():
+        yield
+
+
+async def _warm_pool() -> None:
+    """Import the database driver in a thread, then open the pool."""
+    db = await asyncio.to_thread(importlib.import_module, "supabase_schema_mcp.db")
+    await db.warm_pool()
+
+
+@asynccontextmanager
+async def _pool_lifespan() -> AsyncIterator[None]:
+    """
+    Warm the pool in the background while clients connect; close it and the
+    Management API client on exit. The driver and tool modules are imported
+    on first use, so `initialize` is answered without waiting for them.
+    """
+    settings = get_settings()
+    warmup = None
+    if settings.db_pool_warmup and settings.db_connection_configured:
+        warmup = asyncio.create_task(_warm_pool())
+    try:
+        yield
+    finally:
+        from supabase_schema_mcp.db import close_pool
+        from supabase_schema_mcp.management_api import close_client
+
+        if warmup is not None:
+            await warmup
+        await close_pool()
+        await close_client()
 
-from supabase_schema_mcp.config import get_env_warnings
-from supabase_schema_mcp.tools import functions as tools_functions
-from supabase_schema_mcp.tools import relationships as tools_relationships
-from supabase_schema_mcp.tools import rls as tools_rls
-from supabase_schema_mcp.tools import schema as tools_schema
-from supabase_schema_mcp.tools import triggers as tools_triggers
 
 mcp = FastMCP(
     "supabase-schema-mcp",
     json_response=True,
+    lifespan=_lifespan,
 )
 
 
+def _tool(
+    per_target: bool = True, reuse_results: bool = True
+) -> Callable[[Callable[P, Awaitable[str]]], Callable[P, Awaitable[str]]]:
+    """
+    Register a tool with the wrappers every tool shares, outermost first:
+    metrics, per-client limits, then target selection (`per_target`), and
+    coalescing with stale answers on timeout (`reuse_results`).
+    """
+
+    def register(fn: Callable[P, Awaitable[str]]) -> Callable[P, Awaitable[str]]:
+        if reuse_results:
+            fn = coalesced(stale_on_timeout(fn))
+        if per_target:
+            fn = targeted(fn)
+        return mcp.tool()(instrumented(limited(fn)))
+
+    return register
+
+
 # ---- Schema tools ----
-@mcp.tool()
-async def schema_list_tables(schema_name: str = "public") -> str:
+@_tool()
+async def schema_list_tables(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
     """List tables in the schema (default: public). Use schema_name='all' for all."""
-    return await tools_schema.list_tables(schema_name)
+    from supabase_schema_mcp.tools import schema as tools_schema
+
+    return await tools_schema.list_tables(schema_name, limit, cursor, format)
 
 
-@mcp.tool()
+@_tool()
 async def schema_list_columns(
     schema_name: str = "public",
     table_name: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
 ) -> str:
     """List columns for tables in the schema. Optionally restrict to one table."""
-    return await tools_schema.list_columns(schema_name, table_name)
+    from supabase_schema_mcp.tools import schema as tools_schema
+
+    return await tools_schema.list_columns(
+        schema_name, table_name, limit, cursor, format
+    )
 
 
-@mcp.tool()
-async def schema_list_views(schema_name: str = "public") -> str:
+@_tool()
+async def schema_list_views(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
     """List views in the given schema. Use schema_name='all' for all user schemas."""
-    return await tools_schema.list_views(schema_name)
+    from supabase_schema_mcp.tools import schema as tools_schema
 
+    return await tools_schema.list_views(schema_name, limit, cursor, format)
 
-@mcp.tool()
-async def schema_list_enums(schema_name: str = "public") -> str:
+
+@_tool()
+async def schema_list_enums(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
     """List custom enum types. Use schema_name='all' for all user schemas."""
-    return await tools_schema.list_enums(schema_name)
+    from supabase_schema_mcp.tools import schema as tools_schema
+
+    return await tools_schema.list_enums(schema_name, limit, cursor, format)
+
+
+@_tool()
+async def schema_describe_tables(
+    schema_name: str,
+    table_names: list[str],
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """
+    Columns, constraints, indexes, foreign keys in and out, RLS policies and
+    triggers of several tables in one call. Prefer this over calling the list
+    tools table by table.
+    """
+    from supabase_schema_mcp.tools import schema as tools_schema
+
+    return await tools_schema.describe_tables(schema_name, table_names, format)
+
+
+@_tool()
+async def schema_export_ddl(
+    schema_name: str = "public",
+    path: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """
+    CREATE script for a schema (types, sequences, functions, tables,
+    constraints, views, indexes, foreign keys, RLS policies, triggers) in
+    dependency order. Returned in chunks continued with cursor, or written to
+    path (relative to DDL_EXPORT_DIR).
+    """
+    from supabase_schema_mcp.tools import schema as tools_schema
+
+    return await tools_schema.export_ddl(schema_name, path, limit, cursor, format)
+
+
+@_tool()
+async def schema_search(
+    query: str,
+    schema_name: str = "all",
+    kinds: list[str] | None = None,
+    limit: int = 20,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """
+    Ranked fuzzy search over table, view, column, enum (value), function, policy
+    and trigger names, function bodies and policy/view definitions.
+    kinds restricts the object kinds, e.g. ["table", "column"].
+    """
+    from supabase_schema_mcp.tools import search as tools_search
+
+    return await tools_search.search_schema(query, schema_name, kinds, limit, format)
 
 
 # ---- RLS tools ----
-@mcp.tool()
-async def rls_list_policies(schema_name: str = "public") -> str:
+@_tool()
+async def rls_list_policies(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
     """List RLS policies (table, policy, command). schema_name='all' for all schemas."""
-    return await tools_rls.list_rls_policies(schema_name)
+    from supabase_schema_mcp.tools import rls as tools_rls
 
+    return await tools_rls.list_rls_policies(schema_name, limit, cursor, format)
 
-@mcp.tool()
-async def rls_list_coverage(schema_name: str = "public") -> str:
+
+@_tool()
+async def rls_list_coverage(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
     """Report tables with RLS enabled and policy counts. schema_name='all' for all."""
-    return await tools_rls.list_rls_coverage(schema_name)
+    from supabase_schema_mcp.tools import rls as tools_rls
+
+    return await tools_rls.list_rls_coverage(schema_name, limit, cursor, format)
 
 
-@mcp.tool()
+@_tool()
 async def rls_get_policy(
-    schema_name: str, table_name: str, policy_name: str
+    schema_name: str,
+    table_name: str,
+    policy_name: str,
+    format: str | None = None,
+    target: str | None = None,
 ) -> str:
     """Return the definition (USING and WITH CHECK code) of an RLS policy by name."""
+    from supabase_schema_mcp.tools import rls as tools_rls
+
     return await tools_rls.get_rls_policy_definition(
-        schema_name, table_name, policy_name
+        schema_name, table_name, policy_name, format
     )
 
 
+@_tool()
+async def rls_performance_audit(
+    schema_name: str = "public",
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """RLS policies that run functions or subqueries per row or miss an index."""
+    from supabase_schema_mcp.tools import rls as tools_rls
+
+    return await tools_rls.audit_rls_performance(schema_name, format)
+
+
 # ---- Function / RPC tools ----
-@mcp.tool()
-async def functions_list(schema_name: str = "public") -> str:
+@_tool()
+async def functions_list(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
     """List Postgres functions (signature, return type). schema_name='all' for all."""
-    return await tools_functions.list_functions(schema_name)
+    from supabase_schema_mcp.tools import functions as tools_functions
 
+    return await tools_functions.list_functions(schema_name, limit, cursor, format)
 
-@mcp.tool()
-async def functions_list_rpc_candidates(schema_name: str = "public") -> str:
+
+@_tool()
+async def functions_list_rpc_candidates(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
     """List Supabase RPC-callable function candidates. schema_name='all' for all."""
-    return await tools_functions.list_rpc_candidates(schema_name)
+    from supabase_schema_mcp.tools import functions as tools_functions
+
+    return await tools_functions.list_rpc_candidates(schema_name, limit, cursor, format)
 
 
-@mcp.tool()
-async def functions_get_definition(schema_name: str, function_name: str) -> str:
+@_tool()
+async def functions_get_definition(
+    schema_name: str,
+    function_name: str,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
     """Return the full source code (CREATE FUNCTION) of an RPC/function by name."""
-    return await tools_functions.get_function_definition(schema_name, function_name)
+    from supabase_schema_mcp.tools import functions as tools_functions
+
+    return await tools_functions.get_function_definition(
+        schema_name, function_name, format
+    )
+
+
+@_tool()
+async def functions_dependencies(
+    schema_name: str,
+    function_name: str,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """Tables/views a function reads and writes, and the functions it calls."""
+    from supabase_schema_mcp.tools import functions as tools_functions
+
+    return await tools_functions.get_function_dependencies(
+        schema_name, function_name, format
+    )
+
+
+@_tool()
+async def functions_using_table(
+    schema_name: str,
+    table_name: str,
+    access: str = "any",
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """Functions that read or write a table or view. access: any, read, write."""
+    from supabase_schema_mcp.tools import functions as tools_functions
+
+    return await tools_functions.list_functions_using_table(
+        schema_name, table_name, access, limit, cursor, format
+    )
 
 
 # ---- Relationship tools ----
-@mcp.tool()
-async def relationships_list_foreign_keys(schema_name: str = "public") -> str:
+@_tool()
+async def relationships_list_foreign_keys(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
     """List foreign keys (from/to table and columns). schema_name='all' for all."""
-    return await tools_relationships.list_foreign_keys(schema_name)
+    from supabase_schema_mcp.tools import relationships as tools_relationships
+
+    return await tools_relationships.list_foreign_keys(
+        schema_name, limit, cursor, format
+    )
 
 
-@mcp.tool()
+@_tool()
 async def relationships_list_indexes(
     schema_name: str = "public",
     table_name: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
 ) -> str:
     """List indexes (table, index, columns). schema_name='all' for all schemas."""
-    return await tools_relationships.list_indexes(schema_name, table_name)
+    from supabase_schema_mcp.tools import relationships as tools_relationships
+
+    return await tools_relationships.list_indexes(
+        schema_name, table_name, limit, cursor, format
+    )
+
+
+@_tool()
+async def indexes_advise(
+    schema_name: str = "public",
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """Unindexed foreign keys and duplicate, prefix, partial, expression indexes."""
+    from supabase_schema_mcp.tools import relationships as tools_relationships
+
+    return await tools_relationships.advise_indexes(schema_name, format)
+
+
+@_tool()
+async def stats_tables(
+    schema_name: str = "public",
+    sort_by: str = "size",
+    limit: int | None = 20,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """Table size, scans, writes, dead tuples and vacuum times, largest first."""
+    from supabase_schema_mcp.tools import stats as tools_stats
+
+    return await tools_stats.table_stats(schema_name, sort_by, limit, format)
+
+
+@_tool()
+async def stats_indexes(
+    schema_name: str = "public",
+    table_name: str | None = None,
+    sort_by: str = "size",
+    limit: int | None = 20,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """Index size and scan counts; sort_by size, scans or tuples_read."""
+    from supabase_schema_mcp.tools import stats as tools_stats
+
+    return await tools_stats.index_stats(
+        schema_name, table_name, sort_by, limit, format
+    )
+
+
+@_tool()
+async def explain_query(
+    sql: str,
+    role: str | None = None,
+    claims: dict[str, Any] | None = None,
+    include_plan: bool = False,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """EXPLAIN a statement read-only, optionally as a role with JWT claims (RLS)."""
+    from supabase_schema_mcp.tools import query as tools_query
+
+    return await tools_query.explain_query(sql, role, claims, include_plan, format)
+
+
+@_tool()
+async def relationships_join_path(
+    schema_name: str,
+    from_table: str,
+    to_table: str,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """Shortest FK join path between two tables, with a JOIN clause per step."""
+    from supabase_schema_mcp.tools import relationships as tools_relationships
+
+    return await tools_relationships.find_join_path(
+        schema_name, from_table, to_table, format
+    )
+
+
+@_tool()
+async def relationships_neighbors(
+    schema_name: str,
+    table_name: str,
+    max_hops: int = 1,
+    direction: str = "both",
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """Tables within max_hops FK steps; direction 'out', 'in' or 'both'."""
+    from supabase_schema_mcp.tools import relationships as tools_relationships
+
+    return await tools_relationships.list_related_tables(
+        schema_name, table_name, max_hops, direction, format
+    )
+
+
+@_tool()
+async def relationships_cascade(
+    schema_name: str,
+    table_name: str,
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """What deleting a row cascades to, nulls out, or is blocked by (via FKs)."""
+    from supabase_schema_mcp.tools import relationships as tools_relationships
+
+    return await tools_relationships.list_cascade_dependents(
+        schema_name, table_name, format
+    )
+
+
+@_tool()
+async def relationships_cycles(
+    schema_name: str = "public",
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """Tables that reference each other in FK cycles, incl. self-references."""
+    from supabase_schema_mcp.tools import relationships as tools_relationships
+
+    return await tools_relationships.list_fk_cycles(schema_name, format)
 
 
 # ---- Trigger tools ----
-@mcp.tool()
+@_tool()
 async def triggers_list(
     schema_name: str = "public",
     table_name: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    format: str | None = None,
+    target: str | None = None,
 ) -> str:
     """List triggers (table, trigger, timing, event). schema_name='all' for all."""
-    return await tools_triggers.list_triggers(schema_name, table_name)
+    from supabase_schema_mcp.tools import triggers as tools_triggers
+
+    return await tools_triggers.list_triggers(
+        schema_name, table_name, limit, cursor, format
+    )
+
+
+# ---- Project ----
+@_tool(reuse_results=False)
+async def project_get_info(
+    format: str | None = None,
+    target: str | None = None,
+) -> str:
+    """Project id, name, ref and region from the Supabase Management API (cached)."""
+    from supabase_schema_mcp.tools import project as tools_project
+
+    return await tools_project.get_project_info(format)
+
+
+# ---- Diagnostics ----
+@_tool(per_target=False, reuse_results=False)
+async def server_stats(format: str | None = None) -> str:
+    """Per-tool latency, DB time, rows and payload histograms; pool/cache state."""
+    from supabase_schema_mcp.tools import diagnostics as tools_diagnostics
+
+    return await tools_diagnostics.server_stats(format)
+
 
+@_tool(per_target=False, reuse_results=False)
+async def targets_list(format: str | None = None) -> str:
+    """Configured database targets; pass one as `target` to any schema tool."""
+    from supabase_schema_mcp.tools import diagnostics as tools_diagnostics
 
-def _mcp_json_snippet() -> str:
-    """Generate the mcpServers entry for this server with current directory."""
+    return await tools_diagnostics.list_targets(format)
+
+
+@mcp.resource(
+    "stats://server",
+    name="server_stats",
+    description="Same report as the server_stats tool",
+    mime_type="application/json",
+)
+def server_stats_resource() -> str:
+    from supabase_schema_mcp.output import dump_json
+    from supabase_schema_mcp.tools import diagnostics as tools_diagnostics
+
+    return dump_json(tools_diagnostics.collect_stats())
+
+
+def _transport_security(host: str) -> TransportSecuritySettings:
+    """
+    Host/Origin checks for the HTTP transports: loopback names, the bind
+    address (unless a wildcard) and HTTP_ALLOWED_HOSTS, on any port. Only
+    HTTP_DISABLE_HOST_CHECK turns the checks off.
+    """
+    settings = get_settings()
+    if settings.http_disable_host_check:
+        return TransportSecuritySettings(enable_dns_rebinding_protection=False)
+    names = list(_LOOPBACK_HOSTS)
+    if host not in _WILDCARD_HOSTS:
+        names.append(host)
+    names += filter(None, (n.strip() for n in settings.http_allowed_hosts.split(",")))
+    hosts: list[str] = []
+    origins: list[str] = []
+    for name in dict.fromkeys(names):
+        if ":" in name and not name.startswith("["):
+            name = f"[{name}]"  # IPv6 literal, as in a Host header
+        hosts += [name, f"{name}:*"]
+        origins += [
+            f"{scheme}://{name}{port}"
+            for scheme in ("http", "https")
+            for port in ("", ":*")
+        ]
+    return TransportSecuritySettings(allowed_hosts=hosts, allowed_origins=origins)
+
+
+def http_app(transport: str, host: str) -> Starlette:
+    """
+    The Starlette app for the streamable-http or sse transport. Every client
+    session shares one pool and snapshot cache; the pool is warmed at startup
+    and closed after the sessions on shutdown.
+    """
+    global _pool_owned_by_app
+    _pool_owned_by_app = True
+    mcp.settings.host = host
+    mcp.settings.transport_security = _transport_security(host)
+    app = mcp.streamable_http_app() if transport == "streamable-http" else mcp.sse_app()
+    sessions = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with _pool_lifespan():
+            async with sessions(app):
+                yield
+
+    app.router.lifespan_context = lifespan
+    return app
+
+
+async def _serve_http(transport: str, host: str, port: int) -> None:
+    """
+    Serve over HTTP until SIGINT/SIGTERM, then stop accepting connections, give
+    running requests http_shutdown_timeout seconds and close the pool.
+    """
+    import uvicorn
+
+    config = uvicorn.Config(
+        http_app(transport, host),
+        host=host,
+        port=port,
+        log_level=mcp.settings.log_level.lower(),
+        timeout_graceful_shutdown=int(get_settings().http_shutdown_timeout),
+    )
+    await uvicorn.Server(config).serve()
+
+
+def _http_url(transport: str, host: str, port: int) -> str:
+    path = mcp.settings.streamable_http_path
+    if transport == "sse":
+        path = mcp.settings.sse_path
+    return f"http://{host}:{port}{path}"
+
+
+def _mcp_json_snippet(url: str | None = None) -> str:
+    """Generate the mcpServers entry: the URL over HTTP, else a uv command."""
+    if url is not None:
+        return json.dumps({"supabase-schema-mcp": {"url": url}}, indent=2)
     project_dir = Path.cwd().resolve()
     entry = {
         "supabase-schema-mcp": {
@@ -136,14 +654,44 @@ def _mcp_json_snippet() -> str:
     return json.dumps(entry, indent=2)
 
 
-def run() -> None:
-    """Run the MCP server over stdio (for Cursor and other MCP clients)."""
+@targeted
+async def _export_ddl(schema_name: str, output: str, target: str | None = None) -> str:
+    """
+    Write the schema's DDL to `output` ('-' for stdout); a JSON summary, or
+    {"error": ...} for database, connection, configuration and file errors.
+    """
+    import asyncpg
+
+    from supabase_schema_mcp.db import close_pool
+    from supabase_schema_mcp.ddl_export import export_to_file, write_ddl
+    from supabase_schema_mcp.output import dump_json
+
+    try:
+        try:
+            if output == "-":
+                statements = await write_ddl(schema_name, sys.stdout)
+                result = {"schema": schema_name, "statements": statements}
+            else:
+                result = await export_to_file(schema_name, Path(output))
+        finally:
+            await close_pool()
+    except (asyncpg.PostgresError, OSError, RuntimeError, ValueError) as e:
+        return json.dumps({"error": str(e) or type(e).__name__}, indent=2)
+    return dump_json(result)
+
+
+def _print_banner(url: str | None, warnings: list[str]) -> None:
+    """Startup line, the mcp.json snippet and config warnings, as rich panels."""
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.syntax import Syntax
+
     stderr = Console(stderr=True)
     stderr.print(
-        "[dim]supabase-schema-mcp server started (stdio)[/]",
+        f"[dim]supabase-schema-mcp server started ({url or 'stdio'})[/]",
         highlight=False,
     )
-    snippet = _mcp_json_snippet()
+    snippet = _mcp_json_snippet(url)
     stderr.print(
         Panel(
             Syntax(snippet, "json", theme="monokai", line_numbers=False),
@@ -151,7 +699,6 @@ def run() -> None:
             border_style="blue",
         )
     )
-    warnings = get_env_warnings()
     if warnings:
         content = "\n\n".join(warnings)
         stderr.print(
@@ -161,7 +708,65 @@ def run() -> None:
                 border_style="yellow",
             )
         )
-    mcp.run(transport="stdio")
+
+
+def run(argv: list[str] | None = None) -> None:
+    """
+    Run the MCP server over stdio (for Cursor and other MCP clients), or over
+    HTTP with --transport streamable-http so many clients share one server.
+    The banner is only rendered for a terminal unless --banner says otherwise.
+    The export-ddl subcommand writes a schema's CREATE script instead.
+    """
+    # Flags default to None so parsing (and --help) does not load settings;
+    # unset ones are resolved from settings (env, .env) afterwards.
+    parser = argparse.ArgumentParser(prog="supabase-schema-mcp")
+    parser.add_argument(
+        "--transport",
+        choices=("stdio", "streamable-http", "sse"),
+        default=None,
+        help="default: TRANSPORT (stdio)",
+    )
+    parser.add_argument("--host", default=None, help="default: HTTP_HOST")
+    parser.add_argument("--port", type=int, default=None, help="default: HTTP_PORT")
+    parser.add_argument(
+        "--banner",
+        choices=("auto", "always", "never"),
+        default=None,
+        help="print the mcp.json snippet panel (auto: when stderr is a terminal;"
+        " default: STARTUP_BANNER)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    export = commands.add_parser(
+        "export-ddl", help="write a schema's CREATE script in dependency order"
+    )
+    export.add_argument("--schema", default="public", help="schema name, or 'all'")
+    export.add_argument("--output", default="-", help="file to write ('-': stdout)")
+    export.add_argument("--target", default=None, help="database target name")
+    opts = parser.parse_args(argv)
+    if opts.command == "export-ddl":
+        summary = asyncio.run(_export_ddl(opts.schema, opts.output, target=opts.target))
+        print(summary, file=sys.stderr)
+        if "error" in json.loads(summary):
+            raise SystemExit(1)
+        return
+    settings = get_settings()
+    transport = settings.transport if opts.transport is None else opts.transport
+    host = settings.http_host if opts.host is None else opts.host
+    port = settings.http_port if opts.port is None else opts.port
+    banner = settings.startup_banner if opts.banner is None else opts.banner
+    url = None
+    if transport != "stdio":
+        url = _http_url(transport, host, port)
+    warnings = get_env_warnings()
+    if banner == "always" or (banner == "auto" and sys.stderr.isatty()):
+        _print_banner(url, warnings)
+    else:
+        for warning in warnings:
+            print(f"supabase-schema-mcp config warning: {warning}", file=sys.stderr)
+    if transport == "stdio":
+        mcp.run(transport="stdio")
+    else:
+        asyncio.run(_serve_http(transport, host, port))
 
 
 if __name__ == "__main__":
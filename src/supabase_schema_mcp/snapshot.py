@@ -0,0 +1,435 @@
+"""In-process schema snapshot cache, revalidated against a catalog fingerprint."""
+
+import asyncio
+import sqlite3
+import sys
+import time
+import zlib
+from collections.abc import Awaitable
+from pathlib import Path
+from typing import Any
+
+import asyncpg
+
+from supabase_schema_mcp import ddl_notify
+from supabase_schema_mcp.catalog import SchemaSnapshot, load_snapshots
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.db import fetch_one, listen, uses_transaction_pooler
+from supabase_schema_mcp.snapshot_store import SnapshotStore, default_store_path
+from supabase_schema_mcp.targets import Target, TargetLRU
+
+# Row count plus highest xmin per catalog: any CREATE/ALTER writes a new tuple
+# version (raising max xmin) and any DROP lowers the count.
+_FINGERPRINT_CATALOGS = (
+    "pg_namespace",
+    "pg_class",
+    "pg_attribute",
+    "pg_attrdef",
+    "pg_constraint",
+    "pg_index",
+    "pg_proc",
+    "pg_policy",
+    "pg_trigger",
+    "pg_type",
+    "pg_enum",
+    "pg_rewrite",
+)
+
+_FINGERPRINT_QUERY = "SELECT concat_ws(':', {parts}) AS fingerprint".format(
+    parts=", ".join(
+        f"(SELECT count(*) || '/' || coalesce(max(xmin::text::bigint), 0)"
+        f" FROM pg_catalog.{name})"
+        for name in _FINGERPRINT_CATALOGS
+    )
+)
+
+# After a failed LISTEN connection, keep polling at least this long before retrying.
+_LISTEN_RETRY_SECONDS = 30.0
+
+
+class SnapshotCache:
+    """
+    Per-schema snapshots built by the bulk catalog loader. Snapshots are loaded
+    on first use and dropped when the catalog fingerprint changes; the
+    fingerprint itself is re-checked at most every `revalidate_seconds`.
+    With a `store`, loaded snapshots are also written to disk and restored on
+    the next start, where they are served while the fingerprint is confirmed
+    in the background.
+    With `notify`, the cache listens for the DDL event trigger's notifications
+    (see ddl_notify) and drops only the schemas a DDL statement touched; the
+    fingerprint is then re-read after a notification and, in case one was
+    missed, every `notify_poll_seconds`. Without the trigger, behind a
+    transaction-mode pooler (which does not deliver notifications), or while
+    the listener connection is down, it falls back to polling.
+    """
+
+    def __init__(
+        self,
+        revalidate_seconds: float,
+        store: SnapshotStore | None = None,
+        notify: bool = False,
+        install_trigger: bool = False,
+        notify_poll_seconds: float = 300.0,
+    ) -> None:
+        self.revalidate_seconds = revalidate_seconds
+        self.notify_poll_seconds = notify_poll_seconds
+        self.store = store
+        self.notify = notify
+        self.install_trigger = install_trigger
+        self._snapshots: dict[str, SchemaSnapshot] = {}
+        self._all: SchemaSnapshot | None = None
+        # _complete: every schema has been loaded; _stale: schemas dropped by a
+        # notification since then, reloaded on the next 'all' request.
+        self._complete = False
+        self._stale: set[str] = set()
+        self._loading: dict[str, asyncio.Task[dict[str, SchemaSnapshot]]] = {}
+        self._fingerprint: str | None = None
+        self._checked_at: float | None = None
+        self._fingerprint_dirty = False
+        self._listening = False
+        self._listen_retry_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._save_lock = asyncio.Lock()
+        self._background: set[asyncio.Task[None]] = set()
+        self._revalidation: asyncio.Task[None] | None = None
+
+    def restore(self) -> bool:
+        """Load snapshots persisted by a previous process. Returns True if any."""
+        if self.store is None:
+            return False
+        try:
+            stored = self.store.load()
+        except (sqlite3.Error, zlib.error, ValueError, TypeError) as e:
+            print(f"supabase-schema-mcp: ignoring snapshot file: {e}", file=sys.stderr)
+            return False
+        if stored is None:
+            return False
+        fingerprint, snapshots, complete = stored
+        self._fingerprint = fingerprint
+        self._snapshots = snapshots
+        self._complete = complete
+        if complete:
+            self._all = SchemaSnapshot.merge("all", list(snapshots.values()))
+        return True
+
+    def _spawn(self, coro: Awaitable[None]) -> asyncio.Task[None]:
+        """Run `coro` in the background, keeping a reference until it is done."""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+        return task
+
+    def _background_done(self, task: asyncio.Task[None]) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(
+                f"supabase-schema-mcp: background cache task failed: "
+                f"{task.exception()}",
+                file=sys.stderr,
+            )
+
+    def _persist(self, snapshots: dict[str, SchemaSnapshot]) -> None:
+        """Save `snapshots` to the store in the background."""
+        if self.store is None or self._fingerprint is None:
+            return
+        self._spawn(
+            self._save(
+                self.store,
+                self._fingerprint,
+                snapshots,
+                self._complete and not self._stale,
+            )
+        )
+
+    async def _save(
+        self,
+        store: SnapshotStore,
+        fingerprint: str,
+        snapshots: dict[str, SchemaSnapshot],
+        complete: bool,
+    ) -> None:
+        # One save at a time, in order, so an older fingerprint never lands last.
+        async with self._save_lock:
+            await asyncio.to_thread(store.save, fingerprint, snapshots, complete)
+
+    def _is_known_empty(self, schema_name: str) -> bool:
+        """True if every schema is loaded and `schema_name` has no objects."""
+        return (
+            self._complete
+            and schema_name not in self._stale
+            and schema_name not in self._snapshots
+        )
+
+    def _is_cached(self, schema_name: str) -> bool:
+        if schema_name == "all":
+            return self._all is not None
+        return schema_name in self._snapshots or self._is_known_empty(schema_name)
+
+    def _is_fresh(self) -> bool:
+        if self._checked_at is None or self._fingerprint_dirty:
+            return False
+        interval = (
+            self.notify_poll_seconds if self._listening else self.revalidate_seconds
+        )
+        return time.monotonic() - self._checked_at < interval
+
+    async def revalidate(self) -> None:
+        """
+        Compare the catalog fingerprint and drop all snapshots if it changed.
+        While listening, a change that notifications already accounted for
+        only updates the stored fingerprint.
+        """
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if self._is_fresh():
+                return
+            was_listening = self._listening
+            if (
+                self.notify
+                and not self._listening
+                and time.monotonic() >= self._listen_retry_at
+            ):
+                await self._start_listening()
+            row = await fetch_one(_FINGERPRINT_QUERY)
+            fingerprint = row["fingerprint"] if row else None
+            if fingerprint != self._fingerprint:
+                if was_listening and self._listening and self._fingerprint_dirty:
+                    self._fingerprint = fingerprint
+                    self._persist(dict(self._snapshots))
+                else:
+                    self.clear()
+                    self._fingerprint = fingerprint
+            self._fingerprint_dirty = False
+            self._checked_at = time.monotonic()
+
+    async def _start_listening(self) -> None:
+        """Open the LISTEN connection; on failure, keep polling."""
+        try:
+            await listen(
+                ddl_notify.CHANNEL,
+                self._on_notify,
+                self._on_listener_lost,
+                setup=self._ensure_event_trigger,
+            )
+        except Exception as e:
+            self._listen_retry_at = time.monotonic() + _LISTEN_RETRY_SECONDS
+            print(
+                f"supabase-schema-mcp: DDL notifications unavailable, "
+                f"polling the catalog instead: {e}",
+                file=sys.stderr,
+            )
+            return
+        self._listening = True
+
+    async def _ensure_event_trigger(self, conn: asyncpg.Connection) -> None:
+        """Check for (or install) the event trigger; give up on listening if absent."""
+        if await ddl_notify.event_trigger_installed(conn):
+            return
+        if not self.install_trigger:
+            self.notify = False
+            raise RuntimeError(
+                "event trigger not installed "
+                "(set SCHEMA_CACHE_NOTIFY_INSTALL=true to install it)"
+            )
+        try:
+            await ddl_notify.install_event_trigger(conn)
+        except asyncpg.PostgresError:
+            self.notify = False
+            raise
+
+    def _on_notify(self, payload: str) -> None:
+        self.invalidate(ddl_notify.parse_payload(payload))
+
+    def _on_listener_lost(self) -> None:
+        # Notifications may have been missed: compare the fingerprint next time.
+        self._listening = False
+        self._fingerprint_dirty = True
+
+    def invalidate(self, schemas: list[str] | None) -> None:
+        """Drop the snapshots of `schemas` (None for all) after a DDL notification."""
+        if schemas is None:
+            self.clear()
+        else:
+            for schema in schemas:
+                self._snapshots.pop(schema, None)
+            if self._complete:
+                self._stale.update(schemas)
+            self._all = None
+            self._loading.clear()
+            self._generation += 1
+        self._fingerprint_dirty = True
+
+    def clear(self) -> None:
+        """Drop every cached snapshot."""
+        self._snapshots.clear()
+        self._all = None
+        self._complete = False
+        self._stale.clear()
+        self._loading.clear()
+        self._generation += 1
+
+    async def _load(self, schema_name: str) -> dict[str, SchemaSnapshot]:
+        """Run (or join) the bulk load for `schema_name` and store its snapshots."""
+        task = self._loading.get(schema_name)
+        if task is None:
+            task = asyncio.ensure_future(load_snapshots(schema_name))
+            self._loading[schema_name] = task
+        generation = self._generation
+        try:
+            loaded = await task
+        finally:
+            if self._loading.get(schema_name) is task:
+                del self._loading[schema_name]
+        # Only store if the catalog was not invalidated while we were loading.
+        if generation == self._generation:
+            if schema_name == "all":
+                self._snapshots = dict(loaded)
+                self._complete = True
+                self._stale.clear()
+            else:
+                self._snapshots.update(loaded)
+                self._stale.discard(schema_name)
+            self._persist(loaded)
+        return loaded
+
+    async def _load_all(self) -> SchemaSnapshot:
+        """Merge every schema, reloading only the stale ones if all were loaded."""
+        generation = self._generation
+        if self._complete:
+            snapshots = dict(self._snapshots)
+            for loaded in await asyncio.gather(
+                *(self._load(schema) for schema in sorted(self._stale))
+            ):
+                snapshots.update(loaded)
+        else:
+            snapshots = await self._load("all")
+        merged = SchemaSnapshot.merge("all", [snapshots[k] for k in sorted(snapshots)])
+        if generation == self._generation:
+            self._all = merged
+        return merged
+
+    async def get_snapshot(self, schema_name: str) -> SchemaSnapshot:
+        """Return the snapshot for one schema, or all user schemas for 'all'."""
+        if self._checked_at is None and self._is_cached(schema_name):
+            # Restored from disk and not yet confirmed: answer now, check later.
+            if self._revalidation is None or self._revalidation.done():
+                self._revalidation = self._spawn(self.revalidate())
+        else:
+            await self.revalidate()
+        if schema_name == "all":
+            return self._all if self._all is not None else await self._load_all()
+        snapshot = self._snapshots.get(schema_name)
+        if snapshot is not None:
+            return snapshot
+        if self._is_known_empty(schema_name):
+            return SchemaSnapshot(schema_name)
+        loaded = await self._load(schema_name)
+        return loaded.get(schema_name) or SchemaSnapshot(schema_name)
+
+    async def get_schema_snapshots(self, schema_name: str) -> dict[str, SchemaSnapshot]:
+        """
+        The per-schema snapshots behind get_snapshot(schema_name), in schema
+        order. Each object is reused until its schema is invalidated.
+        """
+        if schema_name != "all":
+            return {schema_name: await self.get_snapshot(schema_name)}
+        await self.get_snapshot("all")
+        return {key: self._snapshots[key] for key in sorted(self._snapshots)}
+
+    @property
+    def generation(self) -> int:
+        """Incremented whenever cached snapshots are dropped for a catalog change."""
+        return self._generation
+
+    def stats(self) -> dict[str, Any]:
+        """What is cached and how it is kept fresh, for server_stats."""
+        checked = self._checked_at
+        return {
+            "schemas": len(self._snapshots),
+            "complete": self._complete,
+            "stale": sorted(self._stale),
+            "loading": sorted(self._loading),
+            "invalidation": "notify" if self._listening else "polling",
+            "seconds_since_check": (
+                None if checked is None else round(time.monotonic() - checked, 1)
+            ),
+        }
+
+
+_caches: TargetLRU[SnapshotCache] | None = None
+
+
+def _new_cache(target: Target) -> SnapshotCache:
+    settings = get_settings()
+    store = None
+    if settings.schema_cache_persist:
+        path = Path(settings.schema_cache_file or default_store_path())
+        store = SnapshotStore(path, target.address)
+    cache = SnapshotCache(
+        settings.schema_cache_revalidate_seconds,
+        store,
+        notify=(
+            settings.schema_cache_notify
+            and not uses_transaction_pooler(target.host, target.port)
+        ),
+        install_trigger=settings.schema_cache_notify_install,
+        notify_poll_seconds=settings.schema_cache_notify_poll_seconds,
+    )
+    cache.restore()
+    return cache
+
+
+def get_cache() -> SnapshotCache:
+    """
+    Return the current target's snapshot cache, creating it on first use.
+    Caches of the least recently used targets beyond schema_cache_max_targets
+    are dropped (their snapshots stay on disk when persisted).
+    """
+    global _caches
+    if _caches is None:
+        _caches = TargetLRU(get_settings().schema_cache_max_targets)
+    return _caches.get(_new_cache)
+
+
+async def get_snapshot(schema_name: str) -> SchemaSnapshot:
+    """
+    Return the schema model for `schema_name` ('all' for every user schema),
+    served from the snapshot cache when enabled.
+    """
+    if not get_settings().schema_cache_enabled:
+        loaded = await load_snapshots(schema_name)
+        if schema_name == "all":
+            return SchemaSnapshot.merge("all", list(loaded.values()))
+        return loaded.get(schema_name) or SchemaSnapshot(schema_name)
+    return await get_cache().get_snapshot(schema_name)
+
+
+async def get_schema_snapshots(schema_name: str) -> dict[str, SchemaSnapshot]:
+    """Per-schema snapshots for `schema_name` ('all' for every user schema)."""
+    if not get_settings().schema_cache_enabled:
+        loaded = await load_snapshots(schema_name)
+        if schema_name == "all":
+            return loaded
+        return {schema_name: loaded.get(schema_name) or SchemaSnapshot(schema_name)}
+    return await get_cache().get_schema_snapshots(schema_name)
+
+
+async def catalog_version() -> int | None:
+    """
+    A number that changes after DDL on the current target (once the snapshot
+    cache notices it), or None when the cache is disabled.
+    """
+    if not get_settings().schema_cache_enabled:
+        return None
+    cache = get_cache()
+    await cache.revalidate()
+    return cache.generation
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """Snapshot cache stats of each target whose cache is in memory."""
+    if _caches is None:
+        return {}
+    return {name: cache.stats() for name, cache in _caches.items()}
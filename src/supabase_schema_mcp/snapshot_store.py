@@ -0,0 +1,128 @@
+"""On-disk SQLite store for schema snapshots, for instant warm restarts."""
+
+import json
+import os
+import sqlite3
+import time
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+
+from supabase_schema_mcp.catalog import SchemaSnapshot
+
+# Stored in PRAGMA user_version; bump whenever SchemaSnapshot's sections
+# change, so files written by another version are dropped instead of loading
+# snapshots with a section missing.
+_FORMAT_VERSION = 1
+
+_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS catalog (
+        target TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        complete INTEGER NOT NULL,
+        saved_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS snapshot (
+        target TEXT NOT NULL,
+        schema TEXT NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (target, schema)
+    );
+"""
+
+
+def default_store_path() -> Path:
+    """Snapshot file under the user cache directory ($XDG_CACHE_HOME or ~/.cache)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "supabase-schema-mcp" / "snapshots.sqlite3"
+
+
+class SnapshotStore:
+    """
+    Persists the snapshots of one database (`target`, e.g. host:port/db) with
+    the catalog fingerprint they were loaded under. Each schema is one
+    zlib-compressed JSON blob, so saving a schema never rewrites the others.
+    Methods are blocking; call them via asyncio.to_thread from async code.
+    """
+
+    def __init__(self, path: Path, target: str) -> None:
+        self.path = path
+        self.target = target
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """One transaction on a short-lived connection (committed on success)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            (version,) = conn.execute("PRAGMA user_version").fetchone()
+            if version != _FORMAT_VERSION:
+                conn.executescript(
+                    "DROP TABLE IF EXISTS snapshot; DROP TABLE IF EXISTS catalog;"
+                    f" PRAGMA user_version = {_FORMAT_VERSION};"
+                )
+            with conn:
+                conn.executescript(_SCHEMA_SQL)
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self) -> tuple[str, dict[str, SchemaSnapshot], bool] | None:
+        """
+        Return (fingerprint, snapshots by schema, complete) for this target, or
+        None if nothing is stored. `complete` means every schema was saved.
+        """
+        if not self.path.exists():
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fingerprint, complete FROM catalog WHERE target = ?",
+                (self.target,),
+            ).fetchone()
+            if row is None:
+                return None
+            blobs = conn.execute(
+                "SELECT schema, data FROM snapshot WHERE target = ? ORDER BY schema",
+                (self.target,),
+            ).fetchall()
+        snapshots = {
+            schema: SchemaSnapshot(**json.loads(zlib.decompress(data)))
+            for schema, data in blobs
+        }
+        return row[0], snapshots, bool(row[1])
+
+    def save(
+        self,
+        fingerprint: str,
+        snapshots: dict[str, SchemaSnapshot],
+        complete: bool = False,
+    ) -> None:
+        """Store snapshots under `fingerprint`, dropping any saved under another."""
+        blobs = [
+            (self.target, schema, zlib.compress(json.dumps(asdict(s)).encode()))
+            for schema, s in snapshots.items()
+        ]
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fingerprint, complete FROM catalog WHERE target = ?",
+                (self.target,),
+            ).fetchone()
+            if row is not None and row[0] != fingerprint:
+                conn.execute("DELETE FROM snapshot WHERE target = ?", (self.target,))
+                row = None
+            complete = complete or bool(row and row[1])
+            conn.execute(
+                "INSERT OR REPLACE INTO catalog VALUES (?, ?, ?, ?)",
+                (self.target, fingerprint, int(complete), time.time()),
+            )
+            conn.executemany("INSERT OR REPLACE INTO snapshot VALUES (?, ?, ?)", blobs)
+
+    def discard(self) -> None:
+        """Forget everything stored for this target."""
+        if not self.path.exists():
+            return
+        with self._connect() as conn:
+            conn.execute("DELETE FROM snapshot WHERE target = ?", (self.target,))
+            conn.execute("DELETE FROM catalog WHERE target = ?", (self.target,))
@@ -0,0 +1,182 @@
+"""Registry of database targets (projects, branches) one server can introspect."""
+
+import functools
+import json
+import os
+import re
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Generic, ParamSpec, TypeVar
+
+from supabase_schema_mcp.config import Settings, get_settings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Name of the target built from the unprefixed SUPABASE_* settings.
+DEFAULT_TARGET = "default"
+
+# Environment suffixes read for each name in TARGETS, e.g. PROD_SUPABASE_DB_HOST.
+_ENV_FIELDS = {
+    "host": "SUPABASE_DB_HOST",
+    "port": "SUPABASE_DB_PORT",
+    "database": "SUPABASE_DB_NAME",
+    "user": "SUPABASE_DB_USER",
+    "password": "SUPABASE_DB_PASSWORD",
+    "project_ref": "SUPABASE_PROJECT_REF",
+    "service_role_key": "SUPABASE_SERVICE_ROLE_KEY",
+}
+
+
+@dataclass(frozen=True)
+class Target:
+    """Connection details of one database, plus its Management API credentials."""
+
+    name: str
+    host: str = ""
+    port: int = 5432
+    database: str = "postgres"
+    user: str = ""
+    password: str = ""
+    project_ref: str = ""
+    service_role_key: str = ""
+
+    @property
+    def connection_configured(self) -> bool:
+        """True if enough is set to connect."""
+        return bool(self.host and self.database and self.user and self.password)
+
+    @property
+    def address(self) -> str:
+        """host:port/database, which identifies the target's persisted snapshots."""
+        return f"{self.host}:{self.port}/{self.database}"
+
+
+def env_prefix(name: str) -> str:
+    """Environment variable prefix of a target name: 'prod-eu' -> 'PROD_EU_'."""
+    return re.sub(r"[^A-Z0-9]+", "_", name.upper()).strip("_") + "_"
+
+
+def _from_env(name: str) -> Target:
+    prefix = env_prefix(name)
+    values: dict[str, Any] = {}
+    for field, suffix in _ENV_FIELDS.items():
+        value = os.environ.get(prefix + suffix)
+        if value is not None:
+            values[field] = int(value) if field == "port" else value
+    return Target(name, **values)
+
+
+def _from_file(path: Path) -> list[Target]:
+    """Targets from a JSON object of {name: {host, port, database, user, ...}}."""
+    data = json.loads(path.read_text())
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected an object of targets by name")
+    targets = []
+    for name, fields in data.items():
+        unknown = set(fields) - set(_ENV_FIELDS)
+        if unknown:
+            raise ValueError(
+                f"{path}: target {name!r} has unknown keys {', '.join(sorted(unknown))}"
+            )
+        targets.append(Target(name, **fields))
+    return targets
+
+
+def load_targets(settings: Settings) -> dict[str, Target]:
+    """
+    The 'default' target from SUPABASE_DB_*, then those in TARGETS_FILE, then
+    one per name in TARGETS read from <NAME>_SUPABASE_DB_* variables. A later
+    definition of the same name replaces an earlier one.
+    """
+    targets = {
+        DEFAULT_TARGET: Target(
+            DEFAULT_TARGET,
+            host=settings.supabase_db_host,
+            port=settings.supabase_db_port,
+            database=settings.supabase_db_name,
+            user=settings.supabase_db_user,
+            password=settings.supabase_db_password,
+            project_ref=settings.supabase_project_ref,
+            service_role_key=settings.supabase_service_role_key,
+        )
+    }
+    if settings.targets_file:
+        for target in _from_file(Path(settings.targets_file)):
+            targets[target.name] = target
+    for name in filter(None, (n.strip() for n in settings.targets.split(","))):
+        targets[name] = _from_env(name)
+    return targets
+
+
+@functools.lru_cache
+def get_targets() -> dict[str, Target]:
+    """Cached target registry (read once, like the settings)."""
+    return load_targets(get_settings())
+
+
+_current: ContextVar[str | None] = ContextVar(
+    "supabase_schema_mcp_target", default=None
+)
+
+
+def get_target(name: str | None = None) -> Target:
+    """
+    Target `name`, else the one selected for the running tool call, else
+    DEFAULT_TARGET (setting). Raises ValueError for an unknown name.
+    """
+    name = name or _current.get() or get_settings().default_target
+    targets = get_targets()
+    target = targets.get(name)
+    if target is None:
+        raise ValueError(
+            f"Unknown target {name!r}; configured targets: {', '.join(targets)}"
+        )
+    return target
+
+
+def targeted(fn: Callable[P, Awaitable[str]]) -> Callable[P, Awaitable[str]]:
+    """Run a tool against the database named by its `target` argument."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> str:
+        try:
+            target = get_target(kwargs.get("target"))
+        except ValueError as e:
+            return json.dumps({"error": str(e)}, indent=2)
+        token = _current.set(target.name)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper
+
+
+class TargetLRU(Generic[T]):
+    """
+    One object per target, created on first use and kept for the `size` most
+    recently used targets; older ones are dropped.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = max(1, size)
+        self._items: OrderedDict[str, T] = OrderedDict()
+
+    def get(self, factory: Callable[[Target], T]) -> T:
+        """The current target's object, created with `factory` if missing."""
+        target = get_target()
+        item = self._items.get(target.name)
+        if item is not None:
+            self._items.move_to_end(target.name)
+            return item
+        item = self._items[target.name] = factory(target)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+        return item
+
+    def items(self) -> list[tuple[str, T]]:
+        return list(self._items.items())
@@ -0,0 +1,166 @@
+"""
+Migration-safe mode: short lock and per-tool statement timeouts on pooled
+connections, and the last good result of a tool call served (marked stale)
+when a timeout fires instead of waiting behind a migration's locks.
+"""
+
+import functools
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from typing import Any, ParamSpec
+
+from supabase_schema_mcp.coalesce import CallKey, call_key
+from supabase_schema_mcp.config import get_settings
+
+P = ParamSpec("P")
+
+# SQLSTATEs of lock_timeout (lock_not_available) and statement_timeout
+# (query_canceled); checked by code so asyncpg is not imported at startup.
+_TIMEOUT_SQLSTATES = frozenset({"55P03", "57014"})
+
+# Last successful results kept for stale answers, least recently used first,
+# bounded by count and by total size (a DDL export chunk can be megabytes).
+_MAX_RESULTS = 256
+_MAX_RESULTS_CHARS = 16_000_000
+
+_tool: ContextVar[str | None] = ContextVar("supabase_schema_mcp_tool", default=None)
+
+_results: OrderedDict[CallKey, tuple[str, float]] = OrderedDict()
+_results_chars = 0
+_timeouts = 0
+_served_stale = 0
+
+
+def _ms(seconds: float) -> str:
+    return f"{max(0, round(seconds * 1000))}ms"
+
+
+def lock_timeout() -> str | None:
+    """lock_timeout for pooled connections, or None outside migration-safe mode."""
+    settings = get_settings()
+    return _ms(settings.db_lock_timeout) if settings.db_migration_safe else None
+
+
+def default_statement_timeout() -> str | None:
+    """DB_STATEMENT_TIMEOUT, or None outside migration-safe mode."""
+    settings = get_settings()
+    return _ms(settings.db_statement_timeout) if settings.db_migration_safe else None
+
+
+def statement_timeout() -> str | None:
+    """
+    statement_timeout for the running tool (its DB_STATEMENT_TIMEOUTS entry,
+    else DB_STATEMENT_TIMEOUT), or None outside migration-safe mode.
+    """
+    settings = get_settings()
+    if not settings.db_migration_safe:
+        return None
+    tool = _tool.get()
+    seconds = settings.db_statement_timeouts.get(tool or "")
+    return _ms(settings.db_statement_timeout if seconds is None else seconds)
+
+
+def is_timeout(error: BaseException) -> bool:
+    """True for lock and statement timeouts and the client-side command_timeout."""
+    if isinstance(error, TimeoutError):
+        return True
+    return getattr(error, "sqlstate", None) in _TIMEOUT_SQLSTATES
+
+
+def _stale(result: str, stored_at: float, error: BaseException) -> str:
+    """`result` wrapped with its age and the timeout that fired."""
+    reason = str(error) or type(error).__name__
+    header = json.dumps(
+        {
+            "stale": True,
+            "stale_seconds": round(time.monotonic() - stored_at, 1),
+            "reason": reason,
+        }
+    )
+    try:
+        json.loads(result)
+    except ValueError:
+        # Plain text results (a function definition) become a JSON string.
+        result = json.dumps(result)
+    return f'{header[:-1]}, "result": {result}}}'
+
+
+def _is_error(result: str) -> bool:
+    """True for the `{"error": ...}` answers tools return instead of data."""
+    if not result.startswith(('{\n  "error": ', '{"error": ')):
+        return False
+    try:
+        return "error" in json.loads(result)
+    except ValueError:
+        return False
+
+
+def _keep(key: CallKey, result: str) -> None:
+    """Keep `result` as the last one of `key`, evicting the oldest over budget."""
+    global _results_chars
+    old = _results.pop(key, None)
+    if old is not None:
+        _results_chars -= len(old[0])
+    if len(result) > _MAX_RESULTS_CHARS:
+        return
+    _results[key] = (result, time.monotonic())
+    _results_chars += len(result)
+    while len(_results) > _MAX_RESULTS or _results_chars > _MAX_RESULTS_CHARS:
+        _, (evicted, _) = _results.popitem(last=False)
+        _results_chars -= len(evicted)
+
+
+def stale_on_timeout(fn: Callable[P, Awaitable[str]]) -> Callable[P, Awaitable[str]]:
+    """
+    In migration-safe mode, run the tool with its statement timeout and keep
+    its result unless it is an error; if a lock or statement timeout fires,
+    answer with the last result of the same call (tool, arguments, target)
+    marked stale, or an error if there is none. Apply inside @targeted.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> str:
+        global _timeouts, _served_stale
+        if not get_settings().db_migration_safe:
+            return await fn(*args, **kwargs)
+        key = call_key(fn.__name__, args, kwargs)
+        token = _tool.set(fn.__name__)
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            if not is_timeout(e):
+                raise
+            _timeouts += 1
+            cached = _results.get(key)
+            if cached is None:
+                reason = str(e) or type(e).__name__
+                return json.dumps(
+                    {
+                        "error": f"Database timed out ({reason}) and no earlier "
+                        "result is cached; a migration may be holding locks"
+                    },
+                    indent=2,
+                )
+            _served_stale += 1
+            return _stale(cached[0], cached[1], e)
+        finally:
+            _tool.reset(token)
+        if not _is_error(result):
+            _keep(key, result)
+        return result
+
+    return wrapper
+
+
+def stale_stats() -> dict[str, Any]:
+    """Whether migration-safe mode is on, kept results, timeouts and stale answers."""
+    return {
+        "enabled": get_settings().db_migration_safe,
+        "results": len(_results),
+        "results_chars": _results_chars,
+        "timeouts": _timeouts,
+        "served_stale": _served_stale,
+    }
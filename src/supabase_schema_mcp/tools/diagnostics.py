@@ -0,0 +1,68 @@
+"""Server self-diagnostics: tool latency, database and cache metrics."""
+
+from typing import Any
+
+from supabase_schema_mcp.coalesce import coalesce_stats
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.db import pool_stats
+from supabase_schema_mcp.explain import explain_cache_stats
+from supabase_schema_mcp.function_index import function_index_stats
+from supabase_schema_mcp.limits import client_stats
+from supabase_schema_mcp.management_api import client_stats as management_api_stats
+from supabase_schema_mcp.metrics import get_metrics
+from supabase_schema_mcp.output import render
+from supabase_schema_mcp.snapshot import cache_stats
+from supabase_schema_mcp.targets import get_targets
+from supabase_schema_mcp.timeouts import stale_stats
+from supabase_schema_mcp.usage_stats import usage_cache_stats
+
+
+def collect_stats() -> dict[str, Any]:
+    """Clients, pools and snapshot caches (by target) and per-tool metrics."""
+    return {
+        "clients": client_stats(),
+        "coalescing": coalesce_stats(),
+        "pools": pool_stats(),
+        "snapshot_caches": cache_stats(),
+        "function_indexes": function_index_stats(),
+        "usage_stats": usage_cache_stats(),
+        "explain_caches": explain_cache_stats(),
+        "management_api": management_api_stats(),
+        "migration_safe": stale_stats(),
+        **get_metrics().summary(),
+    }
+
+
+async def server_stats(fmt: str | None = None) -> str:
+    """
+    Report per-tool call counts and rolling latency, pool wait, query time,
+    rows, serialization time and response size histograms (count and mean
+    since start; p50/p95/p99/max over the recent window), plus pool and
+    snapshot cache state.
+    """
+    return render(collect_stats(), fmt)
+
+
+async def list_targets(fmt: str | None = None) -> str:
+    """
+    List the configured database targets (without credentials): which one is
+    the default, and whether it has an open pool and cached snapshots.
+    """
+    pools = pool_stats()
+    caches = cache_stats()
+    default = get_settings().default_target
+    rows = [
+        {
+            "target": name,
+            "host": t.host,
+            "port": t.port,
+            "database": t.database,
+            "user": t.user,
+            "configured": t.connection_configured,
+            "default": name == default,
+            "pool_open": name in pools,
+            "cached_schemas": caches[name]["schemas"] if name in caches else 0,
+        }
+        for name, t in get_targets().items()
+    ]
+    return render(rows, fmt)
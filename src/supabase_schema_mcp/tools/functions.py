@@ -2,111 +2,131 @@
 
 import json
 
-from supabase_schema_mcp.db import fetch_all, fetch_one
+from supabase_schema_mcp.catalog import SECTION_KEYS
+from supabase_schema_mcp.function_index import get_function_index
+from supabase_schema_mcp.output import render, render_rows
+from supabase_schema_mcp.snapshot import get_snapshot
 
 
-async def list_functions(schema_name: str = "public") -> str:
+async def list_functions(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
     """
     List functions and procedures: schema, name, argument types, return type,
     and whether they are callable (security definer, etc.).
     Includes functions that can be exposed as Supabase RPCs.
     """
-    if schema_name == "all":
-        schema_filter = "AND n.nspname NOT IN ('pg_catalog', 'information_schema')"
-        args: tuple = ()
-    else:
-        schema_filter = "AND n.nspname = $1"
-        args = (schema_name,)
-    query = f"""
-        SELECT n.nspname AS schema_name, p.proname AS function_name,
-               pg_get_function_arguments(p.oid) AS arguments,
-               pg_get_function_result(p.oid) AS return_type,
-               p.prosecdef AS security_definer,
-               p.provolatile AS volatility
-        FROM pg_proc p
-        JOIN pg_namespace n ON n.oid = p.pronamespace
-        WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
-        {schema_filter}
-        ORDER BY n.nspname, p.proname
-    """
-    rows = await fetch_all(query, *args)
-    result = [
-        {
-            "schema": r["schema_name"],
-            "function": r["function_name"],
-            "arguments": r["arguments"],
-            "return_type": r["return_type"],
-            "security_definer": r["security_definer"],
-            "volatility": _volatility_str(r["volatility"]),
-        }
-        for r in rows
-    ]
-    return json.dumps(result, indent=2)
+    snapshot = await get_snapshot(schema_name)
+    return render_rows("functions", snapshot.functions, limit, cursor, fmt)
 
 
-async def get_function_definition(schema_name: str, function_name: str) -> str:
+async def get_function_definition(
+    schema_name: str,
+    function_name: str,
+    fmt: str | None = None,
+) -> str:
     """
     Return the full definition (source code) of a function/RPC by schema and name.
     If the function is overloaded (same name, different arguments), returns all definitions.
     """
-    query = """
-        SELECT pg_get_functiondef(p.oid) AS definition,
-               pg_get_function_arguments(p.oid) AS arguments
-        FROM pg_proc p
-        JOIN pg_namespace n ON n.oid = p.pronamespace
-        WHERE n.nspname = $1 AND p.proname = $2
-        ORDER BY pg_get_function_arguments(p.oid)
-    """
-    rows = await fetch_all(query, schema_name, function_name)
-    if not rows:
+    index = get_function_index()
+    refs = [r for r in await index.functions(schema_name) if r.name == function_name]
+    if not refs:
         return json.dumps(
             {"error": f"No function named {function_name!r} in schema {schema_name!r}"},
             indent=2,
         )
-    if len(rows) == 1:
-        return rows[0]["definition"] or ""
+    definitions = await index.definitions(refs)
+    if len(refs) == 1:
+        return definitions.get(refs[0].oid) or ""
     result = [
-        {"arguments": r["arguments"], "definition": r["definition"]}
-        for r in rows
+        {"arguments": r.arguments, "definition": definitions.get(r.oid)}
+        for r in sorted(refs, key=lambda r: r.arguments)
     ]
-    return json.dumps(result, indent=2)
+    return render(result, fmt)
 
 
-def _volatility_str(v: str | None) -> str:
-    """Map pg_proc.provolatile to string."""
-    mapping = {"i": "IMMUTABLE", "s": "STABLE", "v": "VOLATILE"}
-    return mapping.get(v or "", v or "unknown")
+async def get_function_dependencies(
+    schema_name: str,
+    function_name: str,
+    fmt: str | None = None,
+) -> str:
+    """
+    Tables and views a function reads and writes and the functions it calls,
+    per overload. dynamic_sql marks bodies using EXECUTE, whose statements
+    are not seen.
+    """
+    index = await get_function_index().dependencies()
+    result = [
+        deps.as_row()
+        for deps in index.functions
+        if deps.function.schema == schema_name and deps.function.name == function_name
+    ]
+    if not result:
+        return json.dumps(
+            {"error": f"No function named {function_name!r} in schema {schema_name!r}"},
+            indent=2,
+        )
+    return render(result, fmt)
+
+
+async def list_functions_using_table(
+    schema_name: str,
+    table_name: str,
+    access: str = "any",
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
+    """
+    Functions that read or write a table or view ('table' or 'schema.table').
+    access: 'any', 'read' or 'write'.
+    """
+    if access not in ("any", "read", "write"):
+        return json.dumps(
+            {"error": "access must be 'any', 'read' or 'write'"}, indent=2
+        )
+    index = await get_function_index().dependencies()
+    try:
+        relation = index.resolve(table_name, schema_name)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    result = [
+        {
+            "schema": deps.function.schema,
+            "function": deps.function.name,
+            "arguments": deps.function.arguments,
+            "access": how,
+        }
+        for deps, how in index.by_relation.get(relation, [])
+        if access == "any" or access in how
+    ]
+    # by_relation follows the database collation; pages bisect on the key.
+    result.sort(key=SECTION_KEYS["functions"])
+    return render_rows("functions", result, limit, cursor, fmt)
 
 
-async def list_rpc_candidates(schema_name: str = "public") -> str:
+async def list_rpc_candidates(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
     """
     List functions in the given schema that are typical RPC candidates:
     return type suitable for JSON (record, void, scalar), in public or specified schema.
     """
-    if schema_name == "all":
-        schema_filter = "AND n.nspname NOT IN ('pg_catalog', 'information_schema')"
-        args: tuple = ()
-    else:
-        schema_filter = "AND n.nspname = $1"
-        args = (schema_name,)
-    query = f"""
-        SELECT n.nspname AS schema_name, p.proname AS function_name,
-               pg_get_function_arguments(p.oid) AS arguments,
-               pg_get_function_result(p.oid) AS return_type
-        FROM pg_proc p
-        JOIN pg_namespace n ON n.oid = p.pronamespace
-        WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
-        {schema_filter}
-        ORDER BY n.nspname, p.proname
-    """
-    rows = await fetch_all(query, *args)
+    snapshot = await get_snapshot(schema_name)
     result = [
         {
-            "schema": r["schema_name"],
-            "function": r["function_name"],
-            "arguments": r["arguments"],
-            "return_type": r["return_type"],
+            "schema": f["schema"],
+            "function": f["function"],
+            "arguments": f["arguments"],
+            "return_type": f["return_type"],
         }
-        for r in rows
+        for f in snapshot.functions
     ]
-    return json.dumps(result, indent=2)
+    return render_rows("functions", result, limit, cursor, fmt)
@@ -0,0 +1,18 @@
+"""Supabase project metadata from the Management API."""
+
+import json
+
+from supabase_schema_mcp.management_api import ManagementAPIError, fetch_project_info
+from supabase_schema_mcp.output import render
+
+
+async def get_project_info(fmt: str | None = None) -> str:
+    """
+    Return the project's id, name, ref and region. Responses are cached and
+    revalidated with the API's ETag, so repeated calls cost no round trip.
+    """
+    try:
+        info = await fetch_project_info()
+    except ManagementAPIError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    return render(info.model_dump(), fmt)
@@ -0,0 +1,81 @@
+"""Query plan tools."""
+
+import json
+from typing import Any
+
+import asyncpg
+
+from supabase_schema_mcp.db import explain
+from supabase_schema_mcp.explain import (
+    get_explain_cache,
+    is_explain,
+    normalize_sql,
+    scanned_schemas,
+    summarize,
+)
+from supabase_schema_mcp.output import render
+from supabase_schema_mcp.snapshot import catalog_version
+from supabase_schema_mcp.usage_stats import get_usage
+
+
+def _session_settings(
+    role: str | None, claims: dict[str, Any] | None
+) -> dict[str, str]:
+    """GUCs that make auth.uid(), auth.jwt() and RLS see `role` and `claims`."""
+    settings: dict[str, str] = {}
+    if claims is not None:
+        settings["request.jwt.claims"] = json.dumps(claims)
+        # Older auth.uid() definitions read request.jwt.claim.<name>.
+        for name, value in claims.items():
+            if isinstance(value, str | int | float | bool):
+                settings[f"request.jwt.claim.{name}"] = str(value)
+    if role is not None:
+        settings["role"] = role
+    return settings
+
+
+async def explain_query(
+    sql: str,
+    role: str | None = None,
+    claims: dict[str, Any] | None = None,
+    include_plan: bool = False,
+    fmt: str | None = None,
+) -> str:
+    """
+    EXPLAIN one statement (without running it) in a read-only transaction and
+    summarize the plan: estimated cost and rows, the costliest nodes,
+    sequential scans (flagging tables of 10,000+ rows), indexes used and
+    subplans. With `role` (e.g. 'authenticated') and JWT `claims` the plan
+    includes that role's RLS policies; `role` defaults to claims['role'].
+    Statements with $n parameters get their generic plan.
+    """
+    text, parameters = normalize_sql(sql)
+    if not text:
+        return json.dumps({"error": "sql must not be empty"}, indent=2)
+    if is_explain(text):
+        return json.dumps({"error": "Pass the statement without EXPLAIN"}, indent=2)
+    if claims is not None and role is None and isinstance(claims.get("role"), str):
+        role = claims["role"]
+    key = (text, role, None if claims is None else json.dumps(claims, sort_keys=True))
+    cache = get_explain_cache()
+    version = await catalog_version()
+    cached = cache.get(key, version)
+    if cached is not None:
+        plan, summary = cached
+    else:
+        settings = _session_settings(role, claims)
+        try:
+            output = await explain(text, parameters, settings)
+        except asyncpg.PostgresError as e:
+            return json.dumps({"error": f"EXPLAIN failed: {e}"}, indent=2)
+        plan = output[0]["Plan"]
+        table_rows = {}
+        for schema in sorted(scanned_schemas(plan)):
+            for t in (await get_usage(schema)).tables:
+                table_rows[f"{t['schema']}.{t['table']}"] = t["rows_estimate"]
+        summary = summarize(plan, table_rows)
+        cache.put(key, version, plan, summary)
+    out = {"role": role, **summary}
+    if include_plan:
+        out["plan"] = plan
+    return render(out, fmt)
@@ -1,112 +1,136 @@
-"""Foreign key and index introspection tools."""
+"""Foreign key and index introspection tools, and FK graph queries."""
 
 import json
-from typing import Any
 
-from supabase_schema_mcp.db import fetch_all
+from supabase_schema_mcp.fk_graph import FKGraph, get_graph
+from supabase_schema_mcp.index_advisor import advise
+from supabase_schema_mcp.output import render, render_rows
+from supabase_schema_mcp.snapshot import get_snapshot
+from supabase_schema_mcp.usage_stats import get_usage
 
 
-async def list_foreign_keys(schema_name: str = "public") -> str:
+async def list_foreign_keys(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
     """
     List foreign key constraints: from table/columns, to table/columns,
     constraint name, and update/delete rule.
     """
-    if schema_name == "all":
-        schema_filter = (
-            "AND tc.table_schema NOT IN ('pg_catalog', 'information_schema')"
-        )
-        args: tuple = ()
-    else:
-        schema_filter = "AND tc.table_schema = $1"
-        args = (schema_name,)
-    query = f"""
-        SELECT tc.table_schema AS from_schema, tc.table_name AS from_table,
-               kcu.column_name AS from_column,
-               ccu.table_schema AS to_schema, ccu.table_name AS to_table,
-               ccu.column_name AS to_column,
-               tc.constraint_name, rc.update_rule, rc.delete_rule
-        FROM information_schema.table_constraints tc
-        JOIN information_schema.key_column_usage kcu
-             ON tc.constraint_name = kcu.constraint_name
-             AND tc.table_schema = kcu.table_schema
-        JOIN information_schema.constraint_column_usage ccu
-             ON ccu.constraint_name = tc.constraint_name
-             AND ccu.table_schema = tc.table_schema
-        JOIN information_schema.referential_constraints rc
-             ON tc.constraint_name = rc.constraint_name
-             AND tc.table_schema = rc.constraint_schema
-        WHERE tc.constraint_type = 'FOREIGN KEY'
-        {schema_filter}
-        ORDER BY tc.table_schema, tc.table_name, tc.constraint_name
-    """
-    rows = await fetch_all(query, *args)
-    result = [
-        {
-            "from_schema": r["from_schema"],
-            "from_table": r["from_table"],
-            "from_column": r["from_column"],
-            "to_schema": r["to_schema"],
-            "to_table": r["to_table"],
-            "to_column": r["to_column"],
-            "constraint_name": r["constraint_name"],
-            "on_update": r["update_rule"],
-            "on_delete": r["delete_rule"],
-        }
-        for r in rows
-    ]
-    return json.dumps(result, indent=2)
+    snapshot = await get_snapshot(schema_name)
+    return render_rows(
+        "foreign_keys", snapshot.foreign_keys, limit, cursor, fmt
+    )
 
 
 async def list_indexes(
     schema_name: str = "public",
     table_name: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
 ) -> str:
     """
     List indexes: schema, table, index name, columns, uniqueness, definition.
     Optionally filter by table_name.
     """
-    if schema_name == "all":
-        schema_filter = "AND n.nspname NOT IN ('pg_catalog', 'information_schema')"
-        args: tuple = ()
-    else:
-        schema_filter = "AND n.nspname = $1"
-        args = (schema_name,)
+    snapshot = await get_snapshot(schema_name)
+    result = snapshot.indexes
     if table_name:
-        table_filter = "AND c.relname = $" + str(len(args) + 1)
-        args = (*args, table_name)
-    else:
-        table_filter = ""
-    query = f"""
-        SELECT n.nspname AS schema_name, c.relname AS table_name,
-               i.relname AS index_name, a.attname AS column_name,
-               ix.indisunique AS is_unique, ix.indisprimary AS is_primary,
-               pg_get_indexdef(ix.indexrelid) AS definition
-        FROM pg_index ix
-        JOIN pg_class i ON i.oid = ix.indexrelid
-        JOIN pg_class c ON c.oid = ix.indrelid
-        JOIN pg_namespace n ON n.oid = c.relnamespace
-        JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = ANY(ix.indkey)
-            AND a.attnum > 0 AND NOT a.attisdropped
-        WHERE c.relkind IN ('r', 'm')
-        {schema_filter}
-        {table_filter}
-        ORDER BY n.nspname, c.relname, i.relname, array_position(ix.indkey, a.attnum)
+        result = [r for r in result if r["table"] == table_name]
+    return render_rows("indexes", result, limit, cursor, fmt)
+
+
+async def _graph(schema_name: str) -> FKGraph:
+    return get_graph(await get_snapshot(schema_name))
+
+
+async def find_join_path(
+    schema_name: str,
+    from_table: str,
+    to_table: str,
+    fmt: str | None = None,
+) -> str:
+    """
+    Shortest chain of foreign keys joining two tables (in either direction),
+    with the JOIN clause for each step. Tables may be 'table' or 'schema.table'.
+    """
+    graph = await _graph(schema_name)
+    try:
+        source = graph.resolve(from_table, schema_name)
+        target = graph.resolve(to_table, schema_name)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    path = graph.join_path(source, target)
+    if path is None:
+        return json.dumps(
+            {"error": f"No foreign key path between {source} and {target}"},
+            indent=2,
+        )
+    return render({"from": source, "to": target, "hops": len(path), "path": path}, fmt)
+
+
+async def list_related_tables(
+    schema_name: str,
+    table_name: str,
+    max_hops: int = 1,
+    direction: str = "both",
+    fmt: str | None = None,
+) -> str:
+    """
+    Tables within max_hops foreign key steps of table_name. direction is
+    'out' (tables it references), 'in' (tables referencing it) or 'both'.
+    """
+    if direction not in ("both", "in", "out"):
+        return json.dumps(
+            {"error": "direction must be 'both', 'in' or 'out'"}, indent=2
+        )
+    graph = await _graph(schema_name)
+    try:
+        table = graph.resolve(table_name, schema_name)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    related = graph.neighbors(table, max(max_hops, 0), direction)
+    return render({"table": table, "related": related}, fmt)
+
+
+async def list_cascade_dependents(
+    schema_name: str,
+    table_name: str,
+    fmt: str | None = None,
+) -> str:
+    """
+    What deleting a row of table_name can affect: tables whose rows are deleted
+    through ON DELETE CASCADE (transitively), columns set to NULL or DEFAULT,
+    and NO ACTION/RESTRICT references that block the delete.
+    """
+    graph = await _graph(schema_name)
+    try:
+        table = graph.resolve(table_name, schema_name)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    return render({"table": table, **graph.cascade(table)}, fmt)
+
+
+async def list_fk_cycles(schema_name: str = "public", fmt: str | None = None) -> str:
+    """
+    Groups of tables that reference each other in a cycle (strongly connected
+    components of the foreign key graph), including self-referencing tables.
+    """
+    graph = await _graph(schema_name)
+    return render(graph.cycles(), fmt)
+
+
+async def advise_indexes(schema_name: str = "public", fmt: str | None = None) -> str:
+    """
+    Index findings: foreign keys with no index on their columns, duplicate
+    indexes, indexes that are a leading prefix of another, and partial or
+    expression indexes, with size and scan counts (from pg_stat_*).
     """
-    rows = await fetch_all(query, *args)
-    by_key: dict[tuple[str, str, str], dict[str, Any]] = {}
-    for r in rows:
-        key = (r["schema_name"], r["table_name"], r["index_name"])
-        if key not in by_key:
-            by_key[key] = {
-                "schema": r["schema_name"],
-                "table": r["table_name"],
-                "index": r["index_name"],
-                "columns": [r["column_name"]],
-                "is_unique": r["is_unique"],
-                "is_primary": r["is_primary"],
-                "definition": r["definition"],
-            }
-        else:
-            by_key[key]["columns"].append(r["column_name"])
-    result = list(by_key.values())
-    return json.dumps(result, indent=2)
+    graph = await _graph(schema_name)
+    usage = await get_usage(schema_name, definitions=True)
+    assert usage.index_definitions is not None and usage.fk_widths is not None
+    tables = {f"{t['schema']}.{t['table']}": t for t in usage.tables}
+    return render(advise(graph, usage.index_definitions, tables, usage.fk_widths), fmt)
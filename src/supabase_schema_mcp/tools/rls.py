@@ -1,134 +1,104 @@
 """RLS policy and coverage tools."""
 
+import asyncio
 import json
 
-from supabase_schema_mcp.db import fetch_all, fetch_one
+from supabase_schema_mcp.catalog import SchemaSnapshot
+from supabase_schema_mcp.function_index import get_function_index
+from supabase_schema_mcp.output import render, render_rows
+from supabase_schema_mcp.rls_audit import audit, referenced_schemas
+from supabase_schema_mcp.snapshot import get_snapshot
+from supabase_schema_mcp.usage_stats import get_usage
 
 
-async def list_rls_policies(schema_name: str = "public") -> str:
+async def list_rls_policies(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
     """
     List Row Level Security policies: table, policy name, command (SELECT/INSERT/etc),
     permissive/restrictive, and the USING/WITH CHECK expressions.
     """
-    if schema_name == "all":
-        schema_filter = "AND n.nspname NOT IN ('pg_catalog', 'information_schema')"
-        args: tuple = ()
-    else:
-        schema_filter = "AND n.nspname = $1"
-        args = (schema_name,)
-    query = f"""
-        SELECT n.nspname AS schema_name, c.relname AS table_name,
-               p.polname AS policy_name, p.polcmd AS command,
-                CASE p.polpermissive
-                    WHEN true THEN 'PERMISSIVE' ELSE 'RESTRICTIVE'
-                END AS type,
-               pg_get_expr(p.polqual, p.polrelid) AS using_expr,
-               pg_get_expr(p.polwithcheck, p.polrelid) AS with_check_expr
-        FROM pg_policy p
-        JOIN pg_class c ON c.oid = p.polrelid
-        JOIN pg_namespace n ON n.oid = c.relnamespace
-        WHERE c.relkind = 'r'
-        {schema_filter}
-        ORDER BY n.nspname, c.relname, p.polname
-    """
-    rows = await fetch_all(query, *args)
-    result = [
-        {
-            "schema": r["schema_name"],
-            "table": r["table_name"],
-            "policy": r["policy_name"],
-            "command": _polcmd_to_str(r["command"]),
-            "type": r["type"],
-            "using": r["using_expr"],
-            "with_check": r["with_check_expr"],
-        }
-        for r in rows
-    ]
-    return json.dumps(result, indent=2)
+    snapshot = await get_snapshot(schema_name)
+    return render_rows("policies", snapshot.policies, limit, cursor, fmt)
 
 
 async def get_rls_policy_definition(
-    schema_name: str, table_name: str, policy_name: str
+    schema_name: str,
+    table_name: str,
+    policy_name: str,
+    fmt: str | None = None,
 ) -> str:
     """
     Return the definition (USING and WITH CHECK expressions) of a single RLS policy
     by schema, table and policy name. Returns the policy metadata and the expression
     code so you can see exactly what the policy does.
     """
-    query = """
-        SELECT n.nspname AS schema_name, c.relname AS table_name,
-               p.polname AS policy_name, p.polcmd AS command,
-               CASE p.polpermissive
-                   WHEN true THEN 'PERMISSIVE' ELSE 'RESTRICTIVE'
-               END AS type,
-               pg_get_expr(p.polqual, p.polrelid) AS using_expr,
-               pg_get_expr(p.polwithcheck, p.polrelid) AS with_check_expr
-        FROM pg_policy p
-        JOIN pg_class c ON c.oid = p.polrelid
-        JOIN pg_namespace n ON n.oid = c.relnamespace
-        WHERE n.nspname = $1 AND c.relname = $2 AND p.polname = $3
-          AND c.relkind = 'r'
-    """
-    row = await fetch_one(query, schema_name, table_name, policy_name)
-    if not row:
+    snapshot = await get_snapshot(schema_name)
+    out = next(
+        (
+            p
+            for p in snapshot.policies
+            if p["table"] == table_name and p["policy"] == policy_name
+        ),
+        None,
+    )
+    if out is None:
         return json.dumps(
             {
                 "error": f"No RLS policy named {policy_name!r} on {schema_name}.{table_name}"
             },
             indent=2,
         )
-    cmd = _polcmd_to_str(row["command"])
-    out = {
-        "schema": row["schema_name"],
-        "table": row["table_name"],
-        "policy": row["policy_name"],
-        "command": cmd,
-        "type": row["type"],
-        "using": row["using_expr"],
-        "with_check": row["with_check_expr"],
-    }
-    return json.dumps(out, indent=2)
-
-
-def _polcmd_to_str(cmd: str | None) -> str:
-    """Map pg_policy.polcmd to human-readable command."""
-    if cmd is None:
-        return "ALL"
-    return {"r": "SELECT", "a": "INSERT", "w": "UPDATE", "d": "DELETE", "*": "ALL"}.get(
-        cmd, str(cmd)
-    )
+    return render(out, fmt)
 
 
-async def list_rls_coverage(schema_name: str = "public") -> str:
+async def list_rls_coverage(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
     """
     Report which tables have RLS enabled and how many policies they have.
     Useful for auditing RLS coverage.
     """
+    snapshot = await get_snapshot(schema_name)
+    return render_rows("rls_coverage", snapshot.rls_coverage, limit, cursor, fmt)
+
+
+async def audit_rls_performance(
+    schema_name: str = "public",
+    fmt: str | None = None,
+) -> str:
+    """
+    Review RLS policies for per-row cost: function calls evaluated for every
+    row (e.g. auth.uid() not wrapped in a subquery), subqueries into other
+    tables, and compared columns no index starts with. Findings are ranked by
+    table size, then severity.
+    """
+    snapshot = await get_snapshot(schema_name)
+    policies = snapshot.policies
+    if not policies:
+        return render({"policies_checked": 0, "findings": []}, fmt)
     if schema_name == "all":
-        schema_filter = "AND n.nspname NOT IN ('pg_catalog', 'information_schema')"
-        args: tuple = ()
+        schemas, catalog = None, snapshot
     else:
-        schema_filter = "AND n.nspname = $1"
-        args = (schema_name,)
-    query = f"""
-        SELECT n.nspname AS schema_name, c.relname AS table_name,
-               c.relrowsecurity AS rls_enabled,
-                (SELECT count(*) FROM pg_policy p WHERE p.polrelid = c.oid)
-                    AS policy_count
-        FROM pg_class c
-        JOIN pg_namespace n ON n.oid = c.relnamespace
-        WHERE c.relkind = 'r'
-        {schema_filter}
-        ORDER BY n.nspname, c.relname
-    """
-    rows = await fetch_all(query, *args)
-    result = [
-        {
-            "schema": r["schema_name"],
-            "table": r["table_name"],
-            "rls_enabled": r["rls_enabled"],
-            "policy_count": r["policy_count"],
-        }
-        for r in rows
-    ]
-    return json.dumps(result, indent=2)
+        # Only the schemas the policies can reach into, not every schema.
+        schemas = referenced_schemas(policies)
+        snapshots = await asyncio.gather(*(get_snapshot(s) for s in schemas))
+        catalog = SchemaSnapshot.merge(schema_name, list(snapshots))
+    sizes = {
+        f"{t['schema']}.{t['table']}": (t["rows_estimate"], t["total_bytes"])
+        for t in (await get_usage(schema_name)).tables
+    }
+    dependencies = await get_function_index().dependencies(schemas)
+    function_reads = {
+        f"{d.function.schema}.{d.function.name}": d.reads
+        for d in dependencies.functions
+        if d.reads
+    }
+    findings = audit(policies, catalog, sizes, function_reads)
+    return render({"policies_checked": len(policies), "findings": findings}, fmt)
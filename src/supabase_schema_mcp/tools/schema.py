@@ -1,133 +1,240 @@
-"""Table, column, view, and enum introspection tools."""
+"""Table, column, view, and enum introspection and DDL export tools."""
 
 import json
+from pathlib import Path
+from typing import Any
 
-from supabase_schema_mcp.db import fetch_all
+from supabase_schema_mcp.catalog import Rows, SchemaSnapshot
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.ddl_export import export_chunk, export_to_file
+from supabase_schema_mcp.output import render, render_rows
+from supabase_schema_mcp.snapshot import get_snapshot
 
 
-async def list_tables(schema_name: str = "public") -> str:
+async def list_tables(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
     """
     List tables in the given schema (default: public).
     Returns table names and table type (BASE TABLE).
     """
-    if schema_name == "all":
-        schema_filter = "AND t.table_schema NOT IN ('pg_catalog', 'information_schema')"
-        args: tuple = ()
-    else:
-        schema_filter = "AND t.table_schema = $1"
-        args = (schema_name,)
-    query = f"""
-        SELECT t.table_schema, t.table_name, t.table_type
-        FROM information_schema.tables t
-        WHERE t.table_type = 'BASE TABLE'
-        {schema_filter}
-        ORDER BY t.table_schema, t.table_name
-    """
-    rows = await fetch_all(query, *args)
-    result = [
-        {"schema": r["table_schema"], "table": r["table_name"], "type": r["table_type"]}
-        for r in rows
-    ]
-    return json.dumps(result, indent=2)
+    snapshot = await get_snapshot(schema_name)
+    return render_rows("tables", snapshot.tables, limit, cursor, fmt)
 
 
 async def list_columns(
     schema_name: str = "public",
     table_name: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
 ) -> str:
     """
     List columns for tables in the given schema.
     If table_name is provided, only that table's columns are returned.
     """
-    if schema_name == "all":
-        schema_filter = "AND c.table_schema NOT IN ('pg_catalog', 'information_schema')"
-        args: tuple = ()
-    else:
-        schema_filter = "AND c.table_schema = $1"
-        args = (schema_name,)
+    snapshot = await get_snapshot(schema_name)
+    result = snapshot.columns
     if table_name:
-        table_filter = "AND c.table_name = $" + str(len(args) + 1)
-        args = (*args, table_name)
-    else:
-        table_filter = ""
-    query = f"""
-        SELECT c.table_schema, c.table_name, c.column_name, c.data_type,
-               c.is_nullable, c.column_default
-        FROM information_schema.columns c
-        WHERE 1=1
-        {schema_filter}
-        {table_filter}
-        ORDER BY c.table_schema, c.table_name, c.ordinal_position
-    """
-    rows = await fetch_all(query, *args)
-    result = [
-        {
-            "schema": r["table_schema"],
-            "table": r["table_name"],
-            "column": r["column_name"],
-            "data_type": r["data_type"],
-            "nullable": r["is_nullable"] == "YES",
-            "default": r["column_default"],
-        }
-        for r in rows
-    ]
-    return json.dumps(result, indent=2)
-
-
-async def list_views(schema_name: str = "public") -> str:
+        result = [r for r in result if r["table"] == table_name]
+    return render_rows("columns", result, limit, cursor, fmt)
+
+
+async def list_views(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
     """List views in the given schema (default: public)."""
-    if schema_name == "all":
-        schema_filter = "AND v.table_schema NOT IN ('pg_catalog', 'information_schema')"
-        args: tuple = ()
-    else:
-        schema_filter = "AND v.table_schema = $1"
-        args = (schema_name,)
-    query = f"""
-        SELECT v.table_schema, v.table_name, v.view_definition
-        FROM information_schema.views v
-        WHERE 1=1
-        {schema_filter}
-        ORDER BY v.table_schema, v.table_name
-    """
-    rows = await fetch_all(query, *args)
-    result = []
+    snapshot = await get_snapshot(schema_name)
+    return render_rows("views", snapshot.views, limit, cursor, fmt)
+
+
+async def list_enums(
+    schema_name: str = "public",
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
+    """List custom enum types in the given schema (default: public)."""
+    snapshot = await get_snapshot(schema_name)
+    return render_rows("enums", snapshot.enums, limit, cursor, fmt)
+
+
+def _by_table(
+    rows: Rows, schema_key: str = "schema", table_key: str = "table"
+) -> dict[tuple[str, str], Rows]:
+    grouped: dict[tuple[str, str], Rows] = {}
     for r in rows:
-        full_def = r["view_definition"] or ""
-        preview = full_def[:500] + ("..." if len(full_def) > 500 else "")
+        grouped.setdefault((r[schema_key], r[table_key]), []).append(r)
+    return grouped
+
+
+def _describe(snapshot: SchemaSnapshot, keys: list[tuple[str, str]]) -> Rows:
+    """One consolidated entry per (schema, table), sections without repeated keys."""
+    columns = _by_table(snapshot.columns)
+    constraints = _by_table(snapshot.constraints)
+    indexes = _by_table(snapshot.indexes)
+    policies = _by_table(snapshot.policies)
+    triggers = _by_table(snapshot.triggers)
+    rls = {(r["schema"], r["table"]): r["rls_enabled"] for r in snapshot.rls_coverage}
+    fk_columns: dict[tuple[str, str, str], dict[str, Any]] = {}
+    for fk in snapshot.foreign_keys:
+        key = (fk["from_schema"], fk["from_table"], fk["constraint_name"])
+        entry = fk_columns.setdefault(key, {**fk, "from_columns": [], "to_columns": []})
+        entry["from_columns"].append(fk["from_column"])
+        entry["to_columns"].append(fk["to_column"])
+    fks = list(fk_columns.values())
+    outgoing = _by_table(fks, "from_schema", "from_table")
+    incoming = _by_table(fks, "to_schema", "to_table")
+
+    result = []
+    for schema, table in keys:
+        key = (schema, table)
+        trigger_events: dict[str, dict[str, Any]] = {}
+        for t in triggers.get(key, ()):
+            entry = trigger_events.setdefault(
+                t["trigger"],
+                {
+                    "trigger": t["trigger"],
+                    "timing": t["timing"],
+                    "events": [],
+                    "orientation": t["orientation"],
+                    "action": t["action"],
+                },
+            )
+            entry["events"].append(t["event"])
         result.append({
-            "schema": r["table_schema"],
-            "view": r["table_name"],
-            "definition_preview": preview,
+            "schema": schema,
+            "table": table,
+            "rls_enabled": rls.get(key),
+            "columns": [
+                {
+                    "column": c["column"],
+                    "type": c["full_type"],
+                    "nullable": c["nullable"],
+                    "default": c["default"],
+                }
+                for c in columns.get(key, ())
+            ],
+            "constraints": [
+                {k: v for k, v in c.items() if k not in ("schema", "table")}
+                for c in constraints.get(key, ())
+            ],
+            "indexes": [
+                {k: v for k, v in i.items() if k not in ("schema", "table")}
+                for i in indexes.get(key, ())
+            ],
+            "foreign_keys_out": [
+                {
+                    "constraint": fk["constraint_name"],
+                    "columns": fk["from_columns"],
+                    "references": f"{fk['to_schema']}.{fk['to_table']}",
+                    "referenced_columns": fk["to_columns"],
+                    "on_update": fk["on_update"],
+                    "on_delete": fk["on_delete"],
+                }
+                for fk in outgoing.get(key, ())
+            ],
+            "foreign_keys_in": [
+                {
+                    "constraint": fk["constraint_name"],
+                    "table": f"{fk['from_schema']}.{fk['from_table']}",
+                    "columns": fk["from_columns"],
+                    "referenced_columns": fk["to_columns"],
+                    "on_delete": fk["on_delete"],
+                }
+                for fk in incoming.get(key, ())
+            ],
+            "policies": [
+                {k: v for k, v in p.items() if k not in ("schema", "table")}
+                for p in policies.get(key, ())
+            ],
+            "triggers": list(trigger_events.values()),
         })
-    return json.dumps(result, indent=2)
+    return result
 
 
-async def list_enums(schema_name: str = "public") -> str:
-    """List custom enum types in the given schema (default: public)."""
-    if schema_name == "all":
-        schema_filter = "AND n.nspname NOT IN ('pg_catalog', 'information_schema')"
-        args: tuple = ()
-    else:
-        schema_filter = "AND n.nspname = $1"
-        args = (schema_name,)
-    query = f"""
-        SELECT n.nspname AS schema_name, t.typname AS enum_name,
-               array_agg(e.enumlabel ORDER BY e.enumsortorder) AS enum_labels
-        FROM pg_type t
-        JOIN pg_enum e ON t.oid = e.enumtypid
-        JOIN pg_catalog.pg_namespace n ON n.oid = t.typnamespace
-        WHERE t.typtype = 'e'
-        {schema_filter}
-        GROUP BY n.nspname, t.typname
-        ORDER BY n.nspname, t.typname
+async def describe_tables(
+    schema_name: str,
+    table_names: list[str],
+    fmt: str | None = None,
+) -> str:
+    """
+    Everything about several tables in one call: columns, constraints
+    (primary key, unique, check, exclusion), indexes, foreign keys in both
+    directions, RLS policies and triggers. With schema_name='all', tables may
+    be given as 'schema.table'; incoming foreign keys are those from tables
+    in schema_name.
+    """
+    snapshot = await get_snapshot(schema_name)
+    known = [(t["schema"], t["table"]) for t in snapshot.tables]
+    keys: list[tuple[str, str]] = []
+    missing = []
+    for name in dict.fromkeys(table_names):
+        matches = [key for key in known if name in (key[1], f"{key[0]}.{key[1]}")]
+        if len(matches) == 1:
+            keys.append(matches[0])
+        elif matches:
+            qualified = ", ".join(f"{s}.{t}" for s, t in matches)
+            return json.dumps(
+                {"error": f"Table name {name!r} is ambiguous: {qualified}"},
+                indent=2,
+            )
+        else:
+            missing.append(name)
+    if missing and not keys:
+        return json.dumps(
+            {
+                "error": f"No tables named {', '.join(map(repr, missing))}"
+                f" in {schema_name!r}"
+            },
+            indent=2,
+        )
+    out: dict[str, Any] = {"tables": _describe(snapshot, keys)}
+    if missing:
+        out["missing"] = missing
+    return render(out, fmt)
+
+
+async def export_ddl(
+    schema_name: str = "public",
+    path: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    fmt: str | None = None,
+) -> str:
+    """
+    CREATE statements for a schema in dependency order. With `path` (relative
+    to DDL_EXPORT_DIR) the whole script is written to that file from one
+    consistent snapshot; otherwise it is returned in chunks of at most
+    `limit` statements, continued with `cursor`. Each chunk is read in its
+    own transaction, so DDL run between calls can make chunks disagree.
     """
-    rows = await fetch_all(query, *args)
-    result = [
-        {
-            "schema": r["schema_name"],
-            "enum": r["enum_name"],
-            "labels": list(r["enum_labels"]) if r["enum_labels"] else [],
-        }
-        for r in rows
-    ]
-    return json.dumps(result, indent=2)
+    settings = get_settings()
+    if path is not None:
+        if not settings.ddl_export_dir:
+            return json.dumps(
+                {"error": "Set DDL_EXPORT_DIR to allow writing exports to files"},
+                indent=2,
+            )
+        root = Path(settings.ddl_export_dir).expanduser().resolve()
+        file = (root / path).resolve()
+        if not file.is_relative_to(root) or file == root:
+            return json.dumps(
+                {"error": f"path {path!r} is not a file in DDL_EXPORT_DIR"}, indent=2
+            )
+        file.parent.mkdir(parents=True, exist_ok=True)
+        return render(await export_to_file(schema_name, file), fmt)
+    page_size = settings.page_size_max
+    if limit is not None:
+        page_size = max(1, min(limit, page_size))
+    try:
+        chunk = await export_chunk(schema_name, page_size, cursor)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    return render(chunk, fmt)
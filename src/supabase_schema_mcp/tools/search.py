@@ -0,0 +1,34 @@
+"""Ranked search over schema object names and definitions."""
+
+import json
+
+from supabase_schema_mcp.output import render
+from supabase_schema_mcp.search import KINDS, get_index
+
+
+async def search_schema(
+    query: str,
+    schema_name: str = "all",
+    kinds: list[str] | None = None,
+    limit: int = 20,
+    fmt: str | None = None,
+) -> str:
+    """
+    Search tables, views, columns, enums and their values, functions, RLS
+    policies and triggers by name (exact, word, prefix and fuzzy trigram
+    matches), plus function bodies, policy expressions and view definitions.
+    Returns the best matches first, with a snippet for definition matches.
+    """
+    unknown = sorted(set(kinds or ()) - set(KINDS))
+    if unknown:
+        return json.dumps(
+            {
+                "error": f"Unknown kinds {', '.join(unknown)}; "
+                f"expected any of {', '.join(KINDS)}"
+            },
+            indent=2,
+        )
+    if not query.strip():
+        return json.dumps({"error": "query must not be empty"}, indent=2)
+    results = await get_index().search(query, schema_name, kinds, max(limit, 1))
+    return render(results, fmt)
@@ -0,0 +1,78 @@
+"""Table and index size and usage statistics tools."""
+
+import json
+from typing import Any
+
+from supabase_schema_mcp.output import render_list
+from supabase_schema_mcp.usage_stats import get_usage
+
+# Sort keys, all largest first; None (no statistics yet) sorts last.
+_TABLE_SORTS = {
+    "size": "total_bytes",
+    "rows": "rows_estimate",
+    "seq_scans": "seq_scans",
+    "seq_rows_read": "seq_rows_read",
+    "index_scans": "index_scans",
+    "writes": "writes",
+    "dead_tuples": "dead_tuples",
+}
+_INDEX_SORTS = {"size": "size_bytes", "scans": "scans", "tuples_read": "tuples_read"}
+
+
+def _top(
+    rows: list[dict[str, Any]], key: str, limit: int | None
+) -> list[dict[str, Any]]:
+    ordered = sorted(
+        rows,
+        key=lambda r: (r[key] is None, -(r[key] or 0), r["schema"], r["table"]),
+    )
+    return ordered if limit is None else ordered[: max(limit, 0)]
+
+
+def _sort_error(sort_by: str, options: dict[str, str]) -> str:
+    return json.dumps(
+        {"error": f"Unknown sort_by {sort_by!r}; use one of {', '.join(options)}"},
+        indent=2,
+    )
+
+
+async def table_stats(
+    schema_name: str = "public",
+    sort_by: str = "size",
+    limit: int | None = 20,
+    fmt: str | None = None,
+) -> str:
+    """
+    Size and activity per table: estimated rows and pages, total/table/index
+    bytes, sequential vs index scans, writes, dead tuples and last (auto)vacuum
+    and analyze, plus index and unused-index counts. Largest first by `sort_by`.
+    Counters are cumulative since the last statistics reset and are cached
+    for STATS_CACHE_TTL seconds.
+    """
+    key = _TABLE_SORTS.get(sort_by)
+    if key is None:
+        return _sort_error(sort_by, _TABLE_SORTS)
+    usage = await get_usage(schema_name)
+    return render_list(_top(usage.tables, key, limit), fmt)
+
+
+async def index_stats(
+    schema_name: str = "public",
+    table_name: str | None = None,
+    sort_by: str = "size",
+    limit: int | None = 20,
+    fmt: str | None = None,
+) -> str:
+    """
+    Size and scans per index, optionally for one table: bytes, index scans,
+    tuples read and fetched, and whether it is unique, primary or valid.
+    Largest first by `sort_by`; cached like table_stats.
+    """
+    key = _INDEX_SORTS.get(sort_by)
+    if key is None:
+        return _sort_error(sort_by, _INDEX_SORTS)
+    usage = await get_usage(schema_name)
+    rows = usage.indexes
+    if table_name is not None:
+        rows = [r for r in rows if r["table"] == table_name]
+    return render_list(_top(rows, key, limit), fmt)
@@ -0,0 +1,307 @@
+"""
+Table and index size and usage statistics, loaded with one query per schema
+and cached for a short TTL (they change with every write, unlike the schema).
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from supabase_schema_mcp.config import get_settings
+from supabase_schema_mcp.db import fetch_all
+from supabase_schema_mcp.index_advisor import Index
+from supabase_schema_mcp.snapshot import get_schema_snapshots
+from supabase_schema_mcp.targets import TargetLRU
+
+# One row per index, or per table without indexes. The CTE is materialized
+# so size functions run once per table, not once per joined index.
+# {widths}, {definitions} and {joins} add the index advisor's inputs, or
+# nothing.
+_USAGE = """
+WITH t AS MATERIALIZED (
+    SELECT c.oid, n.nspname AS schema_name, c.relname AS table_name,
+           c.relkind::text AS relkind,
+           greatest(c.reltuples, 0)::bigint AS rows_estimate,
+           c.relpages AS pages,
+           pg_total_relation_size(c.oid) AS total_bytes,
+           pg_relation_size(c.oid) AS table_bytes,
+           pg_indexes_size(c.oid) AS index_bytes{widths}
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p', 'm') AND n.nspname = ANY($1::text[])
+)
+SELECT t.*,
+       s.seq_scan, s.seq_tup_read, s.idx_scan, s.idx_tup_fetch,
+       s.n_live_tup, s.n_dead_tup, s.n_mod_since_analyze,
+       s.n_tup_ins, s.n_tup_upd, s.n_tup_hot_upd, s.n_tup_del,
+       s.last_vacuum, s.last_autovacuum, s.last_analyze, s.last_autoanalyze,
+       i.relname AS index_name, pg_relation_size(i.oid) AS index_size,
+       ix.indisunique, ix.indisprimary, ix.indisvalid,
+       si.idx_scan AS index_scans, si.idx_tup_read AS index_tup_read,
+       si.idx_tup_fetch AS index_tup_fetch{definitions}
+FROM t
+LEFT JOIN pg_stat_user_tables s ON s.relid = t.oid
+LEFT JOIN pg_index ix ON ix.indrelid = t.oid
+LEFT JOIN pg_class i ON i.oid = ix.indexrelid
+LEFT JOIN pg_stat_user_indexes si ON si.indexrelid = ix.indexrelid{joins}
+"""
+
+# Per table: average width of each foreign key column, from ANALYZE
+# statistics, else the type's fixed length.
+_WIDTHS = """,
+           (
+               SELECT json_object_agg(
+                   a.attname, coalesce(st.avg_width, nullif(a.attlen, -1), 32)
+               )
+               FROM pg_attribute a
+               LEFT JOIN pg_stats st
+                   ON st.schemaname = n.nspname AND st.tablename = c.relname
+                   AND st.attname = a.attname
+               WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+                 AND EXISTS (
+                     SELECT 1 FROM pg_constraint con
+                     WHERE con.conrelid = c.oid AND con.contype = 'f'
+                       AND a.attnum = ANY(con.conkey)
+                 )
+           )::text AS fk_widths"""
+
+# Per index: method, key and INCLUDE definitions, operator classes,
+# collations and options, predicate, and the constraint it backs.
+_DEFINITIONS = """,
+       am.amname AS method,
+       ARRAY(
+           SELECT pg_get_indexdef(ix.indexrelid, k, true)
+           FROM generate_series(1, ix.indnkeyatts) k ORDER BY k
+       ) AS keys,
+       ARRAY(
+           SELECT pg_get_indexdef(ix.indexrelid, k, true)
+           FROM generate_series(ix.indnkeyatts + 1, ix.indnatts) k
+           ORDER BY k
+       ) AS include,
+       ix.indclass::oid[] AS opclasses,
+       ix.indcollation::oid[] AS collations,
+       ix.indoption::int2[] AS options,
+       pg_get_expr(ix.indpred, ix.indrelid, true) AS predicate,
+       ix.indexprs IS NOT NULL AS has_expressions,
+       con.conname AS constraint_name"""
+
+# Joined, not correlated: pg_constraint has no index on conindid.
+_DEFINITION_JOINS = """
+LEFT JOIN pg_am am ON am.oid = i.relam
+LEFT JOIN pg_constraint con
+    ON con.conindid = ix.indexrelid AND con.contype IN ('p', 'u', 'x')"""
+
+_RELKINDS = {"r": "table", "p": "partitioned table", "m": "materialized view"}
+
+
+def _iso(value: datetime | None) -> str | None:
+    return None if value is None else value.isoformat()
+
+
+def _ratio(part: int | None, whole: int | None) -> float | None:
+    return round(part / whole, 3) if part is not None and whole else None
+
+
+def _table_row(r: Any) -> dict[str, Any]:
+    seq, idx = r["seq_scan"], r["idx_scan"]
+    scans = None if seq is None else seq + (idx or 0)
+    dead, live = r["n_dead_tup"], r["n_live_tup"]
+    writes = (
+        None
+        if r["n_tup_ins"] is None
+        else r["n_tup_ins"] + r["n_tup_upd"] + r["n_tup_del"]
+    )
+    return {
+        "schema": r["schema_name"],
+        "table": r["table_name"],
+        "type": _RELKINDS[r["relkind"]],
+        "rows_estimate": r["rows_estimate"],
+        "pages": r["pages"],
+        "total_bytes": r["total_bytes"],
+        "table_bytes": r["table_bytes"],
+        "index_bytes": r["index_bytes"],
+        "seq_scans": seq,
+        "seq_rows_read": r["seq_tup_read"],
+        "index_scans": idx,
+        "index_scan_ratio": _ratio(idx, scans),
+        "inserts": r["n_tup_ins"],
+        "updates": r["n_tup_upd"],
+        "hot_updates": r["n_tup_hot_upd"],
+        "deletes": r["n_tup_del"],
+        "writes": writes,
+        "live_tuples": live,
+        "dead_tuples": dead,
+        "dead_tuple_ratio": _ratio(dead, None if live is None else live + (dead or 0)),
+        "modified_since_analyze": r["n_mod_since_analyze"],
+        "last_vacuum": _iso(r["last_vacuum"]),
+        "last_autovacuum": _iso(r["last_autovacuum"]),
+        "last_analyze": _iso(r["last_analyze"]),
+        "last_autoanalyze": _iso(r["last_autoanalyze"]),
+        "indexes": 0,
+        "unused_indexes": 0,
+    }
+
+
+def _index_row(r: Any) -> dict[str, Any]:
+    return {
+        "schema": r["schema_name"],
+        "table": r["table_name"],
+        "index": r["index_name"],
+        "size_bytes": r["index_size"],
+        "table_rows_estimate": r["rows_estimate"],
+        "scans": r["index_scans"],
+        "tuples_read": r["index_tup_read"],
+        "tuples_fetched": r["index_tup_fetch"],
+        "is_unique": r["indisunique"],
+        "is_primary": r["indisprimary"],
+        "is_valid": r["indisvalid"],
+    }
+
+
+def _index(r: Any) -> Index:
+    return Index(
+        schema=r["schema_name"],
+        table=r["table_name"],
+        name=r["index_name"],
+        method=r["method"],
+        keys=tuple(r["keys"]),
+        key_options=tuple(
+            zip(r["opclasses"], r["collations"], r["options"], strict=True)
+        ),
+        include=tuple(r["include"]),
+        predicate=r["predicate"],
+        has_expressions=r["has_expressions"],
+        is_unique=r["indisunique"],
+        is_valid=r["indisvalid"],
+        constraint=r["constraint_name"],
+        size_bytes=r["index_size"],
+        scans=r["index_scans"],
+    )
+
+
+@dataclass
+class UsageStats:
+    """
+    Table and index rows of one schema (or 'all') as of `fetched_at`. When
+    loaded with definitions, also the index definitions and foreign key
+    column widths (by schema.table and column) that the index advisor reads.
+    """
+
+    tables: list[dict[str, Any]]
+    indexes: list[dict[str, Any]]
+    index_definitions: list[Index] | None = None
+    fk_widths: dict[tuple[str, str], int] | None = None
+    fetched_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+async def load_usage(schemas: list[str], definitions: bool = False) -> UsageStats:
+    """
+    Run the usage query for `schemas` and split it into tables and indexes,
+    plus index definitions and foreign key column widths if `definitions`.
+    """
+    query = _USAGE.format(
+        widths=_WIDTHS if definitions else "",
+        definitions=_DEFINITIONS if definitions else "",
+        joins=_DEFINITION_JOINS if definitions else "",
+    )
+    tables: dict[tuple[str, str], dict[str, Any]] = {}
+    indexes: list[dict[str, Any]] = []
+    index_definitions: list[Index] = []
+    widths: dict[tuple[str, str], int] = {}
+    for r in await fetch_all(query, schemas):
+        key = (r["schema_name"], r["table_name"])
+        table = tables.get(key)
+        if table is None:
+            table = tables[key] = _table_row(r)
+            if definitions and r["fk_widths"] is not None:
+                relation = f"{r['schema_name']}.{r['table_name']}"
+                for column, width in json.loads(r["fk_widths"]).items():
+                    widths[(relation, column)] = width
+        if r["index_name"] is not None:
+            indexes.append(_index_row(r))
+            if definitions:
+                index_definitions.append(_index(r))
+            table["indexes"] += 1
+            if r["index_scans"] == 0 and not (r["indisunique"] or r["indisprimary"]):
+                table["unused_indexes"] += 1
+    if not definitions:
+        return UsageStats(list(tables.values()), indexes)
+    index_definitions.sort(key=lambda i: (i.schema, i.table, i.name))
+    return UsageStats(list(tables.values()), indexes, index_definitions, widths)
+
+
+class UsageCache:
+    """Usage stats per schema for the current target, reloaded after the TTL."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, UsageStats] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.loads = 0
+
+    def _fresh(self, schema_name: str, definitions: bool) -> UsageStats | None:
+        entry = self._entries.get(schema_name)
+        if entry is None or entry.age >= get_settings().stats_cache_ttl:
+            return None
+        if definitions and entry.index_definitions is None:
+            return None
+        return entry
+
+    async def get(self, schema_name: str, definitions: bool = False) -> UsageStats:
+        entry = self._fresh(schema_name, definitions)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        # Concurrent callers for the same schema share one query.
+        lock = self._locks.setdefault(schema_name, asyncio.Lock())
+        async with lock:
+            entry = self._fresh(schema_name, definitions)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            schemas = list(await get_schema_snapshots(schema_name))
+            entry = await load_usage(schemas, definitions)
+            self._entries[schema_name] = entry
+            self.loads += 1
+            return entry
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "schemas": len(self._entries),
+            "hits": self.hits,
+            "loads": self.loads,
+            "oldest_seconds": round(
+                max((e.age for e in self._entries.values()), default=0.0), 1
+            ),
+        }
+
+
+_caches: TargetLRU[UsageCache] | None = None
+
+
+def get_usage_cache() -> UsageCache:
+    """Return the current target's usage cache, creating it on first use."""
+    global _caches
+    if _caches is None:
+        _caches = TargetLRU(get_settings().schema_cache_max_targets)
+    return _caches.get(lambda _target: UsageCache())
+
+
+async def get_usage(schema_name: str, definitions: bool = False) -> UsageStats:
+    """
+    Usage stats for `schema_name` ('all' for every user schema); with
+    `definitions`, also what the index advisor needs (see load_usage).
+    """
+    return await get_usage_cache().get(schema_name, definitions)
+
+
+def usage_cache_stats() -> dict[str, dict[str, Any]]:
+    """Cached schemas, hits and loads by target."""
+    return {} if _caches is None else {n: c.stats() for n, c in _caches.items()}
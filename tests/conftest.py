@@ -0,0 +1,12 @@
+import pytest
+
+from supabase_schema_mcp.config import Settings, get_settings
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch: pytest.MonkeyPatch) -> Settings:
+    """Fresh settings per test, without reading the developer's .env."""
+    monkeypatch.setattr("supabase_schema_mcp.config.load_dotenv", lambda: None)
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
@@ -0,0 +1,65 @@
+import pytest
+
+from supabase_schema_mcp import server
+from supabase_schema_mcp.config import get_settings
+
+
+@pytest.fixture
+def started(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str, int]]:
+    """Record (transport, host, port) instead of serving."""
+    calls: list[tuple[str, str, int]] = []
+
+    async def serve(transport: str, host: str, port: int) -> None:
+        calls.append((transport, host, port))
+
+    monkeypatch.setattr(server, "_serve_http", serve)
+    monkeypatch.setattr(
+        server.mcp, "run", lambda transport: calls.append((transport, "", 0))
+    )
+    return calls
+
+
+def test_help_does_not_load_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HTTP_PORT", "not a port")
+    get_settings.cache_clear()
+    with pytest.raises(SystemExit) as exit_info:
+        server.run(["--help"])
+    assert exit_info.value.code == 0
+
+
+def test_unset_flags_come_from_settings(
+    monkeypatch: pytest.MonkeyPatch, started: list[tuple[str, str, int]]
+) -> None:
+    monkeypatch.setenv("TRANSPORT", "streamable-http")
+    monkeypatch.setenv("HTTP_PORT", "9100")
+    get_settings.cache_clear()
+    server.run(["--banner", "never", "--host", "0.0.0.0"])
+    assert started == [("streamable-http", "0.0.0.0", 9100)]
+
+
+def test_flags_override_settings(
+    monkeypatch: pytest.MonkeyPatch, started: list[tuple[str, str, int]]
+) -> None:
+    monkeypatch.setenv("TRANSPORT", "streamable-http")
+    get_settings.cache_clear()
+    server.run(["--banner", "never", "--transport", "stdio"])
+    assert started == [("stdio", "", 0)]
+
+
+def test_export_ddl_error_exits_nonzero(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    from supabase_schema_mcp import db, ddl_export
+
+    async def fail(schema_name: str, out: object) -> int:
+        raise RuntimeError("DB_HOST is not set")
+
+    async def close() -> None:
+        pass
+
+    monkeypatch.setattr(ddl_export, "write_ddl", fail)
+    monkeypatch.setattr(db, "close_pool", close)
+    with pytest.raises(SystemExit) as exit_info:
+        server.run(["export-ddl", "--schema", "public"])
+    assert exit_info.value.code == 1
+    assert '"error": "DB_HOST is not set"' in capsys.readouterr().err
@@ -0,0 +1,27 @@
+import pytest
+
+from supabase_schema_mcp.ddl_notify import parse_payload
+
+
+def test_schemas_listed() -> None:
+    payload = '{"tag": "ALTER TABLE", "schemas": ["public", "app"]}'
+    assert parse_payload(payload) == ["public", "app"]
+
+
+def test_non_string_entries_dropped() -> None:
+    assert parse_payload('{"schemas": ["public", 1, null]}') == ["public"]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        '{"tag": "CREATE SCHEMA", "schemas": null}',
+        '{"tag": "DROP TABLE", "schemas": []}',
+        '{"tag": "ALTER TABLE"}',
+        '["public"]',
+        "not json",
+        "",
+    ],
+)
+def test_everything_may_have_changed(payload: str) -> None:
+    assert parse_payload(payload) is None
@@ -0,0 +1,131 @@
+from supabase_schema_mcp.explain import normalize_sql, scanned_schemas, summarize
+
+
+def _node(kind: str, cost: float, rows: int, *children: dict, **fields) -> dict:
+    node = {
+        "Node Type": kind,
+        "Total Cost": cost,
+        "Startup Cost": 0.0,
+        "Plan Rows": rows,
+        **fields,
+    }
+    if children:
+        node["Plans"] = list(children)
+    return node
+
+
+def _plan() -> dict:
+    seq = _node(
+        "Seq Scan",
+        900.0,
+        50,
+        Schema="public",
+        **{
+            "Relation Name": "orders",
+            "Filter": "(status = 'open'::text)",
+            "Parent Relationship": "Outer",
+        },
+    )
+    index = _node(
+        "Index Scan",
+        8.3,
+        1,
+        Schema="public",
+        **{
+            "Relation Name": "customers",
+            "Index Name": "customers_pkey",
+            "Index Cond": "(id = orders.customer_id)",
+            "Parent Relationship": "Inner",
+        },
+    )
+    subplan = _node(
+        "Seq Scan",
+        20.0,
+        1,
+        Schema="app",
+        **{
+            "Relation Name": "flags",
+            "Parent Relationship": "SubPlan",
+            "Subplan Name": "SubPlan 1",
+        },
+    )
+    bitmap_index = _node(
+        "Bitmap Index Scan",
+        4.0,
+        10,
+        **{
+            "Index Name": "notes_at_idx",
+            "Index Cond": "(at > now())",
+            "Parent Relationship": "Outer",
+        },
+    )
+    bitmap = _node(
+        "Bitmap Heap Scan",
+        30.0,
+        10,
+        bitmap_index,
+        Schema="public",
+        **{
+            "Relation Name": "notes",
+            "Recheck Cond": "(at > now())",
+            "Parent Relationship": "InitPlan",
+            "Subplan Name": "InitPlan 2",
+        },
+    )
+    return _node("Nested Loop", 1000.0, 50, seq, index, subplan, bitmap)
+
+
+def test_summarize() -> None:
+    summary = summarize(_plan(), {"public.orders": 200_000, "app.flags": 10})
+    assert summary["total_cost"] == 1000.0
+    assert [n["node"] for n in summary["top_nodes"]][:2] == ["Seq Scan", "Nested Loop"]
+    assert summary["top_nodes"][1]["self_cost"] == 41.7
+    assert [(s["relation"], s["large"]) for s in summary["seq_scans"]] == [
+        ("public.orders", True),
+        ("app.flags", False),
+    ]
+    assert summary["indexes_used"] == [
+        {
+            "index": "customers_pkey",
+            "relation": "public.customers",
+            "node": "Index Scan",
+            "condition": "(id = orders.customer_id)",
+        },
+        {
+            "index": "notes_at_idx",
+            "relation": "public.notes",
+            "node": "Bitmap Index Scan",
+            "condition": "(at > now())",
+        },
+    ]
+    assert summary["subplans"] == [
+        {"name": "SubPlan 1", "per_row": True, "total_cost": 20.0},
+        {"name": "InitPlan 2", "per_row": False, "total_cost": 30.0},
+    ]
+    assert summary["warnings"] == [
+        "Seq Scan on public.orders (about 200000 rows) with filter"
+        " (status = 'open'::text)",
+        "SubPlan 1 runs once per row (cost 20.0 each)",
+    ]
+
+
+def test_unknown_table_size_is_not_large() -> None:
+    summary = summarize(_plan(), {})
+    assert not any(s["large"] for s in summary["seq_scans"])
+    assert len(summary["warnings"]) == 1
+
+
+def test_scanned_schemas() -> None:
+    assert scanned_schemas(_plan()) == {"public", "app"}
+
+
+def test_normalize_sql() -> None:
+    sql = """
+        SELECT  *  -- all columns
+        FROM orders /* main */ WHERE note = 'a  --b' AND id = $2;
+    """
+    assert normalize_sql(sql) == (
+        "SELECT * FROM orders WHERE note = 'a  --b' AND id = $2",
+        2,
+    )
+    assert normalize_sql("SELECT '$1', $$ $3 $$") == ("SELECT '$1', $$ $3 $$", 0)
@@ -0,0 +1,157 @@
+import pytest
+
+from supabase_schema_mcp.catalog import SchemaSnapshot
+from supabase_schema_mcp.fk_graph import FKGraph
+
+
+def _fk(
+    child: str, name: str, parent: str, *pairs: tuple[str, str], on_delete="NO ACTION"
+):
+    from_schema, from_table = child.split(".")
+    to_schema, to_table = parent.split(".")
+    return [
+        {
+            "from_schema": from_schema,
+            "from_table": from_table,
+            "from_column": c,
+            "to_schema": to_schema,
+            "to_table": to_table,
+            "to_column": p,
+            "constraint_name": name,
+            "position": i,
+            "on_delete": on_delete,
+        }
+        for i, (c, p) in enumerate(pairs, 1)
+    ]
+
+
+def _graph() -> FKGraph:
+    snapshot = SchemaSnapshot("public")
+    for table in ("orgs", "users", "posts", "comments", "a", "b", "c", "tags"):
+        snapshot.tables.append({"schema": "public", "table": table})
+    snapshot.foreign_keys += (
+        _fk(
+            "public.users",
+            "users_org_fkey",
+            "public.orgs",
+            ("org_id", "id"),
+            on_delete="CASCADE",
+        )
+        + _fk(
+            "public.posts",
+            "posts_author_fkey",
+            "public.users",
+            ("author_id", "id"),
+            on_delete="CASCADE",
+        )
+        + _fk(
+            "public.comments",
+            "comments_post_fkey",
+            "public.posts",
+            ("org_id", "org_id"),
+            ("post_id", "id"),
+            on_delete="SET NULL",
+        )
+        + _fk("public.orgs", "orgs_parent_fkey", "public.orgs", ("parent_id", "id"))
+        + _fk("public.a", "a_b_fkey", "public.b", ("b_id", "id"))
+        + _fk("public.b", "b_c_fkey", "public.c", ("c_id", "id"))
+        + _fk("public.c", "c_a_fkey", "public.a", ("a_id", "id"))
+        + _fk("public.posts", "posts_owner_fkey", "auth.users", ("owner", "id"))
+    )
+    return FKGraph(snapshot)
+
+
+def test_tables_include_referenced_outside_schema() -> None:
+    assert "auth.users" in _graph().tables
+
+
+def test_composite_key_join_condition() -> None:
+    (edge,) = _graph().outgoing["public.comments"]
+    assert edge.join_condition() == (
+        "public.comments.org_id = public.posts.org_id"
+        " AND public.comments.post_id = public.posts.id"
+    )
+
+
+def test_join_condition_quotes_identifiers() -> None:
+    snapshot = SchemaSnapshot("public")
+    snapshot.foreign_keys += _fk(
+        "public.Order Items", "items_order_fkey", "public.order", ("OrderId", "id")
+    )
+    graph = FKGraph(snapshot)
+    (edge,) = graph.outgoing["public.Order Items"]
+    assert edge.join_condition() == (
+        'public."Order Items"."OrderId" = public."order".id'
+    )
+    (step,) = graph.join_path("public.Order Items", "public.order")
+    assert step["to"] == "public.order"
+    assert step["join"].startswith('JOIN public."order" ON ')
+
+
+def test_join_path_follows_both_directions() -> None:
+    path = _graph().join_path("public.comments", "public.orgs")
+    assert [(s["from"], s["to"], s["relation"]) for s in path] == [
+        ("public.comments", "public.posts", "references"),
+        ("public.posts", "public.users", "references"),
+        ("public.users", "public.orgs", "references"),
+    ]
+    back = _graph().join_path("public.orgs", "public.posts")
+    assert [s["relation"] for s in back] == ["referenced_by", "referenced_by"]
+    assert back[-1]["join"] == (
+        "JOIN public.posts ON public.posts.author_id = public.users.id"
+    )
+
+
+def test_join_path_unconnected() -> None:
+    assert _graph().join_path("public.tags", "public.orgs") is None
+    assert _graph().join_path("public.orgs", "public.orgs") == []
+
+
+def test_cycles_tarjan() -> None:
+    assert _graph().cycles() == [
+        {
+            "tables": ["public.a", "public.b", "public.c"],
+            "constraints": [
+                "public.a.a_b_fkey",
+                "public.b.b_c_fkey",
+                "public.c.c_a_fkey",
+            ],
+        },
+        {"tables": ["public.orgs"], "constraints": ["public.orgs.orgs_parent_fkey"]},
+    ]
+
+
+def test_cycles_on_long_chain_do_not_recurse() -> None:
+    snapshot = SchemaSnapshot("public")
+    n = 5000
+    for i in range(n):
+        snapshot.foreign_keys += _fk(
+            f"public.t{i}", f"t{i}_fkey", f"public.t{(i + 1) % n}", ("next", "id")
+        )
+    (cycle,) = FKGraph(snapshot).cycles()
+    assert len(cycle["tables"]) == n
+
+
+def test_neighbors_and_cascade() -> None:
+    graph = _graph()
+    assert graph.neighbors("public.users", 1) == [
+        {"table": "public.orgs", "hops": 1, "via": "users_org_fkey"},
+        {"table": "public.posts", "hops": 1, "via": "posts_author_fkey"},
+    ]
+    cascade = graph.cascade("public.orgs")
+    assert [(d["table"], d["depth"]) for d in cascade["deleted"]] == [
+        ("public.users", 1),
+        ("public.posts", 2),
+    ]
+    assert [s["table"] for s in cascade["set_null"]] == ["public.comments"]
+    assert [b["table"] for b in cascade["blocking"]] == ["public.orgs"]
+
+
+def test_resolve() -> None:
+    graph = _graph()
+    assert graph.resolve("posts", "public") == "public.posts"
+    assert graph.resolve("orgs", "other") == "public.orgs"
+    with pytest.raises(ValueError, match="ambiguous"):
+        graph.resolve("users", "other")
+    with pytest.raises(ValueError, match="No table"):
+        graph.resolve("missing", "public")
@@ -0,0 +1,57 @@
+import pytest
+
+from supabase_schema_mcp import function_index
+from supabase_schema_mcp.catalog import SchemaSnapshot
+from supabase_schema_mcp.function_index import FunctionIndex, parse_body
+
+
+@pytest.fixture
+def snapshots(monkeypatch: pytest.MonkeyPatch) -> dict[str, SchemaSnapshot]:
+    """The snapshot cache's current snapshots; no database queries."""
+    current = {"public": SchemaSnapshot("public")}
+    current["public"].tables.append({"schema": "public", "table": "orders"})
+
+    async def get_schema_snapshots(schema_name: str) -> dict[str, SchemaSnapshot]:
+        if schema_name == "all":
+            return dict(current)
+        return {schema_name: current.get(schema_name, SchemaSnapshot(schema_name))}
+
+    async def no_rows(*args: object) -> list:
+        return []
+
+    async def no_depend(oids: list[int]) -> dict:
+        return {}
+
+    monkeypatch.setattr(function_index, "get_schema_snapshots", get_schema_snapshots)
+    monkeypatch.setattr(function_index, "fetch_all", no_rows)
+    monkeypatch.setattr(function_index, "_load_depend", no_depend)
+    return current
+
+
+@pytest.mark.parametrize("schemas", [None, ["public"]])
+async def test_index_rebuilt_for_a_new_snapshot(
+    snapshots: dict[str, SchemaSnapshot], schemas: list[str] | None
+) -> None:
+    index = FunctionIndex()
+    first = await index.dependencies(schemas)
+    assert await index.dependencies(schemas) is first
+    # Invalidation replaces the snapshot object; its id() may be reused.
+    snapshots["public"] = SchemaSnapshot("public")
+    snapshots["public"].tables.append({"schema": "public", "table": "invoices"})
+    rebuilt = await index.dependencies(schemas)
+    assert rebuilt is not first
+    assert rebuilt.relations == {"public.invoices"}
+
+
+def test_parse_body_reads_and_writes() -> None:
+    # As pg_get_functiondef() prints it.
+    refs, dynamic = parse_body(
+        "CREATE OR REPLACE FUNCTION public.f()\n RETURNS void\n LANGUAGE sql\n"
+        "AS $function$\n"
+        "INSERT INTO audit.log SELECT * FROM orders o JOIN app.items i ON true;\n"
+        "$function$\n"
+    )
+    assert ("write", "audit", "log") in refs
+    assert ("read", None, "orders") in refs
+    assert ("read", "app", "items") in refs
+    assert not dynamic
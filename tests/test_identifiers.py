@@ -0,0 +1,27 @@
+import pytest
+
+from supabase_schema_mcp.identifiers import quote_ident, quote_relation
+
+
+@pytest.mark.parametrize(
+    ("name", "quoted"),
+    [
+        ("user_id", "user_id"),
+        ("_x1", "_x1"),
+        ("OwnerId", '"OwnerId"'),
+        ("order", '"order"'),
+        ("user", '"user"'),
+        ("1st", '"1st"'),
+        ("a$b", '"a$b"'),
+        ("with space", '"with space"'),
+        ('say "hi"', '"say ""hi"""'),
+    ],
+)
+def test_quote_ident_like_postgres(name: str, quoted: str) -> None:
+    assert quote_ident(name) == quoted
+
+
+def test_quote_relation_splits_at_first_dot() -> None:
+    assert quote_relation("public.users") == "public.users"
+    assert quote_relation("App.v1.2") == '"App"."v1.2"'
+    assert quote_relation("orders") == "orders"
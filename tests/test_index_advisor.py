@@ -0,0 +1,128 @@
+from supabase_schema_mcp.catalog import SchemaSnapshot
+from supabase_schema_mcp.fk_graph import FKGraph
+from supabase_schema_mcp.index_advisor import Index, advise, estimate_btree_bytes
+
+_STATS = {"rows_estimate": 50_000, "size_bytes": 8_000_000, "seq_scans": 7}
+
+
+def _index(name: str, *keys: str, table: str = "orders", **fields) -> Index:
+    values = {
+        "schema": "public",
+        "table": table,
+        "name": name,
+        "method": "btree",
+        "keys": keys,
+        "key_options": tuple((0, 0, 0) for _ in keys),
+        "include": (),
+        "predicate": None,
+        "has_expressions": False,
+        "is_unique": False,
+        "is_valid": True,
+        "constraint": None,
+        "size_bytes": 8192,
+        "scans": 10,
+    }
+    values.update(fields)
+    return Index(**values)
+
+
+def _graph(on_delete: str = "NO ACTION") -> FKGraph:
+    snapshot = SchemaSnapshot("public")
+    snapshot.foreign_keys += [
+        {
+            "from_schema": "public",
+            "from_table": "orders",
+            "from_column": column,
+            "to_schema": "public",
+            "to_table": "customers",
+            "to_column": to,
+            "constraint_name": "orders_customer_fkey",
+            "position": i,
+            "on_delete": on_delete,
+        }
+        for i, (column, to) in enumerate((("region", "region"), ("customer_id", "id")))
+    ]
+    return FKGraph(snapshot)
+
+
+def _kinds(findings: list[dict]) -> list[tuple[str, str | None]]:
+    return [(f["kind"], f["index"]) for f in findings]
+
+
+def test_missing_fk_index() -> None:
+    tables = {"public.orders": _STATS}
+    widths = {("public.orders", "region"): 4, ("public.orders", "customer_id"): 8}
+    (finding,) = advise(_graph("CASCADE"), [], tables, widths)
+    assert finding["kind"] == "missing_fk_index"
+    assert finding["severity"] == "high"
+    assert finding["columns"] == ["region", "customer_id"]
+    assert finding["size_bytes"] == estimate_btree_bytes(50_000, [4, 8])
+    assert finding["suggestion"] == (
+        "CREATE INDEX CONCURRENTLY ON public.orders (region, customer_id);"
+    )
+
+
+def test_fk_covered_by_leading_columns_in_any_order() -> None:
+    index = _index("orders_cust_region", "customer_id", "region", "created_at")
+    assert advise(_graph(), [index], {"public.orders": _STATS}, {}) == []
+
+
+def test_fk_not_covered_by_partial_or_trailing_index() -> None:
+    indexes = [
+        _index("partial", "region", "customer_id", predicate="(active)"),
+        _index("trailing", "created_at", "region", "customer_id"),
+    ]
+    kinds = _kinds(advise(_graph(), indexes, {"public.orders": _STATS}, {}))
+    assert ("missing_fk_index", None) in kinds
+
+
+def test_duplicate_keeps_constraint_index() -> None:
+    indexes = [
+        _index("orders_pkey", "id", is_unique=True, constraint="orders_pkey"),
+        _index("orders_id_copy", "id", is_unique=True, scans=100),
+    ]
+    (finding,) = advise(_graph(), indexes, {}, {})
+    assert (finding["kind"], finding["index"]) == ("duplicate_index", "orders_id_copy")
+    assert finding["suggestion"] == "DROP INDEX CONCURRENTLY public.orders_id_copy;"
+
+
+def test_prefix_index() -> None:
+    indexes = [_index("by_status", "status"), _index("by_status_date", "status", "at")]
+    (finding,) = advise(_graph(), indexes, {}, {})
+    assert (finding["kind"], finding["index"]) == ("prefix_index", "by_status")
+
+
+def test_unique_prefix_is_kept() -> None:
+    indexes = [
+        _index("uniq_code", "code", is_unique=True),
+        _index("by_code_date", "code", "at"),
+    ]
+    assert advise(_graph(), indexes, {}, {}) == []
+
+
+def test_unused_partial_and_expression_indexes() -> None:
+    indexes = [
+        _index("open_orders", "id", predicate="(status = 'open'::text)", scans=0),
+        _index("lower_email", "lower(email)", has_expressions=True, scans=3),
+    ]
+    findings = advise(_graph(), indexes, {}, {})
+    assert [(f["kind"], f["severity"]) for f in findings] == [
+        ("partial_index", "medium"),
+        ("expression_index", "low"),
+    ]
+    assert findings[0]["suggestion"] == "DROP INDEX CONCURRENTLY public.open_orders;"
+    assert findings[1]["suggestion"] is None
+
+
+def test_quoted_names_in_suggestions() -> None:
+    indexes = [
+        _index("keep", "id", table="Orders", scans=100),
+        _index("Dup", "id", table="Orders", scans=0),
+    ]
+    (finding,) = advise(_graph(), indexes, {}, {})
+    assert finding["suggestion"] == 'DROP INDEX CONCURRENTLY public."Dup";'
+
+
+def test_estimate_btree_bytes() -> None:
+    assert estimate_btree_bytes(0, [8]) == 0
+    assert estimate_btree_bytes(900, [4, 4]) == 20 * 1000
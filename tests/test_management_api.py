@@ -0,0 +1,155 @@
+import asyncio
+
+import httpx
+import pytest
+
+from supabase_schema_mcp import management_api
+from supabase_schema_mcp.management_api import ManagementAPIError, ManagementClient
+
+_PROJECT = {"id": "abcd", "name": "mock", "ref": "abcd", "region": "eu-west-1"}
+_ETAG = '"v1"'
+
+
+class MockAPI:
+    """Management API stand-in: counts requests, answers 304 to a matching ETag."""
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+        self.fail_next: list[tuple[int, str]] = []  # (status, Retry-After)
+        self.delay = 0.0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_next:
+            status, retry_after = self.fail_next.pop(0)
+            headers = {"Retry-After": retry_after}
+            return httpx.Response(status, text="try again", headers=headers)
+        if request.headers.get("Authorization") != "Bearer key":
+            return httpx.Response(401, text="unauthorized")
+        if request.headers.get("If-None-Match") == _ETAG:
+            return httpx.Response(304, headers={"ETag": _ETAG})
+        return httpx.Response(200, json=_PROJECT, headers={"ETag": _ETAG})
+
+
+@pytest.fixture
+def api() -> MockAPI:
+    return MockAPI()
+
+
+@pytest.fixture
+async def client(api: MockAPI):
+    client = ManagementClient(
+        "https://api.test/v1", ttl=60.0, retries=3, timeout=5.0, http2=False
+    )
+    await client.aclose()
+    client._http = httpx.AsyncClient(
+        base_url="https://api.test/v1", transport=httpx.MockTransport(api)
+    )
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Backoff delays requested by the client; the waits themselves are skipped."""
+    delays: list[float] = []
+    sleep = asyncio.sleep
+
+    async def record(delay: float, *args, **kwargs):
+        delays.append(delay)
+        return await sleep(0)
+
+    monkeypatch.setattr(management_api.asyncio, "sleep", record)
+    return delays
+
+
+async def test_cached_within_ttl(client: ManagementClient, api: MockAPI) -> None:
+    first = await client.get_json("/projects/abcd", "key")
+    second = await client.get_json("/projects/abcd", "key")
+    assert first == second == _PROJECT
+    assert len(api.requests) == 1
+    assert client.counts["hits"] == 1
+
+
+async def test_cache_is_per_token(client: ManagementClient, api: MockAPI) -> None:
+    await client.get_json("/projects/abcd", "key")
+    with pytest.raises(ManagementAPIError) as error:
+        await client.get_json("/projects/abcd", "other")
+    assert error.value.status == 401
+    assert len(api.requests) == 2
+
+
+async def test_expired_entry_revalidated_with_etag(
+    client: ManagementClient, api: MockAPI
+) -> None:
+    client.ttl = 0.0
+    await client.get_json("/projects/abcd", "key")
+    data = await client.get_json("/projects/abcd", "key")
+    assert data == _PROJECT
+    assert api.requests[-1].headers["If-None-Match"] == _ETAG
+    assert client.counts == {"hits": 0, "revalidated": 1, "fetched": 1, "retries": 0}
+
+
+async def test_retries_429_and_503_honouring_retry_after(
+    client: ManagementClient, api: MockAPI, sleeps: list[float]
+) -> None:
+    api.fail_next = [(503, "2"), (429, "1")]
+    data = await client.get_json("/projects/abcd", "key")
+    assert data == _PROJECT
+    assert client.counts["retries"] == 2
+    assert sleeps == [2.0, 1.0]
+
+
+async def test_gives_up_after_retries(
+    client: ManagementClient, api: MockAPI, sleeps: list[float]
+) -> None:
+    api.fail_next = [(503, "0")] * 10
+    with pytest.raises(ManagementAPIError) as error:
+        await client.get_json("/projects/abcd", "key")
+    assert error.value.status == 503
+    assert len(api.requests) == client.retries + 1
+
+
+async def test_client_errors_not_retried(
+    client: ManagementClient, api: MockAPI, sleeps: list[float]
+) -> None:
+    api.fail_next = [(404, "0")]
+    with pytest.raises(ManagementAPIError) as error:
+        await client.get_json("/projects/abcd", "key")
+    assert error.value.status == 404
+    assert len(api.requests) == 1
+    assert sleeps == []
+
+
+async def test_concurrent_misses_share_one_request(
+    client: ManagementClient, api: MockAPI
+) -> None:
+    api.delay = 0.05
+    results = await asyncio.gather(
+        *(client.get_json("/projects/abcd", "key") for _ in range(10))
+    )
+    assert all(r == _PROJECT for r in results)
+    assert len(api.requests) == 1
+    assert client.counts["fetched"] == 1
+
+
+def test_retry_after_forms() -> None:
+    def response(value: str) -> httpx.Response:
+        return httpx.Response(429, headers={"Retry-After": value})
+
+    assert management_api._retry_after(response("3")) == 3.0
+    assert management_api._retry_after(response("-1")) == 0.0
+    assert management_api._retry_after(response("Wed, 21 Oct 2015 07:28:00 GMT")) == 0
+    assert management_api._retry_after(response("soon")) is None
+    assert management_api._retry_after(httpx.Response(429)) is None
+
+
+async def test_fetch_project_info_needs_credentials(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv("SUPABASE_PROJECT_REF", raising=False)
+    monkeypatch.delenv("SUPABASE_SERVICE_ROLE_KEY", raising=False)
+    with pytest.raises(ManagementAPIError, match="not configured"):
+        await management_api.fetch_project_info()
@@ -0,0 +1,149 @@
+import base64
+import json
+
+import pytest
+
+from supabase_schema_mcp.catalog import SECTION_KEYS
+from supabase_schema_mcp.config import Settings
+from supabase_schema_mcp.output import (
+    apply_layout,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    render_list,
+    render_rows,
+)
+
+
+def _tables(n: int) -> list[dict]:
+    rows = [
+        {"schema": schema, "table": f"t{i:02d}", "type": "BASE TABLE"}
+        for schema in ("app", "public")
+        for i in range(n)
+    ]
+    return sorted(rows, key=SECTION_KEYS["tables"])
+
+
+def test_cursor_round_trip() -> None:
+    key = ("public", "orders", 3)
+    cursor = encode_cursor(key)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90IGpzb24", encode_cursor(()) + "x"])
+def test_malformed_cursor(cursor: str) -> None:
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_cursor_must_be_a_list() -> None:
+    raw = json.dumps({"a": 1}).encode()
+    cursor = base64.urlsafe_b64encode(raw).decode()
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_paginate_walks_every_row_once() -> None:
+    rows = _tables(5)
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = paginate("tables", rows, limit=3, cursor=cursor)
+        seen += page
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == rows
+    assert pages == 4
+
+
+def test_paginate_resumes_after_cursor_row() -> None:
+    rows = _tables(3)
+    cursor = encode_cursor(("app", "t01"))
+    page, next_cursor = paginate("tables", rows, limit=2, cursor=cursor)
+    assert [(r["schema"], r["table"]) for r in page] == [
+        ("app", "t02"),
+        ("public", "t00"),
+    ]
+    assert decode_cursor(next_cursor) == ("public", "t00")
+
+
+def test_paginate_cursor_of_deleted_row() -> None:
+    rows = [r for r in _tables(3) if r["table"] != "t01"]
+    page, _ = paginate("tables", rows, limit=1, cursor=encode_cursor(("app", "t01")))
+    assert page[0]["table"] == "t02"
+
+
+def test_paginate_limit_capped_by_page_size_max(settings: Settings) -> None:
+    settings.page_size_max = 4
+    page, cursor = paginate("tables", _tables(5), limit=100)
+    assert len(page) == 4
+    assert cursor is not None
+    page, _ = paginate("tables", _tables(5), limit=0)
+    assert len(page) == 1
+
+
+def test_paginate_cursor_of_other_shape() -> None:
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        paginate("tables", _tables(2), cursor=encode_cursor((1, 2)))
+
+
+def test_render_rows_small_result_is_a_list() -> None:
+    rows = _tables(2)
+    assert json.loads(render_rows("tables", rows)) == rows
+
+
+def test_render_rows_unpaginated_large_result_pages(settings: Settings) -> None:
+    settings.page_size_max = 3
+    rows = _tables(5)
+    out = json.loads(render_rows("tables", rows))
+    assert out["items"] == rows[:3]
+    assert out["total"] == 10
+    assert decode_cursor(out["next_cursor"]) == ("app", "t02")
+    settings.page_size_max = 10
+    assert json.loads(render_rows("tables", rows)) == rows
+
+
+def test_render_rows_paginated_envelope() -> None:
+    rows = _tables(2)
+    out = json.loads(render_rows("tables", rows, limit=3))
+    assert out["items"] == rows[:3]
+    assert out["total"] == 4
+    assert decode_cursor(out["next_cursor"]) == ("public", "t00")
+
+
+def test_render_rows_errors() -> None:
+    assert "error" in json.loads(render_rows("tables", [], fmt="xml"))
+    assert "error" in json.loads(render_rows("tables", [], cursor="!!!"))
+
+
+def test_render_list_keeps_order_and_layouts() -> None:
+    rows = [
+        {"schema": "public", "table": "big", "total_bytes": 900},
+        {"schema": "app", "table": "small", "total_bytes": 10},
+    ]
+    assert json.loads(render_list(rows)) == rows
+    assert json.loads(render_list(rows, fmt="columnar"))["rows"] == [
+        ["public", "big", 900],
+        ["app", "small", 10],
+    ]
+    assert json.loads(render_list(rows, fmt="grouped")) == {
+        "public": {"big": [{"total_bytes": 900}]},
+        "app": {"small": [{"total_bytes": 10}]},
+    }
+    assert "error" in json.loads(render_list(rows, fmt="xml"))
+
+
+def test_layouts() -> None:
+    rows = [
+        {"schema": "public", "table": "a", "column": "id"},
+        {"schema": "public", "table": "a", "column": "name"},
+    ]
+    assert apply_layout(rows, "columnar") == {
+        "columns": ["schema", "table", "column"],
+        "rows": [["public", "a", "id"], ["public", "a", "name"]],
+    }
+    assert apply_layout(rows, "grouped") == {
+        "public": {"a": [{"column": "id"}, {"column": "name"}]}
+    }
+    assert apply_layout([], "columnar") == {"columns": [], "rows": []}
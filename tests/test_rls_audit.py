@@ -0,0 +1,134 @@
+from supabase_schema_mcp.catalog import SchemaSnapshot
+from supabase_schema_mcp.rls_audit import (
+    _Catalog,
+    audit,
+    audit_policy,
+    referenced_schemas,
+)
+
+
+def _snapshot() -> SchemaSnapshot:
+    snapshot = SchemaSnapshot("all")
+    tables = {
+        ("public", "posts"): ["id", "user_id", "team_id"],
+        ("public", "members"): ["team_id", "user_id"],
+        ("public", "Teams"): ["Id", "OwnerId"],
+    }
+    for (schema, table), columns in tables.items():
+        snapshot.columns += [
+            {"schema": schema, "table": table, "column": c} for c in columns
+        ]
+    snapshot.indexes.append(
+        {"schema": "public", "table": "members", "columns": ["team_id", "user_id"]}
+    )
+    snapshot.functions += [
+        {"schema": "auth", "function": "uid", "volatility": "STABLE"},
+        {"schema": "public", "function": "is_member", "volatility": "STABLE"},
+        {"schema": "public", "function": "slug", "volatility": "IMMUTABLE"},
+    ]
+    return snapshot
+
+
+def _findings(using: str, table: str = "posts", reads=None) -> list[tuple[str, str]]:
+    policy = {"schema": "public", "table": table, "using": using, "with_check": None}
+    findings = audit_policy(policy, _Catalog(_snapshot()), reads or {})
+    return sorted((f.kind, f.severity) for f in findings)
+
+
+def test_per_row_function_call() -> None:
+    policy = {"schema": "public", "table": "posts", "using": "(user_id = auth.uid())"}
+    findings = audit_policy(policy, _Catalog(_snapshot()), {})
+    per_row = [f for f in findings if f.kind == "per_row_function"]
+    assert len(per_row) == 1
+    assert per_row[0].suggestion == (
+        "Wrap it in a subquery so it runs once: (SELECT auth.uid())"
+    )
+
+
+def test_wrapped_call_runs_once() -> None:
+    assert _findings("(user_id = ( SELECT auth.uid() AS uid))") == [
+        ("unindexed_column", "high")
+    ]
+
+
+def test_in_subquery_filters_outer_column() -> None:
+    using = "(team_id IN ( SELECT m.team_id FROM members m WHERE (m.team_id = 1)))"
+    assert _findings(using) == [("subquery", "low"), ("unindexed_column", "high")]
+
+
+def test_indexed_column_is_not_reported() -> None:
+    assert _findings("(EXISTS ( SELECT 1 FROM members m WHERE (m.team_id = 5)))") == [
+        ("subquery", "low")
+    ]
+
+
+def test_correlated_subquery() -> None:
+    using = (
+        "(EXISTS ( SELECT 1 FROM members m WHERE ((m.team_id = posts.team_id)"
+        " AND (m.user_id = ( SELECT auth.uid() AS uid)))))"
+    )
+    assert _findings(using) == [
+        ("correlated_subquery", "medium"),
+        ("unindexed_column", "high"),
+    ]
+
+
+def test_row_dependent_function_reading_a_table() -> None:
+    reads = {"public.is_member": ["public.members"]}
+    assert _findings("is_member(team_id)", reads=reads) == [
+        ("row_dependent_function", "high")
+    ]
+    assert _findings("is_member(team_id)") == [("row_dependent_function", "medium")]
+
+
+def test_immutable_functions_and_literals_ignored() -> None:
+    assert _findings("(slug(user_id::text) = 'x'::text)") == []
+    assert _findings("(team_id = 3)") == []
+
+
+def test_quoted_identifiers_in_suggestion() -> None:
+    policy = {
+        "schema": "public",
+        "table": "Teams",
+        "using": '("OwnerId" = ( SELECT auth.uid() AS uid))',
+    }
+    (finding,) = audit_policy(policy, _Catalog(_snapshot()), {})
+    assert finding.suggestion == 'CREATE INDEX ON public."Teams" ("OwnerId");'
+
+
+def test_audit_orders_by_table_size_then_severity() -> None:
+    policies = [
+        {
+            "schema": "public",
+            "table": table,
+            "policy": f"p_{table}",
+            "command": "SELECT",
+            "using": "(user_id = auth.uid())",
+            "with_check": None,
+        }
+        for table in ("members", "posts")
+    ]
+    sizes = {"public.posts": (1000, 81920), "public.members": (10, 8192)}
+    rows = audit(policies, _snapshot(), sizes, {})
+    assert [(r["table"], r["kind"]) for r in rows] == [
+        ("posts", "unindexed_column"),
+        ("posts", "per_row_function"),
+        ("members", "unindexed_column"),
+        ("members", "per_row_function"),
+    ]
+    assert rows[0]["rows_estimate"] == 1000
+
+
+def test_referenced_schemas() -> None:
+    policies = [
+        {
+            "schema": "app",
+            "table": "docs",
+            "using": "(EXISTS ( SELECT 1 FROM org.members m"
+            " WHERE ((m.doc_id = docs.id) AND private.is_member(m.team_id))))",
+            "with_check": "(owner = ( SELECT auth.uid() AS uid))",
+        },
+        {"schema": "app", "table": "open", "using": None},
+    ]
+    # m.doc_id and docs.id are column references, not schemas.
+    assert referenced_schemas(policies) == ["app", "auth", "org", "private", "public"]
@@ -0,0 +1,28 @@
+from supabase_schema_mcp.search import Document, SchemaIndex, _snippet, words
+
+
+def test_words_split_and_fold() -> None:
+    assert words("invoiceLineItems") == ["invoice", "line", "item"]
+    assert words("user_policies APIKey") == ["user", "policy", "apikey"]
+
+
+def test_snippet_finds_the_unfolded_word() -> None:
+    body = "-- Policies for every tenant\nSELECT 1"
+    assert _snippet(body, words("policies")[0]) == (
+        "-- Policies for every tenant SELECT 1"
+    )
+
+
+def test_snippet_matches_whole_words_only() -> None:
+    body = "ownership " + "x" * 80 + " ownerId = auth.uid()"
+    assert _snippet(body, "owner").startswith("...")
+    assert _snippet(body, "tenant") == ""
+
+
+def test_body_match_scored() -> None:
+    index = SchemaIndex(
+        [Document("function", "public", None, "check_access", body="Policies")]
+    )
+    name, body = index.score("policy")
+    assert name == {}
+    assert body == {0: 8.0}
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from supabase_schema_mcp import timeouts
+from supabase_schema_mcp.config import Settings
+from supabase_schema_mcp.timeouts import stale_on_timeout
+
+
+@pytest.fixture(autouse=True)
+def migration_safe(monkeypatch: pytest.MonkeyPatch, settings: Settings) -> None:
+    monkeypatch.setattr(settings, "db_migration_safe", True)
+    monkeypatch.setattr(timeouts, "_results", type(timeouts._results)())
+    monkeypatch.setattr(timeouts, "_results_chars", 0)
+
+
+def _tool(answers: list[str | BaseException]):
+    @stale_on_timeout
+    async def tool(name: str) -> str:
+        answer = answers.pop(0)
+        if isinstance(answer, BaseException):
+            raise answer
+        return answer
+
+    return tool
+
+
+async def test_stale_json_result() -> None:
+    tool = _tool(['[{"table": "a"}]', TimeoutError()])
+    await tool(name="a")
+    out = json.loads(await tool(name="a"))
+    assert out["stale"] is True
+    assert out["result"] == [{"table": "a"}]
+
+
+async def test_stale_plain_text_result_is_a_json_string() -> None:
+    definition = "CREATE FUNCTION f() RETURNS int LANGUAGE sql AS $$ SELECT 1 $$"
+    tool = _tool([definition, TimeoutError()])
+    await tool(name="f")
+    assert json.loads(await tool(name="f"))["result"] == definition
+
+
+async def test_errors_are_not_kept() -> None:
+    error = json.dumps({"error": "No function named 'f'"}, indent=2)
+    tool = _tool(["[]", error, TimeoutError()])
+    await tool(name="f")
+    assert await tool(name="f") == error
+    # The timeout falls back to the last good answer, not the error.
+    assert json.loads(await tool(name="f"))["result"] == []
@@ -0,0 +1,41 @@
+import pytest
+
+from supabase_schema_mcp import usage_stats
+from supabase_schema_mcp.usage_stats import UsageCache, UsageStats
+
+
+@pytest.fixture
+def loads(monkeypatch: pytest.MonkeyPatch) -> list[bool]:
+    """Record the `definitions` flag of each load instead of querying."""
+    calls: list[bool] = []
+
+    async def schemas(schema_name: str) -> dict[str, object]:
+        return {schema_name: object()}
+
+    async def load(schemas: list[str], definitions: bool = False) -> UsageStats:
+        calls.append(definitions)
+        if not definitions:
+            return UsageStats([], [])
+        return UsageStats([], [], [], {})
+
+    monkeypatch.setattr(usage_stats, "get_schema_snapshots", schemas)
+    monkeypatch.setattr(usage_stats, "load_usage", load)
+    return calls
+
+
+async def test_plain_entry_reloaded_for_definitions(loads: list[bool]) -> None:
+    cache = UsageCache()
+    await cache.get("public")
+    await cache.get("public")
+    entry = await cache.get("public", definitions=True)
+    assert entry.index_definitions == []
+    assert loads == [False, True]
+
+
+async def test_definitions_entry_serves_plain_calls(loads: list[bool]) -> None:
+    cache = UsageCache()
+    await cache.get("public", definitions=True)
+    await cache.get("public")
+    await cache.get("public", definitions=True)
+    assert loads == [True]
+    assert cache.stats()["hits"] == 2